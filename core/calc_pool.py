@@ -0,0 +1,295 @@
+import atexit
+import collections
+import itertools
+import json
+import os
+import queue
+import subprocess
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from data.pokedex import get_parsed_sets
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT_PATH = os.path.join(BASE_DIR, "tools", "callDamageFromJSON.mjs")
+
+DEFAULT_POOL_SIZE = int(os.environ.get("CALC_POOL_SIZE", max(1, min(4, (os.cpu_count() or 1) - 1))))
+MAX_RETRIES = 1
+# Délai maximal (s) entre deux lignes du worker avant de le considérer bloqué
+CALC_TIMEOUT = float(os.environ.get("CALC_TIMEOUT", 120))
+STDERR_LINES = 20
+
+
+class CalcWorkerError(RuntimeError):
+    """Le worker Node a planté ou a renvoyé une réponse illisible."""
+
+
+def request_names(payload: dict) -> List[str]:
+    """Pokémon (`nom[:set]`) cités par une requête : a / b, paires ou rosters."""
+    names = [payload[k] for k in ("a", "b") if k in payload]
+    for a, b in payload.get("pairs", []):
+        names += [a, b]
+    return names + list(payload.get("rosterA", [])) + list(payload.get("rosterB", []))
+
+
+class CalcWorker:
+    """Un process Node long-vivant qui parle en NDJSON sur stdin/stdout."""
+
+    def __init__(self, script_path: str = SCRIPT_PATH, timeout: float = CALC_TIMEOUT):
+        self.script_path = script_path
+        self.timeout = timeout
+        self.process: Optional[subprocess.Popen] = None
+        self.start()
+
+    def start(self):
+        self.process = subprocess.Popen(
+            ["node", self.script_path, "--worker"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            text=True, encoding="utf-8", bufsize=1
+        )
+        # stdout et stderr sont lus par des threads : receive() attend avec une échéance,
+        # et les dernières lignes d'erreur de Node accompagnent les CalcWorkerError
+        self.lines: "queue.Queue[str]" = queue.Queue()
+        self.stderr_tail = collections.deque(maxlen=STDERR_LINES)
+        threading.Thread(target=self._read_stdout, args=(self.process.stdout, self.lines), daemon=True).start()
+        self._stderr_reader = threading.Thread(
+            target=self._read_stderr, args=(self.process.stderr, self.stderr_tail), daemon=True
+        )
+        self._stderr_reader.start()
+        # Sets déjà envoyés à ce process (nom → records) : chaque set ne traverse le pipe qu'une fois
+        self.sent_sets: Dict[str, tuple] = {}
+
+    @staticmethod
+    def _read_stdout(stream, lines: queue.Queue):
+        try:
+            for line in stream:
+                lines.put(line)
+        except (OSError, ValueError):
+            pass
+        lines.put("")  # fin du flux
+
+    @staticmethod
+    def _read_stderr(stream, tail: collections.deque):
+        try:
+            for line in stream:
+                tail.append(line.rstrip())
+        except (OSError, ValueError):
+            pass
+
+    def error_output(self) -> str:
+        """Dernières lignes écrites par Node sur stderr (vide si rien)."""
+        if not self.is_alive():
+            self._stderr_reader.join(timeout=1)
+        return "\n".join(self.stderr_tail)
+
+    def _error(self, message: str) -> CalcWorkerError:
+        stderr = self.error_output()
+        return CalcWorkerError(f"{message}\n{stderr}" if stderr else message)
+
+    def is_alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def restart(self):
+        self.close()
+        self.start()
+
+    def with_sets(self, payload: dict) -> dict:
+        """Joint à la requête les sets parsés (data.pokedex) que ce worker n'a pas encore reçus.
+
+        Le worker calcule alors sur exactement les mêmes sets que le moteur Python ; les
+        noms inconnus du dex restent parsés côté Node (et y produisent leur erreur habituelle).
+        """
+        sets = {}
+        for spec in request_names(payload):
+            name = spec.partition(":")[0].lower()
+            if name in sets:
+                continue
+            records = get_parsed_sets(name, suggest=False)
+            if records and self.sent_sets.get(name) is not records:
+                sets[name] = [{"key": s.key, "set": s.calc_set()} for s in records]
+                self.sent_sets[name] = records
+        return {**payload, "sets": sets} if sets else payload
+
+    def send(self, payload: dict):
+        if not self.is_alive():
+            raise self._error("Worker Node arrêté.")
+        payload = self.with_sets(payload)
+        try:
+            self.process.stdin.write(json.dumps(payload) + "\n")
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError) as e:
+            raise self._error(f"Worker Node injoignable : {e}")
+
+    def receive(self, request_id: int) -> dict:
+        try:
+            line = self.lines.get(timeout=self.timeout)
+        except queue.Empty:
+            # ⏱️ Worker bloqué : on le tue, le pool le relancera
+            if self.process is not None:
+                self.process.kill()
+            raise self._error(f"Worker Node sans réponse depuis {self.timeout:g} s.")
+        if not line:
+            raise self._error("Worker Node terminé sans réponse.")
+        try:
+            response = json.loads(line)
+        except json.JSONDecodeError:
+            raise CalcWorkerError("❌ Sortie invalide JSON.")
+        if response.get("id") != request_id:
+            raise CalcWorkerError("Réponse désynchronisée du worker Node.")
+        return response
+
+    def request(self, payload: dict) -> dict:
+        self.send(payload)
+        return self.receive(payload.get("id"))
+
+    def stream(self, payload: dict) -> Iterator[dict]:
+        """Envoie une requête batch et renvoie les lignes NDJSON au fil de l'eau jusqu'à `done`."""
+        self.send(payload)
+        while True:
+            record = self.receive(payload.get("id"))
+            if record.get("done"):
+                return
+            yield record
+
+    def close(self):
+        if self.process is None:
+            return
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=2)
+        except Exception:
+            self.process.kill()
+        self.process = None
+
+
+class CalcWorkerPool:
+    """Pool de workers Node partagé entre threads, démarré à la demande."""
+
+    def __init__(self, size: int = DEFAULT_POOL_SIZE, script_path: str = SCRIPT_PATH, timeout: float = CALC_TIMEOUT):
+        if size < 1:
+            raise ValueError("La taille du pool doit être >= 1.")
+        self.size = size
+        self.script_path = script_path
+        self.timeout = timeout
+        self._idle: List[CalcWorker] = []
+        self._workers: List[CalcWorker] = []
+        self._available = threading.Condition()
+        self._ids = itertools.count()
+        self.restarts = 0
+
+    def _acquire(self) -> CalcWorker:
+        with self._available:
+            while True:
+                if self._idle:
+                    return self._idle.pop()
+                if len(self._workers) < self.size:
+                    worker = CalcWorker(self.script_path, self.timeout)
+                    self._workers.append(worker)
+                    return worker
+                self._available.wait()
+
+    def _release(self, worker: CalcWorker):
+        with self._available:
+            if worker in self._workers:
+                self._idle.append(worker)
+            else:
+                worker.close()  # pool fermé pendant la requête
+            self._available.notify()
+
+    def request(self, payload: dict) -> dict:
+        payload = {**payload, "id": next(self._ids)}
+        worker = self._acquire()
+        try:
+            for attempt in range(MAX_RETRIES + 1):
+                try:
+                    return worker.request(payload)
+                except CalcWorkerError:
+                    # ♻️ Worker planté : on le relance et on rejoue la requête
+                    worker.restart()
+                    self.restarts += 1
+                    if attempt == MAX_RETRIES:
+                        raise
+        finally:
+            self._release(worker)
+
+    def damage_calc(self, poke1: str, poke2: str) -> list:
+        response = self.request({"a": poke1, "b": poke2})
+        if "error" in response:
+            raise RuntimeError(f"Erreur Node.js :\n{response['error']}")
+        return response["result"]
+
+    def matchup(self, poke1: str, poke2: str, rolls: bool = False) -> list:
+        """Les deux sens en une passe : chaque entrée porte aussi `reverseMoves` (B → A)."""
+        response = self.request({"op": "matchup", "a": poke1, "b": poke2, "rolls": rolls})
+        if "error" in response:
+            raise RuntimeError(f"Erreur Node.js :\n{response['error']}")
+        return response["result"]
+
+    def stream_batch(self, pairs: List[Tuple[str, str]] = None,
+                     roster_a: List[str] = None, roster_b: List[str] = None,
+                     bidirectional: bool = False, rolls: bool = False) -> Iterator[dict]:
+        """Batch de paires explicites ou matrice roster A × roster B, en streaming.
+
+        Chaque enregistrement contient `pair` et soit `entry` (une paire de sets),
+        soit `pairDone` (fin d'une paire de Pokémon, avec `error` éventuel).
+        """
+        payload = {"op": "batch", "id": next(self._ids), "bidirectional": bidirectional, "rolls": rolls}
+        if pairs is not None:
+            payload["pairs"] = [list(p) for p in pairs]
+        else:
+            payload["rosterA"] = list(roster_a or [])
+            payload["rosterB"] = list(roster_b or [])
+
+        worker = self._acquire()
+        finished = False
+        try:
+            yield from worker.stream(payload)
+            finished = True
+        except CalcWorkerError:
+            worker.restart()
+            self.restarts += 1
+            finished = True
+            raise
+        finally:
+            if not finished:
+                # Consommateur arrêté en cours de route : le worker a encore des lignes en vol
+                worker.restart()
+            self._release(worker)
+
+    def close(self):
+        """Arrête tous les workers ; le pool reste utilisable et en relancera à la demande."""
+        with self._available:
+            for worker in self._workers:
+                worker.close()
+            self._workers.clear()
+            self._idle.clear()
+            # Les threads en attente d'un worker se réveillent et en démarrent un neuf
+            self._available.notify_all()
+
+
+_default_pool: Optional[CalcWorkerPool] = None
+_default_lock = threading.Lock()
+
+
+def get_calc_pool() -> CalcWorkerPool:
+    global _default_pool
+    with _default_lock:
+        if _default_pool is None:
+            _default_pool = CalcWorkerPool()
+        return _default_pool
+
+
+def set_pool_size(size: int) -> CalcWorkerPool:
+    """Remplace le pool par défaut par un pool de `size` workers."""
+    global _default_pool
+    with _default_lock:
+        if _default_pool is not None:
+            _default_pool.close()
+        _default_pool = CalcWorkerPool(size)
+        return _default_pool
+
+
+@atexit.register
+def _shutdown_default_pool():
+    if _default_pool is not None:
+        _default_pool.close()
@@ -0,0 +1,150 @@
+import heapq
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+
+from core.new_pokemon_analyzer import get_duel_cache
+from core.synergy_calculator import all_pokemon_names, get_top_pokemon
+from core.threat_bitsets import BeatsIndex
+from data.role_index import get_role_index
+
+DEFAULT_BEAM = 8
+DEFAULT_TOP_N = 100
+DEFAULT_RESULTS = 10
+DEFAULT_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+
+
+def core_score(covered: int, draws: int) -> float:
+    """Menaces du top battues par au moins un membre, +0.5 par menace seulement tenue en nul."""
+    return covered.bit_count() + 0.5 * (draws & ~covered).bit_count()
+
+
+def gain(covered: int, draws: int, beats: int, draw: int) -> float:
+    """Majorant de ce qu'un membre ajoute au score d'un core (couverts, nuls)."""
+    return (beats & ~covered).bit_count() + 0.5 * (draw & ~covered & ~draws).bit_count()
+
+
+def greedy_completion(members: Tuple[int, ...], covered: int, draws: int, later: List[list]) -> Tuple[float, Tuple[int, ...], int, int]:
+    """Complète un core partiel slot par slot avec le meilleur gain : un core réel, donc un plancher."""
+    for options in later:
+        best = max((o for o in options if o[0] not in members), key=lambda o: gain(covered, draws, o[1], o[2]), default=None)
+        if best is None:
+            return -1.0, members, covered, draws
+        members = tuple(sorted(members + (best[0],)))
+        covered, draws = covered | best[1], draws | best[2]
+    return core_score(covered, draws), members, covered, draws
+
+
+def expand_beam(args: Tuple) -> Tuple[list, list]:
+    """Enfants (score, borne, membres, couverts, nuls) d'un core partiel et leurs complétions gloutonnes.
+
+    Exécuté dans un process du pool : tout est passé en entiers pour rester picklable.
+    Les enfants dont la borne optimiste reste sous `floor` sont coupés.
+    """
+    members, covered, draws, options, later, floor = args
+    children, completions = [], []
+    for i, beats, draw in options:
+        if i in members:
+            continue
+        child = tuple(sorted(members + (i,)))
+        c, d = covered | beats, draws | draw
+        score = core_score(c, d)
+        # Somme, slot par slot, du meilleur gain encore possible
+        bound = score + sum(max((gain(c, d, b, dr) for j, b, dr in opts if j not in child), default=0) for opts in later)
+        if bound < floor:
+            continue
+        children.append((score, bound, child, c, d))
+        if later:
+            completions.append(greedy_completion(child, c, d, later))
+    return children, completions
+
+
+def search_cores(around: List[str], role_targets: List[List[str]], core_size: int = 3,
+                 beam_width: int = DEFAULT_BEAM, top_n: int = DEFAULT_TOP_N,
+                 results: int = DEFAULT_RESULTS, workers: int = DEFAULT_WORKERS,
+                 beats: BeatsIndex = None, pool: List[str] = None) -> List[Dict]:
+    """Beam search avec élagage : garde les `beam_width` meilleurs cores partiels à chaque étape.
+
+    Les rôles s'appliquent slot par slot comme pour build_synergy_core. Une branche dont
+    la borne optimiste ne peut pas battre le `results`-ième meilleur core complet est coupée.
+    `pool` restreint les candidats (tout le metagame par défaut).
+    Renvoie les cores classés : [{"core", "score", "covered", "uncovered"}].
+    """
+    if beats is None:
+        beats = BeatsIndex(get_top_pokemon(None), get_duel_cache())
+    top = beats.top_mask(top_n)
+    fixed = tuple(sorted(beats.id(name) for name in around))
+
+    # Candidats autorisés par slot, puis un seul batch de duels contre le top
+    role_index = get_role_index()
+    slot_options = []
+    for slot in range(len(fixed), core_size):
+        roles = role_targets[slot] if len(role_targets) > slot else []
+        slot_options.append([
+            name for name in (pool or all_pokemon_names())
+            if beats.id(name) not in fixed
+            and (not roles or role_index.has_any(name, roles))
+        ])
+    candidates = sorted({name for options in slot_options for name in options})
+    beats.ensure(beats.mask(candidates + list(around)), top)
+
+    def masks(name: str) -> Tuple[int, int, int]:
+        i = beats.id(name)
+        return i, beats.beats[i] & top, beats.draws[i] & top
+
+    covered = draws = 0
+    for i in fixed:
+        covered |= beats.beats[i] & top
+        draws |= beats.draws[i] & top
+    beam = [(core_score(covered, draws), 0.0, fixed, covered, draws)]
+    options = [[masks(name) for name in names] for names in slot_options]
+
+    ranking: List[Tuple[float, Tuple[int, ...], int, int]] = []
+    floor = -1.0
+    with ProcessPoolExecutor(max_workers=workers) if workers > 1 else _InlineExecutor() as executor:
+        for step, slot_opts in enumerate(options):
+            later = options[step + 1:]
+            jobs = [(members, c, d, slot_opts, later, floor) for _, _, members, c, d in beam]
+            children, seen = [], set()
+            for batch, completions in executor.map(expand_beam, jobs):
+                for child in batch:
+                    if child[2] not in seen:
+                        seen.add(child[2])
+                        children.append(child)
+                ranking = merge_ranking(ranking, completions, results)
+            if not later:
+                ranking = merge_ranking(ranking, [(s, m, c, d) for s, _, m, c, d in children], results)
+                break
+            if len(ranking) == results:
+                floor = ranking[-1][0]
+                children = [child for child in children if child[1] >= floor]
+            beam = heapq.nlargest(beam_width, children, key=lambda child: (child[0], child[1]))
+
+    if not options:
+        ranking = [(beam[0][0], fixed, covered, draws)]
+
+    return [{
+        "core": [beats.names[i] for i in members],
+        "score": score,
+        "covered": beats.names_of(c),
+        "uncovered": beats.names_of(top & ~c & ~beats.mask([beats.names[i] for i in members]))
+    } for score, members, c, d in ranking]
+
+
+def merge_ranking(ranking: list, cores: list, results: int) -> list:
+    """Les `results` meilleurs cores complets, sans doublon."""
+    best = {members: (score, members, c, d) for score, members, c, d in ranking + cores if score >= 0}
+    return heapq.nlargest(results, best.values(), key=lambda core: (core[0], [-i for i in core[1]]))
+
+
+class _InlineExecutor:
+    """Même interface que le pool quand un seul process est demandé."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def map(self, fn, iterable):
+        return map(fn, iterable)
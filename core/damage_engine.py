@@ -0,0 +1,445 @@
+import json
+import math
+import os
+import random
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from data.moves import get_move, to_id
+from data.name_index import get_name_index
+from data.pokedex import StrategySet, get_base_stats, get_parsed_sets, get_pokemon_data
+from data.type_matrix import effectiveness
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PARITY_CORPUS_PATH = os.path.join(BASE_DIR, "tests", "data", "damage_parity_corpus.json")
+
+LEVEL = 100
+STAT_KEYS = ["hp", "atk", "def", "spa", "spd", "spe"]
+
+NATURES = {
+    "hardy": (None, None), "docile": (None, None), "serious": (None, None), "bashful": (None, None), "quirky": (None, None),
+    "lonely": ("atk", "def"), "brave": ("atk", "spe"), "adamant": ("atk", "spa"), "naughty": ("atk", "spd"),
+    "bold": ("def", "atk"), "relaxed": ("def", "spe"), "impish": ("def", "spa"), "lax": ("def", "spd"),
+    "timid": ("spe", "atk"), "hasty": ("spe", "def"), "jolly": ("spe", "spa"), "naive": ("spe", "spd"),
+    "modest": ("spa", "atk"), "mild": ("spa", "def"), "quiet": ("spa", "spe"), "rash": ("spa", "spd"),
+    "calm": ("spd", "atk"), "gentle": ("spd", "def"), "sassy": ("spd", "spe"), "careful": ("spd", "spa"),
+}
+
+# 🎒 Objets modélisés
+TYPE_BOOST_ITEMS = {
+    "charcoal": "fire", "mysticwater": "water", "miracleseed": "grass", "magnet": "electric",
+    "nevermeltice": "ice", "blackbelt": "fighting", "poisonbarb": "poison", "softsand": "ground",
+    "sharpbeak": "flying", "twistedspoon": "psychic", "silverpowder": "bug", "hardstone": "rock",
+    "spelltag": "ghost", "dragonfang": "dragon", "blackglasses": "dark", "metalcoat": "steel",
+    "silkscarf": "normal", "fairyfeather": "fairy",
+}
+MASK_ITEMS = {"wellspringmask", "hearthflamemask", "cornerstonemask"}
+RESIST_BERRIES = {
+    "occaberry", "passhoberry", "wacanberry", "rindoberry", "yacheberry", "chopleberry",
+    "kebiaberry", "shucaberry", "cobaberry", "payapaberry", "tangaberry", "chartiberry",
+    "kasibberry", "habanberry", "colburberry", "babiriberry", "chilanberry", "roseliberry",
+}
+
+# Objets / talents qui changent les dégâts mais que le moteur ne modélise pas → repli Node
+UNSUPPORTED_ITEMS = {
+    "eviolite", "souldew", "lightball", "thickclub", "punchingglove", "metronome", "adamantorb",
+    "lustrousorb", "griseousorb", "adamantcrystal", "lustrousglobe", "griseouscore",
+}
+UNSUPPORTED_ABILITIES = {
+    "protean", "libero", "sheerforce", "reckless", "windrider",
+    "disguise", "wonderguard", "terashell", "embodyaspect", "mindseye", "scrappy", "parentalbond",
+    "normalize", "liquidvoice", "galvanize", "fairyaura", "darkaura", "aurabreak", "analytic",
+    "stakeout", "neuroforce", "sandforce", "solarpower", "flareboost", "toxicboost", "rivalry",
+    "teraformzero", "powerspot", "steelyspirit", "battery", "flowergift", "iceface", "zerotohero",
+}
+IMMUNITY_ABILITIES = {
+    "levitate": "ground", "eartheater": "ground", "flashfire": "fire", "wellbakedbody": "fire",
+    "waterabsorb": "water", "stormdrain": "water", "dryskin": "water", "voltabsorb": "electric",
+    "lightningrod": "electric", "motordrive": "electric", "sapsipper": "grass",
+}
+ATE_ABILITIES = {"pixilate": "fairy", "aerilate": "flying", "refrigerate": "ice"}
+MOLD_BREAKERS = {"moldbreaker", "teravolt", "turboblaze"}
+
+
+class UnsupportedMechanic(Exception):
+    """Set, objet, talent ou move hors du périmètre du moteur natif."""
+
+
+# === Utilitaires de la formule (mêmes arrondis que @smogon/calc) ===
+
+def chain_mods(mods: List[int], lower: int = 410, upper: int = 131072) -> int:
+    m = 4096
+    for mod in mods:
+        if mod != 4096:
+            m = (m * mod + 2048) >> 12
+    return max(min(m, upper), lower)
+
+
+def poke_round(x: np.ndarray) -> np.ndarray:
+    return np.where(x % 1 > 0.5, np.ceil(x), np.floor(x))
+
+
+def poke_round_scalar(x: float) -> int:
+    """poke_round pour un seul nombre (sans passer par un tableau NumPy)."""
+    return math.ceil(x) if x % 1 > 0.5 else math.floor(x)
+
+
+def type_effectiveness(move_type: str, defender_types: List[str]) -> float:
+    return effectiveness(move_type, defender_types)
+
+
+def compute_stats(base: Dict[str, int], evs: Dict[str, int], ivs: Dict[str, int], nature: Optional[str], level: int = LEVEL) -> Dict[str, int]:
+    plus, minus = NATURES.get((nature or "").lower(), (None, None))
+    stats = {}
+    for stat in STAT_KEYS:
+        core = (2 * base[stat] + ivs.get(stat, 31) + evs.get(stat, 0) // 4) * level // 100
+        if stat == "hp":
+            stats[stat] = core + level + 10 if base[stat] > 1 else 1
+            continue
+        value = core + 5
+        if stat == plus:
+            value = value * 110 // 100
+        elif stat == minus:
+            value = value * 90 // 100
+        stats[stat] = value
+    return stats
+
+
+# === Préparation des sets ===
+
+def prepare_side(name: str, set_data: StrategySet) -> dict:
+    """Transforme un set parsé (data.pokedex.StrategySet) en combattant prêt pour le calcul."""
+    data = get_pokemon_data(name)
+    if not data:
+        raise UnsupportedMechanic(f"Pokémon inconnu : {name}")
+    if set_data.boosts:
+        raise UnsupportedMechanic("boosts")
+
+    # Comme @smogon/calc : sans talent précisé, on prend le premier talent de l'espèce
+    ability = to_id(set_data.ability or data.get("ability1") or "")
+    item = to_id(set_data.item or "")
+    tera = (set_data.tera_type or "").lower() or None
+    if ability in UNSUPPORTED_ABILITIES:
+        raise UnsupportedMechanic(f"talent {ability}")
+    if item in UNSUPPORTED_ITEMS or item in RESIST_BERRIES:
+        raise UnsupportedMechanic(f"objet {item}")
+    if tera == "stellar":
+        raise UnsupportedMechanic("tera stellar")
+
+    evs = dict(zip(STAT_KEYS, set_data.evs))
+    ivs = dict(zip(STAT_KEYS, set_data.ivs))
+    stats = compute_stats(get_base_stats(name), evs, ivs, set_data.nature)
+    # Protosynthesis / Quark Drive activés par Booster Energy : meilleure stat hors PV
+    boosted = None
+    if item == "boosterenergy" and ability in {"protosynthesis", "quarkdrive"}:
+        boosted = max(STAT_KEYS[1:], key=lambda k: stats[k])
+
+    moves = []
+    for move_name in set_data.moves:
+        move = get_move(move_name)
+        if move is None:
+            raise UnsupportedMechanic(f"move {move_name}")
+        moves.append((move_name, move))
+
+    types = [t for t in (data.get("type1"), data.get("type2")) if t]
+    return {
+        "name": name,
+        "set_name": set_data.key,
+        "types": types,
+        "tera": tera,
+        "item": item,
+        "ability": ability,
+        "stats": stats,
+        "boosted": boosted,
+        "moves": moves,
+        "record": {
+            "name": data.get("name", name),
+            "item": set_data.item,
+            "ability": set_data.ability,
+            "nature": set_data.nature,
+            "evs": evs,
+            "ivs": ivs,
+            "stats": stats,
+            "hp": stats["hp"],
+            "speed": stats["spe"]
+        }
+    }
+
+
+def prepare_sides(name: str) -> List[dict]:
+    """Tous les sets d'un Pokémon, ou un seul avec `nom:set` (comme le worker Node)."""
+    poke, _, set_key = name.partition(":")
+    sets = get_parsed_sets(poke)
+    if set_key:
+        sets = [s for s in sets if s.name == set_key.strip()]
+    return [prepare_side(poke, s) for s in sets]
+
+
+# === Calcul ===
+
+def _triple_params(attacker: dict, defender: dict, move: dict) -> Tuple[int, int, int, int, float, int]:
+    """Paramètres scalaires d'un triple : (bp, atk, def, stab, efficacité, mod final)."""
+    if move["category"] == "status":
+        return 0, 1, 1, 4096, 0.0, 4096
+
+    a_ability, d_ability = attacker["ability"], defender["ability"]
+    ignores_ability = a_ability in MOLD_BREAKERS
+    if ignores_ability:
+        d_ability = ""
+
+    move_type, category, bp = move["type"], move["category"], move["bp"]
+    flags = move["flags"]
+    bp_mods, at_mods, df_mods, final_mods = [], [], [], []
+
+    if "terablast" in flags and attacker["tera"]:
+        move_type = attacker["tera"]
+        if attacker["stats"]["atk"] > attacker["stats"]["spa"]:
+            category = "physical"
+    if move_type == "normal" and a_ability in ATE_ABILITIES:
+        move_type = ATE_ABILITIES[a_ability]
+        bp_mods.append(4915)
+
+    defender_types = [defender["tera"]] if defender["tera"] else defender["types"]
+    eff = type_effectiveness(move_type, defender_types)
+    if "freezedry" in flags and "water" in defender_types:
+        eff *= 4
+    if IMMUNITY_ABILITIES.get(d_ability) == move_type:
+        eff = 0.0
+    if (d_ability == "bulletproof" and "bullet" in flags) or (d_ability == "soundproof" and "sound" in flags):
+        eff = 0.0
+    if move_type == "ground" and defender["item"] == "airballoon":
+        eff = 0.0
+    if eff == 0:
+        return 0, 1, 1, 4096, 0.0, 4096
+
+    # Puissance
+    if attacker["tera"] == move_type and bp < 60 and "priority" not in flags:
+        bp = 60
+    if "acrobatics" in flags and not attacker["item"]:
+        bp *= 2
+    if a_ability == "technician" and bp <= 60:
+        bp_mods.append(6144)
+    if a_ability == "sharpness" and "slicing" in flags:
+        bp_mods.append(6144)
+    if a_ability == "ironfist" and "punch" in flags:
+        bp_mods.append(4915)
+    if a_ability == "strongjaw" and "bite" in flags:
+        bp_mods.append(6144)
+    if a_ability == "megalauncher" and "pulse" in flags:
+        bp_mods.append(6144)
+    if a_ability == "toughclaws" and "contact" in flags:
+        bp_mods.append(5325)
+    if a_ability == "punkrock" and "sound" in flags:
+        bp_mods.append(5325)
+    if "knockoff" in flags and defender["item"]:
+        bp_mods.append(6144)
+    if TYPE_BOOST_ITEMS.get(attacker["item"]) == move_type or attacker["item"] in MASK_ITEMS:
+        bp_mods.append(4915)
+    if attacker["item"] == "muscleband" and category == "physical":
+        bp_mods.append(4505)
+    if attacker["item"] == "wiseglasses" and category == "special":
+        bp_mods.append(4505)
+    bp = max(1, poke_round_scalar(bp * chain_mods(bp_mods, 41, 2097152) / 4096))
+
+    # Attaque
+    physical = category == "physical"
+    attack_stat = "def" if "bodypress" in flags else "atk" if physical else "spa"
+    if "foulplay" in flags:
+        attack = defender["stats"]["atk"]
+    else:
+        attack = attacker["stats"][attack_stat]
+        if attacker["boosted"] == attack_stat:
+            at_mods.append(5325)
+    if a_ability in {"hugepower", "purepower"} and physical:
+        at_mods.append(8192)
+    if a_ability in {"hustle", "gorillatactics"} and physical:
+        at_mods.append(6144)
+    if a_ability == "waterbubble" and move_type == "water":
+        at_mods.append(8192)
+    if a_ability == "transistor" and move_type == "electric":
+        at_mods.append(5325)
+    if (a_ability, move_type) in {("dragonsmaw", "dragon"), ("rockypayload", "rock"), ("steelworker", "steel")}:
+        at_mods.append(6144)
+    if d_ability in {"thickfat"} and move_type in {"fire", "ice"}:
+        at_mods.append(2048)
+    if d_ability in {"heatproof", "waterbubble"} and move_type == "fire":
+        at_mods.append(2048)
+    if d_ability == "purifyingsalt" and move_type == "ghost":
+        at_mods.append(2048)
+    if (defender["ability"] == "tabletsofruin" and physical) or (defender["ability"] == "vesselofruin" and not physical):
+        if a_ability != defender["ability"]:
+            at_mods.append(3072)
+    if (attacker["item"] == "choiceband" and physical) or (attacker["item"] == "choicespecs" and not physical):
+        at_mods.append(6144)
+    attack = max(1, poke_round_scalar(attack * chain_mods(at_mods) / 4096))
+
+    # Défense
+    targets_def = physical or "targetdef" in move["flags"]
+    defense_stat = "def" if targets_def else "spd"
+    defense = defender["stats"][defense_stat]
+    if defender["boosted"] == defense_stat and d_ability:
+        df_mods.append(5325)
+    if (a_ability == "swordofruin" and targets_def) or (a_ability == "beadsofruin" and not targets_def):
+        if defender["ability"] != a_ability:
+            df_mods.append(3072)
+    if d_ability == "furcoat" and targets_def:
+        df_mods.append(8192)
+    if defender["item"] == "assaultvest" and not targets_def:
+        df_mods.append(6144)
+    defense = max(1, poke_round_scalar(defense * chain_mods(df_mods) / 4096))
+
+    # STAB (Tera compris)
+    stab = 4096
+    if move_type in attacker["types"]:
+        stab += 2048
+    if attacker["tera"] == move_type:
+        stab += 2048
+    if a_ability == "adaptability" and (move_type in attacker["types"] or move_type == attacker["tera"]):
+        stab += 1024 if attacker["tera"] and attacker["tera"] in attacker["types"] else 2048
+
+    # Modificateurs finaux
+    if d_ability in {"multiscale", "shadowshield"}:
+        final_mods.append(2048)
+    if d_ability == "fluffy":
+        if "contact" in flags and move_type != "fire":
+            final_mods.append(2048)
+        elif move_type == "fire" and "contact" not in flags:
+            final_mods.append(8192)
+    if d_ability == "punkrock" and "sound" in flags:
+        final_mods.append(2048)
+    if d_ability == "icescales" and not physical:
+        final_mods.append(2048)
+    if d_ability in {"filter", "solidrock", "prismarmor"} and eff > 1:
+        final_mods.append(3072)
+    if a_ability == "tintedlens" and eff < 1:
+        final_mods.append(8192)
+    if attacker["item"] == "expertbelt" and eff > 1:
+        final_mods.append(4915)
+    if attacker["item"] == "lifeorb":
+        final_mods.append(5324)
+
+    return bp, attack, defense, stab, eff, chain_mods(final_mods, 41, 131072)
+
+
+def triple_params(triples: List[Tuple[dict, dict, dict]]) -> np.ndarray:
+    """_triple_params de chaque triple (attaquant, défenseur, move), shape (N, 6)."""
+    return np.array([_triple_params(a, d, m) for a, d, m in triples], dtype=np.float64).reshape(-1, 6)
+
+
+def calculate_rolls(triples: List[Tuple[dict, dict, dict]], is_crit: bool = False,
+                    params: Optional[np.ndarray] = None) -> np.ndarray:
+    """Les 16 jets de dégâts de chaque triple (attaquant, défenseur, move), en un seul passage NumPy.
+
+    `params` (triple_params) évite de refaire la partie Python quand on calcule aussi les critiques.
+    """
+    if not triples:
+        return np.zeros((0, 16), dtype=np.int64)
+    if params is None:
+        params = triple_params(triples)
+    bp, attack, defense, stab, eff, final_mod = params.T
+
+    base = np.floor(np.floor(np.floor(2 * LEVEL / 5 + 2) * bp * attack / defense) / 50) + 2
+    if is_crit:
+        base = np.floor(base * 1.5)
+
+    rolls = np.floor(base[:, None] * np.arange(85, 101)[None, :] / 100)
+    rolls = np.where(stab[:, None] != 4096, rolls * stab[:, None] / 4096, rolls)
+    rolls = np.floor(poke_round(rolls) * eff[:, None])
+    rolls = poke_round(np.maximum(1, rolls * final_mod[:, None] / 4096))
+    rolls[(eff == 0) | (bp == 0)] = 0
+    return rolls.astype(np.int64)
+
+
+def calc_matchups(poke1: str, poke2: str, bidirectional: bool = False, rolls: bool = False) -> list:
+    """Équivalent natif de run_damage_calc ; lève UnsupportedMechanic hors périmètre.
+
+    Avec bidirectional, chaque entrée porte aussi `reverseMoves` (B → A), et avec rolls
+    chaque move porte ses 16 jets normaux et critiques, comme le worker Node.
+    """
+    sides_a, sides_b = prepare_sides(poke1), prepare_sides(poke2)
+    if not sides_a or not sides_b:
+        raise UnsupportedMechanic("aucun set")
+
+    triples, layout = [], []
+    for a in sides_a:
+        for b in sides_b:
+            forward = len(triples)
+            triples.extend((a, b, move) for _, move in a["moves"])
+            reverse = len(triples)
+            if bidirectional:
+                triples.extend((b, a, move) for _, move in b["moves"])
+            layout.append((a, b, forward, reverse))
+    params = triple_params(triples)
+    damage = calculate_rolls(triples, params=params)
+    crit_damage = calculate_rolls(triples, is_crit=True, params=params).tolist() if rolls else None
+    lows, highs = damage.min(axis=1).tolist(), damage.max(axis=1).tolist()
+    all_rolls = damage.tolist() if rolls else None
+
+    def move_ranges(side: dict, offset: int) -> list:
+        ranges = []
+        for k, (move_name, _) in enumerate(side["moves"]):
+            move = {"name": move_name, "min": lows[offset + k], "max": highs[offset + k]}
+            if rolls:
+                move["rolls"] = all_rolls[offset + k]
+                move["critRolls"] = crit_damage[offset + k]
+            ranges.append(move)
+        return ranges
+
+    results = []
+    for a, b, forward, reverse in layout:
+        entry = {
+            "attacker": a["record"],
+            "defender": b["record"],
+            "moves": move_ranges(a, forward),
+            "setNames": {"a": a["set_name"], "b": b["set_name"]}
+        }
+        if bidirectional:
+            entry["reverseMoves"] = move_ranges(b, reverse)
+        results.append(entry)
+    return results
+
+
+# === Corpus de parité contre @smogon/calc ===
+
+def build_parity_corpus(pairs: int = 200, seed: int = 0, path: str = PARITY_CORPUS_PATH) -> int:
+    """Échantillonne des paires du metagame et fige la sortie Node (à lancer hors-ligne, une fois)."""
+    from core.calc_pool import get_calc_pool
+    from core.metagame_analyzer import load_metagame_data
+
+    # Clés du dex via l'index des noms partagé ("Mr. Mime", "Flabébé", formes) ; noms inconnus écartés
+    index = get_name_index()
+    names = [key for key in dict.fromkeys(index.resolve(n, suggest=False) for n in load_metagame_data()) if key]
+    rng = random.Random(seed)
+    corpus = []
+    pool = get_calc_pool()
+    while len(corpus) < pairs:
+        a, b = rng.sample(names, 2)
+        try:
+            corpus.append({"a": a, "b": b, "entries": pool.damage_calc(a, b)})
+        except RuntimeError:
+            continue
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(corpus, f)
+    return len(corpus)
+
+
+# === CLI ===
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) >= 2 and sys.argv[1] == "build-corpus":
+        count = build_parity_corpus(int(sys.argv[2]) if len(sys.argv) > 2 else 200)
+        print(f"📁 Corpus de parité écrit ({count} paires) dans {PARITY_CORPUS_PATH}")
+    elif len(sys.argv) >= 3:
+        try:
+            for entry in calc_matchups(sys.argv[1], sys.argv[2]):
+                print(f"🧪 {entry['setNames']['a']} vs {entry['setNames']['b']}")
+                for m in entry["moves"]:
+                    print(f"   ⚔️ {m['name']}: {m['min']} - {m['max']}")
+        except UnsupportedMechanic as e:
+            print(f"⚠️ Hors périmètre du moteur natif : {e}")
+    else:
+        print("❌ Usage : python -m core.damage_engine <pokemon1> <pokemon2> | build-corpus [n]")
@@ -0,0 +1,329 @@
+import json
+import os
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from core.calc_pool import CalcWorkerPool
+from core.matchup_cache import diff_set_hashes, get_calc_version, set_content_hash
+from core.metagame_analyzer import load_metagame_data
+from data.pokedex import get_parsed_sets
+from data.name_index import normalize
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TENSOR_DIR = os.path.join(BASE_DIR, "data", "results", "damage_tensor")
+
+MOVE_SLOTS = 4
+NO_DAMAGE = np.iinfo(np.uint16).max  # slot vide ou move invalide
+STAT_KEYS = ["hp", "atk", "def", "spa", "spd", "spe"]
+
+
+# === Construction ===
+
+def set_hash(poke: str, set_key: str) -> str:
+    return set_content_hash(f"{poke}:{set_key[len('strategy: '):]}")
+
+
+def build_set_index(names: List[str]) -> Tuple[List[dict], Dict[str, List[int]]]:
+    """Un index global par set stratégique : [start, stop) par Pokémon."""
+    sets, ranges = [], {}
+    for name in names:
+        start = len(sets)
+        for s in get_parsed_sets(name):
+            key = s.key
+            sets.append({"pokemon": name, "set": key, "hash": set_hash(name, key)})
+        ranges[name] = [start, len(sets)]
+    return sets, ranges
+
+
+def empty_tables(n_sets: int, n_names: int) -> Dict[str, np.ndarray]:
+    return {
+        "dmg_min": np.full((n_sets, n_sets, MOVE_SLOTS), NO_DAMAGE, dtype=np.uint16),
+        "dmg_max": np.full((n_sets, n_sets, MOVE_SLOTS), NO_DAMAGE, dtype=np.uint16),
+        "stats": np.zeros((n_sets, len(STAT_KEYS)), dtype=np.int16),
+        "filled": np.zeros((n_names, n_names), dtype=bool),
+    }
+
+
+def compute_pairs(tables: Dict[str, np.ndarray], names: List[str], sets: List[dict],
+                  requests: Dict[Tuple[str, str], Tuple[str, str]], workers: int) -> int:
+    """Calcule les requêtes Node ({(a[:set], b[:set]): (pokémon a, pokémon b)}) dans les tables.
+
+    Une paire de Pokémon n'est marquée remplie que si toutes ses requêtes ont réussi.
+    Renvoie le nombre de paires de Pokémon remplies.
+    """
+    set_ids = {(s["pokemon"], s["set"]): i for i, s in enumerate(sets)}
+    poke_ids = {name: i for i, name in enumerate(names)}
+    pending = Counter(requests.values())
+    failed = set()
+    lock = threading.Lock()
+    dmg_min, dmg_max, stats, filled = tables["dmg_min"], tables["dmg_max"], tables["stats"], tables["filled"]
+
+    def run_chunk(chunk: List[Tuple[str, str]]) -> int:
+        done = 0
+        for record in pool.stream_batch(pairs=chunk):
+            a, b = requests[tuple(record["pair"])]
+            if record.get("pairDone"):
+                with lock:
+                    pending[(a, b)] -= 1
+                    if record.get("error"):
+                        failed.add((a, b))
+                    elif pending[(a, b)] == 0 and (a, b) not in failed:
+                        filled[poke_ids[a], poke_ids[b]] = True
+                        done += 1
+                continue
+            entry = record["entry"]
+            i = set_ids.get((a, entry["setNames"]["a"]))
+            j = set_ids.get((b, entry["setNames"]["b"]))
+            if i is None or j is None:
+                continue
+            with lock:
+                for side, idx in (("attacker", i), ("defender", j)):
+                    if not stats[idx].any() and "stats" in entry[side]:
+                        stats[idx] = [entry[side]["stats"][k] for k in STAT_KEYS]
+                        sets[idx].update({
+                            "item": entry[side].get("item"),
+                            "ability": entry[side].get("ability"),
+                            "nature": entry[side].get("nature")
+                        })
+                if "moves" not in sets[i]:
+                    sets[i]["moves"] = [m["name"] for m in entry["moves"][:MOVE_SLOTS]]
+            for slot, move in enumerate(entry["moves"][:MOVE_SLOTS]):
+                if "max" in move:
+                    dmg_min[i, j, slot] = min(move["min"], NO_DAMAGE - 1)
+                    dmg_max[i, j, slot] = min(move["max"], NO_DAMAGE - 1)
+        return done
+
+    if not requests:
+        return 0
+    keys = list(requests)
+    chunks = [keys[i::workers] for i in range(workers)]
+    pool = CalcWorkerPool(size=workers)
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return sum(executor.map(run_chunk, chunks))
+    finally:
+        pool.close()
+
+
+def save_tables(out_dir: str, names: List[str], ranges: Dict[str, List[int]], sets: List[dict], tables: Dict[str, np.ndarray]):
+    os.makedirs(out_dir, exist_ok=True)
+    np.save(os.path.join(out_dir, "dmg_min.npy"), tables["dmg_min"])
+    np.save(os.path.join(out_dir, "dmg_max.npy"), tables["dmg_max"])
+    np.save(os.path.join(out_dir, "stats.npy"), tables["stats"])
+    np.save(os.path.join(out_dir, "speed.npy"), tables["stats"][:, STAT_KEYS.index("spe")].copy())
+    np.save(os.path.join(out_dir, "filled.npy"), tables["filled"])
+
+    index = {
+        "calc_version": get_calc_version(),
+        "pokemon": names,
+        "ranges": ranges,
+        "hashes": {name: set_content_hash(name) for name in names},
+        "sets": sets
+    }
+    with open(os.path.join(out_dir, "index.json"), "w", encoding="utf-8") as f:
+        json.dump(index, f)
+
+
+def build_damage_tensor(out_dir: str = TENSOR_DIR, workers: int = 4, names: Optional[List[str]] = None) -> dict:
+    """Calcule min/max de dégâts pour chaque (set attaquant, set défenseur, slot de move)."""
+    if names is None:
+        names = [normalize(n) for n in load_metagame_data()]
+    sets, ranges = build_set_index(names)
+    tables = empty_tables(len(sets), len(names))
+    requests = {(a, b): (a, b) for a in names for b in names if a != b}
+    done = compute_pairs(tables, names, sets, requests, workers)
+    save_tables(out_dir, names, ranges, sets, tables)
+    return {"pokemon": len(names), "sets": len(sets), "pairs": done, "reused": 0, "recomputed": done}
+
+
+def refresh_damage_tensor(out_dir: str = TENSOR_DIR, workers: int = 4, names: Optional[List[str]] = None) -> dict:
+    """Met la table à jour après un nouveau dex / metagame en ne recalculant que les sets modifiés.
+
+    Les blocs (set, set) dont les deux sets ont la même empreinte sont recopiés ; pour un
+    Pokémon dont seuls quelques sets ont changé, on ne redemande au calc que ces sets-là.
+    """
+    old = get_damage_tensor(out_dir)
+    if old is None or old.calc_version != get_calc_version():
+        return build_damage_tensor(out_dir, workers, names)
+    if names is None:
+        names = [normalize(n) for n in load_metagame_data()]
+
+    sets, ranges = build_set_index(names)
+    tables = empty_tables(len(sets), len(names))
+    old_ids = {(s["pokemon"], s["set"]): i for i, s in enumerate(old.sets)}
+    reuse = np.full(len(sets), -1, dtype=np.int64)
+    for i, s in enumerate(sets):
+        j = old_ids.get((s["pokemon"], s["set"]))
+        if j is not None and old.sets[j].get("hash") == s["hash"]:
+            reuse[i] = j
+
+    # Recopie des blocs dont les deux sets sont inchangés
+    new_idx = np.flatnonzero(reuse >= 0)
+    old_idx = reuse[new_idx]
+    for key in ("dmg_min", "dmg_max"):
+        tables[key][np.ix_(new_idx, new_idx)] = np.asarray(getattr(old, key))[np.ix_(old_idx, old_idx)]
+    tables["stats"][new_idx] = np.asarray(old.stats)[old_idx]
+    for i, j in zip(new_idx, old_idx):
+        sets[i].update({k: old.sets[j][k] for k in ("item", "ability", "nature", "moves") if k in old.sets[j]})
+
+    old_set_hashes = {
+        name: {s["set"][len("strategy: "):]: s.get("hash") for s in old.sets[slice(*old.ranges[name])]}
+        for name in old.pokemon
+    }
+    changed = diff_set_hashes(old_set_hashes, names)
+    current = {name: {s["set"][len("strategy: "):] for s in sets[slice(*ranges[name])]} for name in names}
+    poke_ids = {name: i for i, name in enumerate(names)}
+
+    requests, reused = {}, 0
+    for a in names:
+        for b in names:
+            if a == b:
+                continue
+            was_filled = a in old.poke_ids and b in old.poke_ids and old.filled[old.poke_ids[a], old.poke_ids[b]]
+            if not was_filled:
+                requests[(a, b)] = (a, b)
+                continue
+            # Seuls les sets modifiés de chaque côté sont redemandés contre l'autre Pokémon
+            todo = [(f"{a}:{s}", b) for s in changed.get(a, []) if s in current[a]]
+            todo += [(a, f"{b}:{t}") for t in changed.get(b, []) if t in current[b]]
+            if todo:
+                requests.update({pair: (a, b) for pair in todo})
+            else:
+                # Rien de modifié (ou seulement des sets supprimés)
+                tables["filled"][poke_ids[a], poke_ids[b]] = True
+                reused += 1
+
+    recomputed = compute_pairs(tables, names, sets, requests, workers)
+    save_tables(out_dir, names, ranges, sets, tables)
+    return {"pokemon": len(names), "sets": len(sets), "pairs": reused + recomputed, "reused": reused, "recomputed": recomputed}
+
+
+# === Lecture (mmap) ===
+
+class DamageTensor:
+    """Table de dégâts précalculée, lue en mmap : plusieurs process partagent les mêmes pages."""
+
+    def __init__(self, directory: str = TENSOR_DIR):
+        self.directory = directory
+        with open(os.path.join(directory, "index.json"), "r", encoding="utf-8") as f:
+            index = json.load(f)
+        self.calc_version = index["calc_version"]
+        self.pokemon = index["pokemon"]
+        self.poke_ids = {name: i for i, name in enumerate(self.pokemon)}
+        self.ranges = index["ranges"]
+        self.hashes = index["hashes"]
+        self.sets = index["sets"]
+
+        load = lambda name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")
+        self.dmg_min = load("dmg_min")
+        self.dmg_max = load("dmg_max")
+        self.stats = load("stats")
+        self.speed = load("speed")
+        self.filled = load("filled")
+
+    def is_fresh(self, name: str) -> bool:
+        """Le Pokémon est présent et ses sets n'ont pas changé depuis le build."""
+        return name in self.hashes and self.hashes[name] == set_content_hash(name)
+
+    def has(self, poke1: str, poke2: str) -> bool:
+        if self.calc_version != get_calc_version():
+            return False
+        if not (self.is_fresh(poke1) and self.is_fresh(poke2)):
+            return False
+        return bool(self.filled[self.poke_ids[poke1], self.poke_ids[poke2]])
+
+    def set_slice(self, name: str) -> slice:
+        start, stop = self.ranges[name]
+        return slice(start, stop)
+
+    def best_damage(self, poke1: str, poke2: str) -> np.ndarray:
+        """Dégâts max du meilleur move, pour chaque paire de sets (setsA × setsB)."""
+        block = np.asarray(self.dmg_max[self.set_slice(poke1), self.set_slice(poke2)], dtype=np.int32)
+        block[block == NO_DAMAGE] = 0
+        return block.max(axis=2, initial=0)
+
+    def _set_record(self, idx: int) -> dict:
+        meta = self.sets[idx]
+        stats = {k: int(v) for k, v in zip(STAT_KEYS, self.stats[idx])}
+        return {
+            "name": meta["pokemon"],
+            "item": meta.get("item"),
+            "ability": meta.get("ability"),
+            "nature": meta.get("nature"),
+            "stats": stats,
+            "hp": stats["hp"],
+            "speed": int(self.speed[idx])
+        }
+
+    def entries(self, poke1: str, poke2: str) -> list:
+        """Même format que la sortie de run_damage_calc, reconstruit depuis la table."""
+        results = []
+        sa, sb = self.set_slice(poke1), self.set_slice(poke2)
+        for i in range(sa.start, sa.stop):
+            moves = self.sets[i].get("moves", [])
+            for j in range(sb.start, sb.stop):
+                entry_moves = []
+                for slot, move in enumerate(moves):
+                    lo, hi = int(self.dmg_min[i, j, slot]), int(self.dmg_max[i, j, slot])
+                    if hi == NO_DAMAGE:
+                        entry_moves.append({"name": move, "error": "invalid move"})
+                    else:
+                        entry_moves.append({"name": move, "min": lo, "max": hi})
+                results.append({
+                    "attacker": self._set_record(i),
+                    "defender": self._set_record(j),
+                    "moves": entry_moves,
+                    "setNames": {"a": self.sets[i]["set"], "b": self.sets[j]["set"]}
+                })
+        return results
+
+
+_tensor: Optional[DamageTensor] = None
+_tensor_mtime: Optional[float] = None
+
+
+def get_damage_tensor(directory: str = TENSOR_DIR) -> Optional[DamageTensor]:
+    """Table partagée du process, rechargée si le build a changé ; None si absente."""
+    global _tensor, _tensor_mtime
+    index_path = os.path.join(directory, "index.json")
+    if not os.path.exists(index_path):
+        return None
+    mtime = os.path.getmtime(index_path)
+    if _tensor is None or _tensor_mtime != mtime or _tensor.directory != directory:
+        _tensor = DamageTensor(directory)
+        _tensor_mtime = mtime
+    return _tensor
+
+
+# === CLI ===
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Table de dégâts précalculée du metagame")
+    parser.add_argument("command", choices=["build", "refresh", "info"])
+    parser.add_argument("--out", default=TENSOR_DIR)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        print("🧮 Précalcul de la table de dégâts du metagame...")
+        summary = build_damage_tensor(args.out, workers=args.workers)
+        print(f"✅ {summary['pokemon']} Pokémon, {summary['sets']} sets, {summary['pairs']} paires calculées")
+        print(f"📁 Table écrite dans {args.out}")
+    elif args.command == "refresh":
+        print("🔄 Mise à jour incrémentale de la table de dégâts...")
+        summary = refresh_damage_tensor(args.out, workers=args.workers)
+        print(f"✅ {summary['reused']} paires réutilisées, {summary['recomputed']} recalculées "
+              f"({summary['pokemon']} Pokémon, {summary['sets']} sets)")
+        print(f"📁 Table écrite dans {args.out}")
+    else:
+        tensor = get_damage_tensor(args.out)
+        if tensor is None:
+            print("❌ Aucune table trouvée. Lance d'abord : python -m core.damage_tensor build")
+        else:
+            print(f"📦 {len(tensor.pokemon)} Pokémon, {len(tensor.sets)} sets, calc {tensor.calc_version}")
+            print(f"🧩 Paires remplies : {int(np.count_nonzero(tensor.filled))}")
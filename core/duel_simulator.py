@@ -1,17 +1,19 @@
-import json
 import os
-import subprocess
 from collections import Counter
-from typing import Literal
+from typing import Dict, Iterator, List, Literal, Tuple
+
+import numpy as np
+
+from core.calc_pool import get_calc_pool
+from core.damage_engine import PARITY_CORPUS_PATH, UnsupportedMechanic, calc_matchups
+from core.damage_tensor import get_damage_tensor
+from core.matchup_cache import get_matchup_cache
+from data.name_index import normalize
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-SCRIPT_PATH = os.path.join(BASE_DIR, "tools", "callDamageFromJSON.mjs")
 DATA_DIR = os.path.join(BASE_DIR, "data", "results")
 os.makedirs(DATA_DIR, exist_ok=True)
 
-def normalize(name: str) -> str:
-    return name.lower().replace(" ", "").replace("-", "")
-
 def is_valid_set(entry: dict) -> bool:
     # Un set valide doit avoir un vrai nom de stratégie
     return (
@@ -26,53 +28,184 @@ def is_valid_set(entry: dict) -> bool:
         and not entry['setNames']['b'].startswith(('type', 'ability', 'format', 'name', 'hidden'))
     )
 
-def run_damage_calc(poke1: str, poke2: str) -> list:
-    result = subprocess.run(
-        ["node", SCRIPT_PATH, poke1, poke2, "--json"],
-        capture_output=True, text=True, encoding="utf-8"
-    )
-    if result.returncode != 0 or not result.stdout.strip():
-        raise RuntimeError(f"Erreur Node.js :\n{result.stderr}")
+CALC_CACHE_MEMORY = 512
+# "auto" : moteur NumPy natif, repli sur @smogon/calc hors périmètre ; "native" ; "node".
+# Le moteur natif n'est pris par défaut qu'une fois sa parité vérifiée contre @smogon/calc
+# (corpus de python -m core.damage_engine build-corpus, rejoué par tests/test_damage_engine.py).
+DAMAGE_BACKEND = os.environ.get("DAMAGE_BACKEND") or ("auto" if os.path.exists(PARITY_CORPUS_PATH) else "node")
+
+def native_damage_calc(poke1: str, poke2: str, bidirectional: bool = False, rolls: bool = False) -> list | None:
+    """Calcul natif si le backend le permet, None s'il faut passer par Node."""
+    if DAMAGE_BACKEND == "node":
+        return None
     try:
-        return json.loads(result.stdout)
-    except json.JSONDecodeError:
-        raise RuntimeError("❌ Sortie invalide JSON.")
+        return calc_matchups(poke1, poke2, bidirectional=bidirectional, rolls=rolls)
+    except UnsupportedMechanic as e:
+        if DAMAGE_BACKEND == "native":
+            raise RuntimeError(f"Moteur natif : {e}")
+        return None
+
+def run_damage_calc(poke1: str, poke2: str) -> list:
+    # Table précalculée du metagame (python -m core.damage_tensor build) : simple indexation
+    tensor = get_damage_tensor()
+    if tensor is not None and tensor.has(poke1, poke2):
+        return tensor.entries(poke1, poke2)
+
+    native = native_damage_calc(poke1, poke2)
+    if native is not None:
+        return native
+
+    cache = get_matchup_cache("calc", max_memory=CALC_CACHE_MEMORY)
+    cached = cache.get(poke1, poke2)
+    if cached is not None:
+        return cached
+    # Passe par le pool de workers Node persistants (voir core.calc_pool)
+    result = get_calc_pool().damage_calc(poke1, poke2)
+    cache.put(poke1, poke2, result)
+    return result
+
+def run_damage_calc_batch(pairs: List[Tuple[str, str]]) -> Iterator[Tuple[str, str, list, str | None]]:
+    """Envoie toutes les paires en un seul batch et rend (poke1, poke2, entries, erreur)
+    dès qu'une paire de Pokémon est complète, sans attendre la fin du batch."""
+    remaining = []
+    for a, b in pairs:
+        native = native_damage_calc(a, b)
+        if native is None:
+            remaining.append((a, b))
+        else:
+            yield a, b, native, None
+    if not remaining:
+        return
+
+    pending = {}
+    for record in get_calc_pool().stream_batch(pairs=remaining):
+        a, b = record["pair"]
+        if "entry" in record:
+            pending.setdefault((a, b), []).append(record["entry"])
+        if record.get("pairDone"):
+            yield a, b, pending.pop((a, b), []), record.get("error")
+
+def pair_directions(forward: list, reverse: list) -> list:
+    """Ajoute à chaque entrée A → B les moves du sens B → A (`reverseMoves`)."""
+    reverse_moves = {(e['setNames']['a'], e['setNames']['b']): e['moves'] for e in reverse if is_valid_set(e)}
+    paired = []
+    for entry in forward:
+        if not is_valid_set(entry):
+            continue
+        moves = reverse_moves.get((entry['setNames']['b'], entry['setNames']['a']))
+        if moves is not None:
+            paired.append({**entry, "reverseMoves": moves})
+    return paired
+
+def index_matchup(entries: list) -> Dict[Tuple[str, str], dict]:
+    return {
+        (e['setNames']['a'], e['setNames']['b']): e
+        for e in entries if is_valid_set(e) and 'reverseMoves' in e
+    }
+
+def _local_matchup(poke1: str, poke2: str, rolls: bool = False) -> list | None:
+    """Table précalculée puis moteur natif ; None s'il faut passer par Node."""
+    tensor = get_damage_tensor()
+    if not rolls and tensor is not None and tensor.has(poke1, poke2) and tensor.has(poke2, poke1):
+        return pair_directions(tensor.entries(poke1, poke2), tensor.entries(poke2, poke1))
+    return native_damage_calc(poke1, poke2, bidirectional=True, rolls=rolls)
+
+def run_matchup(poke1: str, poke2: str, rolls: bool = False) -> Dict[Tuple[str, str], dict]:
+    """Les deux sens d'un matchup en une passe, indexés par (setA, setB).
+
+    Chaque valeur est une entrée de run_damage_calc (A → B) avec `reverseMoves` (B → A).
+    Avec rolls, chaque move porte aussi ses 16 jets (`rolls`) et ses jets critiques (`critRolls`).
+    """
+    entries = _local_matchup(poke1, poke2, rolls)
+    if entries is None:
+        cache = get_matchup_cache("matchup_rolls" if rolls else "matchup", max_memory=CALC_CACHE_MEMORY)
+        entries = cache.get(poke1, poke2)
+        if entries is None:
+            entries = get_calc_pool().matchup(poke1, poke2, rolls=rolls)
+            cache.put(poke1, poke2, entries)
+    return index_matchup(entries)
+
+def run_matchup_batch(pairs: List[Tuple[str, str]], rolls: bool = False) -> Iterator[Tuple[str, str, Dict[Tuple[str, str], dict], str | None]]:
+    """Version batch de run_matchup : rend (poke1, poke2, matchup, erreur) paire par paire."""
+    cache = get_matchup_cache("matchup_rolls" if rolls else "matchup", max_memory=CALC_CACHE_MEMORY)
+    remaining = []
+    for a, b in pairs:
+        entries = _local_matchup(a, b, rolls)
+        if entries is None:
+            entries = cache.get(a, b)
+        if entries is None:
+            remaining.append((a, b))
+        else:
+            yield a, b, index_matchup(entries), None
+    if not remaining:
+        return
+
+    pending = {}
+    for record in get_calc_pool().stream_batch(pairs=remaining, bidirectional=True, rolls=rolls):
+        a, b = record["pair"]
+        if "entry" in record:
+            pending.setdefault((a, b), []).append(record["entry"])
+        if record.get("pairDone"):
+            entries = pending.pop((a, b), [])
+            if not record.get("error"):
+                cache.put(a, b, entries)
+            yield a, b, index_matchup(entries), record.get("error")
 
 def best_move_damage(moves: list[dict]) -> int:
     return max((m['max'] for m in moves if 'max' in m), default=0)
 
+# Verdicts du résolveur batch (int8)
+WIN, DRAW, LOSS = 1, 0, -1
+VERDICT_NAMES = {WIN: 'win', DRAW: 'draw', LOSS: 'loss'}
+
+def verdicts_from_turns(turnsA, turnsB, speedA, speedB, max_turns: int = 8) -> np.ndarray:
+    """Verdicts à partir du nombre de tours dont chaque camp a besoin pour mettre KO l'autre."""
+    turnsA, turnsB = np.asarray(turnsA), np.asarray(turnsB)
+    speedA, speedB = np.asarray(speedA), np.asarray(speedB)
+    koA = turnsA <= max_turns
+    koB = turnsB <= max_turns
+
+    faster, slower = speedA > speedB, speedA < speedB
+    win = koA & np.where(faster, turnsA <= turnsB, turnsA < turnsB)
+    loss = koB & np.where(slower, turnsB <= turnsA, turnsB < turnsA)
+
+    verdicts = np.zeros(win.shape, dtype=np.int8)
+    verdicts[win] = WIN
+    verdicts[loss] = LOSS
+    return verdicts
+
+def resolve_duels_batch(hpA, hpB, speedA, speedB, dmgA, dmgB, max_turns: int = 8) -> np.ndarray:
+    """Résout N duels d'un coup : 1 = victoire de A, 0 = nul, -1 = défaite.
+
+    Avec des dégâts fixes à chaque tour, l'issue ne dépend que du nombre de tours
+    nécessaires à chaque camp pour mettre KO l'autre et de l'ordre de vitesse.
+    """
+    hpA, hpB = np.asarray(hpA, dtype=np.float64), np.asarray(hpB, dtype=np.float64)
+    dmgA, dmgB = np.asarray(dmgA, dtype=np.float64), np.asarray(dmgB, dtype=np.float64)
+
+    # Tours avant KO (inf si aucun dégât)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        turnsA = np.where(dmgA > 0, np.ceil(hpB / dmgA), np.inf)
+        turnsB = np.where(dmgB > 0, np.ceil(hpA / dmgB), np.inf)
+    return verdicts_from_turns(turnsA, turnsB, speedA, speedB, max_turns)
+
 def simulate_multi_turn_duel(setA: dict, setB: dict, movesA: list[dict], movesB: list[dict], max_turns: int = 8) -> Literal['win', 'loss', 'draw']:
-    hpA, hpB = setA['hp'], setB['hp']
-    speedA, speedB = setA['speed'], setB['speed']
-
-    for _ in range(max_turns):
-        dmgA = best_move_damage(movesA)
-        dmgB = best_move_damage(movesB)
-
-        if speedA > speedB:
-            hpB -= dmgA
-            if hpB <= 0:
-                return 'win'
-            hpA -= dmgB
-            if hpA <= 0:
-                return 'loss'
-        elif speedB > speedA:
-            hpA -= dmgB
-            if hpA <= 0:
-                return 'loss'
-            hpB -= dmgA
-            if hpB <= 0:
-                return 'win'
-        else:
-            hpB -= dmgA
-            hpA -= dmgB
-            if hpA <= 0 and hpB <= 0:
-                return 'draw'
-            elif hpB <= 0:
-                return 'win'
-            elif hpA <= 0:
-                return 'loss'
-    return 'draw'
+    verdict = resolve_duels_batch(
+        setA['hp'], setB['hp'], setA['speed'], setB['speed'],
+        best_move_damage(movesA), best_move_damage(movesB), max_turns
+    )
+    return VERDICT_NAMES[int(verdict)]
+
+def resolve_matchup(matchup: Dict[Tuple[str, str], dict], max_turns: int = 8) -> np.ndarray:
+    """Verdicts de toutes les paires de sets d'un matchup (voir run_matchup), dans l'ordre du dict."""
+    entries = list(matchup.values())
+    return resolve_duels_batch(
+        [e['attacker']['hp'] for e in entries], [e['defender']['hp'] for e in entries],
+        [e['attacker']['speed'] for e in entries], [e['defender']['speed'] for e in entries],
+        [best_move_damage(e['moves']) for e in entries],
+        [best_move_damage(e['reverseMoves']) for e in entries],
+        max_turns
+    )
 
 def duel_summary(poke1: str, poke2: str):
     poke1 = normalize(poke1)
@@ -80,42 +213,17 @@ def duel_summary(poke1: str, poke2: str):
     print(f"\n⚔️ Simulation de tous les duels entre {poke1} et {poke2}...")
 
     try:
-        raw_output = run_damage_calc(poke1, poke2)
+        matchup = run_matchup(poke1, poke2)
     except Exception as e:
         print(f"❌ Erreur lors du calcul de dégâts : {e}")
         return
 
-    raw = [entry for entry in raw_output if is_valid_set(entry)]
-
-    if not raw:
+    if not matchup:
         print("⚠️ Aucun set valide trouvé après filtrage. Vérifie le fichier JSON ou les noms des Pokémon.")
         return
 
-    damage_map = {}
-    set_pairs = []
-
-    for entry in raw:
-        setA = entry['attacker']
-        setB = entry['defender']
-        key = (entry['setNames']['a'], entry['setNames']['b'])
-        damage_map[key] = entry['moves']
-        set_pairs.append((setA, setB, key))
-
-    results = []
-    for setA, setB, key in set_pairs:
-        reverse_key = (key[1], key[0])
-        movesA = damage_map[key]
-        movesB = damage_map.get(reverse_key)
-
-        if not movesB:
-            reverse_raw = [e for e in run_damage_calc(normalize(setB['name']), normalize(setA['name'])) if is_valid_set(e)]
-            for r in reverse_raw:
-                k = (r['setNames']['a'], r['setNames']['b'])
-                damage_map[k] = r['moves']
-            movesB = damage_map.get(reverse_key, [])
-
-        verdict = simulate_multi_turn_duel(setA, setB, movesA, movesB)
-        results.append((key[0], key[1], verdict))
+    verdicts = resolve_matchup(matchup)
+    results = [(key[0], key[1], VERDICT_NAMES[int(v)]) for key, v in zip(matchup, verdicts)]
 
     counter = Counter(v for _, _, v in results)
     total = len(results)
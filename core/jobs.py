@@ -0,0 +1,89 @@
+import itertools
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+
+class JobCancelled(Exception):
+    """Levée dans le calcul au prochain point de progression après une annulation."""
+
+
+class Job:
+    """Un calcul lancé en arrière-plan : progression partielle, résultat, annulation."""
+
+    def __init__(self, job_id: int, label: str):
+        self.id = job_id
+        self.label = label
+        self.status = "pending"  # pending | running | done | cancelled | error
+        self.result = None
+        self.error: Optional[str] = None
+        self.events: List[dict] = []
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+
+    def report(self, event: dict):
+        """Callback de progression passé au calcul ; interrompt le calcul si le job est annulé."""
+        if self._cancel.is_set():
+            raise JobCancelled()
+        with self._lock:
+            self.events.append(event)
+
+    def cancel(self):
+        self._cancel.set()
+
+    def events_since(self, start: int = 0) -> List[dict]:
+        with self._lock:
+            return list(self.events[start:])
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "cancelled", "error")
+
+
+class JobRunner:
+    """Exécute les calculs dans le process courant : metagame, index et caches restent chauds.
+
+    Un seul job tourne à la fois (les calculs partagent les caches de duels) ; les
+    suivants attendent dans la file.
+    """
+
+    def __init__(self, workers: int = 1):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self._ids = itertools.count(1)
+        self.jobs: Dict[int, Job] = {}
+
+    def submit(self, label: str, fn: Callable, *args, **kwargs) -> Job:
+        """Lance fn(*args, progress=job.report, **kwargs) en arrière-plan."""
+        job = Job(next(self._ids), label)
+        self.jobs[job.id] = job
+
+        def run():
+            if job._cancel.is_set():
+                job.status = "cancelled"
+                return
+            job.status = "running"
+            try:
+                job.result = fn(*args, progress=job.report, **kwargs)
+                job.status = "done"
+            except JobCancelled:
+                job.status = "cancelled"
+            except Exception as e:
+                job.error = f"{e}\n{traceback.format_exc()}"
+                job.status = "error"
+
+        self._executor.submit(run)
+        return job
+
+    def get(self, job_id: int) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+
+_runner: Optional[JobRunner] = None
+
+
+def get_job_runner() -> JobRunner:
+    global _runner
+    if _runner is None:
+        _runner = JobRunner()
+    return _runner
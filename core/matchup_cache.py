@@ -0,0 +1,218 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from data.pokedex import get_all_sets, get_pokedex
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_PATH = os.path.join(BASE_DIR, "data", "results", "matchup_cache.sqlite")
+PACKAGE_LOCK_PATH = os.path.join(BASE_DIR, "tools", "package-lock.json")
+INSTALLED_CALC_PATH = os.path.join(BASE_DIR, "tools", "node_modules", "@smogon", "calc", "package.json")
+
+DEFAULT_MEMORY_SIZE = 4096
+
+_MISSING = object()
+
+
+@lru_cache(maxsize=1)
+def get_calc_version() -> str:
+    """Version de @smogon/calc : celle installée si possible, sinon celle du lockfile."""
+    try:
+        with open(INSTALLED_CALC_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)["version"]
+    except (OSError, KeyError, json.JSONDecodeError):
+        pass
+    try:
+        with open(PACKAGE_LOCK_PATH, "r", encoding="utf-8") as f:
+            lock = json.load(f)
+        return lock["packages"]["node_modules/@smogon/calc"]["version"]
+    except (OSError, KeyError, json.JSONDecodeError):
+        return "unknown"
+
+
+# Empreintes mémorisées pour le dex chargé : vidées quand refresh_pokedex() en charge un autre
+_hashes: Dict[str, str] = {}
+_hashes_source: Optional[dict] = None
+
+
+def set_content_hash(name: str) -> str:
+    """Empreinte des sets parsés d'un Pokémon (`nom` ou `nom:set`)."""
+    global _hashes_source
+    dex = get_pokedex()
+    if dex is not _hashes_source:
+        _hashes.clear()
+        _hashes_source = dex
+    if name not in _hashes:
+        poke, _, set_key = name.partition(":")
+        sets = get_all_sets(poke)
+        if set_key:
+            sets = [s for s in sets if s["name"] == set_key.strip()]
+        payload = json.dumps([poke.lower(), sets], sort_keys=True)
+        _hashes[name] = hashlib.sha1(payload.encode("utf-8")).hexdigest()
+    return _hashes[name]
+
+
+def set_hashes(name: str) -> Dict[str, str]:
+    """Empreinte de chaque set stratégique d'un Pokémon, indexée par nom de set."""
+    return {s["name"]: set_content_hash(f"{name}:{s['name']}") for s in get_all_sets(name)}
+
+
+def diff_set_hashes(old: Dict[str, Dict[str, str]], names: List[str]) -> Dict[str, List[str]]:
+    """Sets ajoutés, modifiés ou supprimés depuis `old` ({pokémon: {set: hash}}), par Pokémon.
+
+    Un Pokémon absent de `old` apparaît avec tous ses sets.
+    """
+    changed = {}
+    for name in names:
+        current = set_hashes(name)
+        previous = old.get(name)
+        if previous is None:
+            changed[name] = list(current)
+            continue
+        sets = [k for k, h in current.items() if previous.get(k) != h]
+        sets += [k for k in previous if k not in current]
+        if sets:
+            changed[name] = sets
+    return changed
+
+
+class MatchupCache:
+    """Cache de matchups à deux niveaux : LRU en mémoire devant un fichier SQLite.
+
+    S'utilise comme un dict indexé par (poke1, poke2). La clé réelle est un hash des
+    sets parsés des deux Pokémon, de la version du calc et de `version` (format des
+    valeurs stockées) : un nouveau dex, une nouvelle version de @smogon/calc ou un
+    changement de format des résumés invalide donc les entrées concernées.
+    """
+
+    def __init__(self, namespace: str, path: Optional[str] = CACHE_PATH, max_memory: int = DEFAULT_MEMORY_SIZE,
+                 version: int = 1):
+        self.namespace = namespace
+        self.version = version
+        self.path = path
+        self.max_memory = max_memory
+        self._memory: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    # === Stockage ===
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        if self.path is None:
+            return None
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS matchups (key TEXT PRIMARY KEY, namespace TEXT, value TEXT)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def make_key(self, poke1: str, poke2: str) -> str:
+        raw = "|".join([
+            self.namespace, str(self.version), get_calc_version(), set_content_hash(poke1), set_content_hash(poke2)
+        ])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _remember(self, key: str, value: Any):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory:
+            self._memory.popitem(last=False)
+
+    def _lookup(self, key: str, count: bool) -> Any:
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                if count:
+                    self.memory_hits += 1
+                return self._memory[key]
+
+            conn = self._connection()
+            row = conn.execute("SELECT value FROM matchups WHERE key = ?", (key,)).fetchone() if conn else None
+            if row is None:
+                if count:
+                    self.misses += 1
+                return _MISSING
+
+            value = json.loads(row[0])
+            self._remember(key, value)
+            if count:
+                self.disk_hits += 1
+            return value
+
+    # === API ===
+
+    def get(self, poke1: str, poke2: str, default: Any = None) -> Any:
+        value = self._lookup(self.make_key(poke1, poke2), count=True)
+        return default if value is _MISSING else value
+
+    def put(self, poke1: str, poke2: str, value: Any):
+        key = self.make_key(poke1, poke2)
+        with self._lock:
+            self._remember(key, value)
+            # Les erreurs restent en mémoire seulement : on retentera au prochain lancement
+            if isinstance(value, dict) and "error" in value:
+                return
+            conn = self._connection()
+            if conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO matchups (key, namespace, value) VALUES (?, ?, ?)",
+                    (key, self.namespace, json.dumps(value))
+                )
+                conn.commit()
+
+    def __contains__(self, pair: Tuple[str, str]) -> bool:
+        return self._lookup(self.make_key(*pair), count=True) is not _MISSING
+
+    def __getitem__(self, pair: Tuple[str, str]) -> Any:
+        value = self._lookup(self.make_key(*pair), count=False)
+        if value is _MISSING:
+            raise KeyError(pair)
+        return value
+
+    def __setitem__(self, pair: Tuple[str, str], value: Any):
+        self.put(pair[0], pair[1], value)
+
+    def stats(self) -> dict:
+        hits = self.memory_hits + self.disk_hits
+        total = hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(100 * hits / total, 1) if total else 0.0,
+            "memory_size": len(self._memory)
+        }
+
+    def clear_memory(self):
+        with self._lock:
+            self._memory.clear()
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_caches: Dict[Tuple[str, int], MatchupCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_matchup_cache(namespace: str = "duel", max_memory: int = DEFAULT_MEMORY_SIZE, version: int = 1) -> MatchupCache:
+    """Cache partagé du process pour un type de résultat ("duel", "calc", ...) et un format de valeurs."""
+    with _caches_lock:
+        if (namespace, version) not in _caches:
+            _caches[(namespace, version)] = MatchupCache(namespace, path=CACHE_PATH, max_memory=max_memory, version=version)
+        return _caches[(namespace, version)]
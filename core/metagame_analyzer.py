@@ -1,19 +1,132 @@
+import heapq
 import json
+import os
 from collections import Counter, defaultdict
-from typing import List, Tuple, Dict, Optional
+from itertools import combinations
+from typing import Iterable, List, Tuple, Dict, Optional
 
-DATA_PATH = "C:/Users/rapha/Desktop/AI TeamBuilder/data/parsed_metagame.json"
+from data.name_index import get_name_index, normalize
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_PATH = os.path.join(BASE_DIR, "data", "parsed_metagame.json")
 
 # === Chargement des données ===
 
-def load_metagame_data(path: str = DATA_PATH) -> dict:
+class MetagameStore:
+    """Metagame chargé à la première utilisation, rechargé seulement si le fichier change.
+
+    Les classements par usage et par viabilité sont triés une fois par chargement :
+    un top N n'est plus qu'une tranche.
+    """
+
+    def __init__(self, path: str = DATA_PATH):
+        self.path = path
+        self._mtime: Optional[float] = None
+        self._data: dict = {}
+        self._by_usage: List[Tuple[str, int]] = []
+        self._by_viability: List[Tuple[str, int]] = []
+        self._normalized: Dict[str, str] = {}
+        self._cores: Dict[Tuple[float, int], List[List[str]]] = {}
+        self._graphs: Dict[float, Dict[str, set]] = {}
+        self._summaries: Dict[tuple, dict] = {}
+
+    def _refresh(self):
+        mtime = os.path.getmtime(self.path)
+        if mtime == self._mtime:
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        self._by_usage = sorted(((n, e.get("raw_count", 0)) for n, e in data.items()), key=lambda x: x[1], reverse=True)
+        self._by_viability = sorted(((n, e.get("viability_ceiling", 0)) for n, e in data.items()), key=lambda x: x[1], reverse=True)
+        self._normalized = {normalize(n): n for n in data}
+        self._cores, self._graphs, self._summaries = {}, {}, {}
+        self._data, self._mtime = data, mtime
+
+    @property
+    def data(self) -> dict:
+        self._refresh()
+        return self._data
+
+    def names(self) -> List[str]:
+        return list(self.data)
+
+    def entry(self, name: str) -> Optional[dict]:
+        """Entrée d'un Pokémon, quel que soit le format du nom ("Great Tusk", "greattusk", "Great Tsuk")."""
+        data = self.data
+        if name in data:
+            return data[name]
+        key = self._normalized.get(normalize(name))
+        if key is None:
+            # Formes et fautes de frappe : via l'index des noms du dex
+            key = self._normalized.get(get_name_index().resolve(name) or "")
+        return data.get(key) if key else None
+
+    def top_usage(self, top_n: Optional[int] = None) -> List[Tuple[str, int]]:
+        self._refresh()
+        return self._by_usage[:top_n]
+
+    def top_viability(self, top_n: Optional[int] = None) -> List[Tuple[str, int]]:
+        self._refresh()
+        return self._by_viability[:top_n]
+
+    def teammate_graph(self, min_pct: float = 15.0) -> Dict[str, set]:
+        data = self.data
+        if min_pct not in self._graphs:
+            self._graphs[min_pct] = teammate_graph(data, min_pct)
+        return self._graphs[min_pct]
+
+    def common_cores(self, min_pct: float = 15.0, max_depth: int = 3) -> List[List[str]]:
+        """detect_common_cores mémorisé par (min_pct, taille max) jusqu'au prochain rechargement."""
+        data = self.data
+        key = (min_pct, max_depth)
+        if key not in self._cores:
+            self._cores[key] = detect_common_cores(data, min_pct, max_depth, self.teammate_graph(min_pct))
+        return self._cores[key]
+
+    def summary(self, pokemon: Optional[Iterable[str]] = None, tier: Optional[str] = None, top_n: int = 10) -> dict:
+        """summarize_metagame mémorisé par filtre jusqu'au prochain rechargement."""
+        data = self.data
+        # Un générateur ne se lit qu'une fois : l'ensemble sert à la clé puis au calcul
+        if pokemon is not None:
+            pokemon = frozenset(normalize(name) for name in pokemon)
+        key = (pokemon, tier, top_n)
+        if key not in self._summaries:
+            self._summaries[key] = compute_summary(data, pokemon, tier, top_n)
+        return self._summaries[key]
+
+
+_store: Optional[MetagameStore] = None
+
+def get_metagame_store() -> MetagameStore:
+    global _store
+    if _store is None:
+        _store = MetagameStore()
+    return _store
+
+def load_metagame_data(path: str = DATA_PATH, month: Optional[str] = None) -> dict:
+    # Mois passé : reconstruit depuis l'historique en colonnes (core/metagame_history.py)
+    if month is not None:
+        from core.metagame_history import load_history
+        history = load_history()
+        if history is None or month not in history.months:
+            raise KeyError(f"Mois absent de l'historique : {month}")
+        return history.snapshot(month)
+    # Fichier par défaut : données partagées du store (pas de relecture si le fichier n'a pas changé)
+    if path == DATA_PATH:
+        return get_metagame_store().data
     with open(path, "r", encoding="utf-8") as f:
         return json.load(f)
 
 # === Fonctions d’accès direct ===
 
 def get_metagame_entry(name: str, data: dict) -> Optional[dict]:
-    return data.get(name) or data.get(name.lower().replace(" ", "").replace("-", ""))
+    store = get_metagame_store()
+    if data is store.data:
+        return store.entry(name)
+    if name in data:
+        return data[name]
+    target = get_name_index().resolve(name) or normalize(name)
+    return next((entry for key, entry in data.items() if normalize(key) == target), None)
 
 def get_all_pokemon(data: dict) -> List[str]:
     return list(data.keys())
@@ -21,11 +134,17 @@ def get_all_pokemon(data: dict) -> List[str]:
 # === Analyses globales ===
 
 def get_most_common_pokemon(data: dict, top_n: int = 10) -> List[Tuple[str, int]]:
+    store = get_metagame_store()
+    if data is store.data:
+        return store.top_usage(top_n)
     usage = [(name, stats.get("raw_count", 0)) for name, stats in data.items()]
     usage.sort(key=lambda x: x[1], reverse=True)
     return usage[:top_n]
 
 def get_top_threats(data: dict, top_n: int = 10) -> List[Tuple[str, int]]:
+    store = get_metagame_store()
+    if data is store.data:
+        return store.top_viability(top_n)
     viability = [(name, stats.get("viability_ceiling", 0)) for name, stats in data.items()]
     viability.sort(key=lambda x: x[1], reverse=True)
     return viability[:top_n]
@@ -83,58 +202,95 @@ def get_checks_and_counters(pokemon: str, data: dict, top_n: int = 5) -> List[Tu
     counters = info.get("checks_counters", [])[:top_n]
     return [(entry["name"], entry["detail"]) for entry in counters]
 
-def detect_common_cores(data: dict, min_pct: float = 15.0, max_depth: int = 3) -> List[List[str]]:
-    """Détecte les cores récurrents à 2 ou 3 Pokémon basés sur les co-teammates fréquents."""
-    cores = []
-    seen = set()
-
+def teammate_graph(data: dict, min_pct: float = 15.0) -> Dict[str, set]:
+    """Relation "coéquipiers réciproques" : A–B si chacun apparaît avec l'autre dans au moins min_pct % des équipes."""
+    graph = defaultdict(set)
     for pkmn, info in data.items():
-        teammates = info.get("teammates", {})
-        relevant_mates = [mate for mate, pct in teammates.items() if pct >= min_pct]
-
-        for mate in relevant_mates:
-            # Éviter les doublons d’ordre (A,B) == (B,A)
-            core2 = tuple(sorted([pkmn, mate]))
-            if core2 in seen:
-                continue
-
-            # Check si la relation est réciproque
-            mate_info = data.get(mate, {})
-            mate_teammates = mate_info.get("teammates", {})
-
-            if mate_teammates.get(pkmn, 0) >= min_pct:
-                cores.append(list(core2))
-                seen.add(core2)
-
-                # Essayer de compléter avec un 3e partenaire
-                if max_depth >= 3:
-                    for third in relevant_mates:
-                        if third == mate:
-                            continue
-                        third_info = data.get(third, {})
-                        third_teammates = third_info.get("teammates", {})
-                        if (
-                            third_teammates.get(pkmn, 0) >= min_pct and
-                            third_teammates.get(mate, 0) >= min_pct
-                        ):
-                            core3 = tuple(sorted([pkmn, mate, third]))
-                            if core3 not in seen:
-                                cores.append(list(core3))
-                                seen.add(core3)
-
-    return cores
+        for mate, pct in info.get("teammates", {}).items():
+            if pct >= min_pct and mate != pkmn and data.get(mate, {}).get("teammates", {}).get(pkmn, 0) >= min_pct:
+                graph[pkmn].add(mate)
+                graph[mate].add(pkmn)
+    return dict(graph)
+
+def maximal_cliques(graph: Dict[str, set]) -> List[set]:
+    """Bron–Kerbosch avec pivot : toutes les cliques maximales (au moins 2 sommets) du graphe."""
+    cliques = []
+
+    def expand(r: set, p: set, x: set):
+        if not p and not x:
+            if len(r) >= 2:
+                cliques.append(r)
+            return
+        # Pivot = sommet qui couvre le plus de candidats : ses voisins seront atteints via sa branche
+        pivot = max(p | x, key=lambda v: len(graph[v] & p))
+        for v in list(p - graph[pivot]):
+            expand(r | {v}, p & graph[v], x & graph[v])
+            p.discard(v)
+            x.add(v)
+
+    expand(set(), set(graph), set())
+    return cliques
+
+def detect_common_cores(data: dict, min_pct: float = 15.0, max_depth: int = 3, graph: Dict[str, set] = None) -> List[List[str]]:
+    """Cores récurrents de 2 à max_depth Pokémon : cliques du graphe des coéquipiers réciproques.
+
+    Chaque clique maximale fournit tous ses sous-cores de taille <= max_depth ;
+    résultat trié par taille puis par nom.
+    """
+    if graph is None:
+        graph = teammate_graph(data, min_pct)
+    cores = set()
+    for clique in maximal_cliques(graph):
+        members = sorted(clique)
+        for k in range(2, min(max_depth, len(members)) + 1):
+            cores.update(combinations(members, k))
+    return [list(core) for core in sorted(cores, key=lambda c: (len(c), c))]
 
 # === Résumé global du méta ===
 
-def summarize_metagame(data: dict) -> dict:
-    return {
-        "top_pokemon": get_most_common_pokemon(data, top_n=10),
-        "top_threats": get_top_threats(data, top_n=10),
-        "common_moves": get_most_common_moves(data, top_n=10),
-        "common_items": get_most_common_items(data, top_n=10),
-        "common_tera_types": get_most_common_tera_types(data, top_n=10),
-        "common_cores": get_most_common_teammates(data, top_n=10)
+# Champs cumulés par summarize_metagame : clé du résumé → clé des entrées
+SUMMARY_FIELDS = {
+    "common_moves": "moves",
+    "common_items": "items",
+    "common_tera_types": "tera_types",
+    "common_cores": "teammates",
+}
+
+def select_entries(data: dict, pokemon: Optional[Iterable[str]] = None, tier: Optional[str] = None) -> List[Tuple[str, dict]]:
+    """Entrées retenues pour un résumé : liste de Pokémon (noms quelconques) et/ou tier du dex ("ou", "uu"...)."""
+    entries = list(data.items())
+    if pokemon is not None:
+        wanted = {normalize(name) for name in pokemon}
+        entries = [(name, entry) for name, entry in entries if normalize(name) in wanted]
+    if tier is not None:
+        from data.pokedex import get_tier
+        entries = [(name, entry) for name, entry in entries if get_tier(normalize(name)).lower() == tier.lower()]
+    return entries
+
+def compute_summary(data: dict, pokemon: Optional[Iterable[str]] = None, tier: Optional[str] = None, top_n: int = 10) -> dict:
+    """Un seul passage sur les entrées pour tous les compteurs, puis heapq.nlargest pour chaque top."""
+    entries = select_entries(data, pokemon, tier)
+    counters = {field: defaultdict(float) for field in SUMMARY_FIELDS}
+    for _, entry in entries:
+        for field, key in SUMMARY_FIELDS.items():
+            counter = counters[field]
+            for name, pct in entry.get(key, {}).items():
+                counter[name] += pct
+
+    summary = {
+        "top_pokemon": heapq.nlargest(top_n, ((n, e.get("raw_count", 0)) for n, e in entries), key=lambda x: x[1]),
+        "top_threats": heapq.nlargest(top_n, ((n, e.get("viability_ceiling", 0)) for n, e in entries), key=lambda x: x[1]),
     }
+    for field, counter in counters.items():
+        summary[field] = heapq.nlargest(top_n, counter.items(), key=lambda x: x[1])
+    return summary
+
+def summarize_metagame(data: dict, pokemon: Optional[Iterable[str]] = None, tier: Optional[str] = None, top_n: int = 10) -> dict:
+    """Résumé du méta, éventuellement restreint à une liste de Pokémon ou à un tier."""
+    store = get_metagame_store()
+    if data is store.data:
+        return store.summary(pokemon, tier, top_n)
+    return compute_summary(data, pokemon, tier, top_n)
 
 # === Test CLI ===
 
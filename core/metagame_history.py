@@ -0,0 +1,242 @@
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HISTORY_DIR = os.path.join(BASE_DIR, "data", "results", "metagame_history")
+
+# Champs {libellé: %} des entrées de parsed_metagame.json
+DICT_FIELDS = ["abilities", "items", "spreads", "moves", "tera_types", "teammates"]
+ENTRY_DTYPE = np.dtype([("month", np.int16), ("pokemon", np.int16), ("label", np.int32), ("value", np.float64)])
+CHECK_DTYPE = np.dtype([("month", np.int16), ("pokemon", np.int16), ("name", np.int32), ("detail", np.int32)])
+
+
+class MetagameHistory:
+    """Snapshots mensuels du metagame en colonnes.
+
+    raw_count / viability / rank : tableaux (mois, Pokémon), rank = position dans le
+    fichier du mois (-1 si absent). Les champs à libellés
+    (moves, items...) sont des tables creuses (mois, Pokémon, libellé, valeur) : un
+    mois se reconstruit sans relire de JSON et les tendances se calculent en un seul
+    passage vectoriel sur tout le metagame.
+    """
+
+    def __init__(self):
+        self.months: List[str] = []
+        self.pokemon: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.labels: Dict[str, List[str]] = {field: [] for field in DICT_FIELDS + ["checks_counters"]}
+        self.raw_count = np.zeros((0, 0), dtype=np.int64)
+        self.viability = np.zeros((0, 0), dtype=np.int16)
+        self.rank = np.zeros((0, 0), dtype=np.int16)
+        self.entries = {field: np.zeros(0, dtype=ENTRY_DTYPE) for field in DICT_FIELDS}
+        self.checks = np.zeros(0, dtype=CHECK_DTYPE)
+
+    # === Écriture ===
+
+    def _pokemon_id(self, name: str) -> int:
+        if name not in self.index:
+            self.index[name] = len(self.pokemon)
+            self.pokemon.append(name)
+        return self.index[name]
+
+    def add_month(self, month: str, data: dict):
+        """Ajoute (ou remplace) un mois au format parsed_metagame.json ; les mois restent triés."""
+        if month in self.months:
+            self._drop_month(self.months.index(month))
+        ids = [self._pokemon_id(name) for name in data]
+        m, p = len(self.months), len(self.pokemon)
+
+        def grow(table: np.ndarray, fill: int = 0) -> np.ndarray:
+            out = np.full((m + 1, p), fill, dtype=table.dtype)
+            out[:table.shape[0], :table.shape[1]] = table
+            return out
+
+        self.raw_count, self.viability, self.rank = grow(self.raw_count), grow(self.viability), grow(self.rank, -1)
+        self.raw_count[m, ids] = [entry.get("raw_count", 0) for entry in data.values()]
+        self.viability[m, ids] = [entry.get("viability_ceiling", 0) for entry in data.values()]
+        self.rank[m, ids] = np.arange(len(ids))
+
+        for field in DICT_FIELDS:
+            vocab = {label: i for i, label in enumerate(self.labels[field])}
+            rows = []
+            for pid, entry in zip(ids, data.values()):
+                for label, value in entry.get(field, {}).items():
+                    if label not in vocab:
+                        vocab[label] = len(self.labels[field])
+                        self.labels[field].append(label)
+                    rows.append((m, pid, vocab[label], value))
+            self.entries[field] = np.concatenate([self.entries[field], np.array(rows, dtype=ENTRY_DTYPE)])
+
+        vocab = {label: i for i, label in enumerate(self.labels["checks_counters"])}
+        rows = []
+        for pid, entry in zip(ids, data.values()):
+            for check in entry.get("checks_counters", []):
+                for text in (check["name"], check["detail"]):
+                    if text not in vocab:
+                        vocab[text] = len(self.labels["checks_counters"])
+                        self.labels["checks_counters"].append(text)
+                rows.append((m, pid, vocab[check["name"]], vocab[check["detail"]]))
+        self.checks = np.concatenate([self.checks, np.array(rows, dtype=CHECK_DTYPE)])
+
+        self.months.append(month)
+        self._sort_months()
+
+    def _drop_month(self, m: int):
+        keep = np.arange(len(self.months)) != m
+        self.raw_count, self.viability, self.rank = self.raw_count[keep], self.viability[keep], self.rank[keep]
+        for field in DICT_FIELDS:
+            table = self.entries[field]
+            table = table[table["month"] != m]
+            table["month"] -= table["month"] > m
+            self.entries[field] = table
+        self.checks = self.checks[self.checks["month"] != m]
+        self.checks["month"] -= self.checks["month"] > m
+        del self.months[m]
+
+    def _sort_months(self):
+        order = np.argsort(self.months, kind="stable")
+        if (order == np.arange(len(order))).all():
+            return
+        remap = np.empty_like(order)
+        remap[order] = np.arange(len(order))
+        self.months = [self.months[i] for i in order]
+        self.raw_count, self.viability, self.rank = self.raw_count[order], self.viability[order], self.rank[order]
+        for table in list(self.entries.values()) + [self.checks]:
+            table["month"] = remap[table["month"]]
+
+    def save(self, directory: str = HISTORY_DIR):
+        """Un .npy par colonne ; index.json écrit en dernier sert de marqueur de version."""
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, "raw_count.npy"), self.raw_count)
+        np.save(os.path.join(directory, "viability.npy"), self.viability)
+        np.save(os.path.join(directory, "rank.npy"), self.rank)
+        for field in DICT_FIELDS:
+            np.save(os.path.join(directory, f"{field}.npy"), self.entries[field])
+        np.save(os.path.join(directory, "checks_counters.npy"), self.checks)
+        with open(os.path.join(directory, "index.json"), "w", encoding="utf-8") as f:
+            json.dump({"months": self.months, "pokemon": self.pokemon, "labels": self.labels}, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, directory: str = HISTORY_DIR) -> "MetagameHistory":
+        history = cls()
+        with open(os.path.join(directory, "index.json"), "r", encoding="utf-8") as f:
+            index = json.load(f)
+        history.months, history.pokemon, history.labels = index["months"], index["pokemon"], index["labels"]
+        history.index = {name: i for i, name in enumerate(history.pokemon)}
+        load = lambda name: np.load(os.path.join(directory, f"{name}.npy"))
+        history.raw_count, history.viability, history.rank = load("raw_count"), load("viability"), load("rank")
+        history.entries = {field: load(field) for field in DICT_FIELDS}
+        history.checks = load("checks_counters")
+        return history
+
+    # === Lecture ===
+
+    @property
+    def present(self) -> np.ndarray:
+        return self.rank >= 0
+
+    def snapshot(self, month: str) -> dict:
+        """Un mois au format parsed_metagame.json (ordre du fichier d'origine), prêt pour metagame_analyzer."""
+        m = self.months.index(month)
+        ids = np.flatnonzero(self.present[m])
+        ids = ids[np.argsort(self.rank[m, ids])]
+        data = {}
+        for pid in ids:
+            data[self.pokemon[pid]] = {field: {} for field in DICT_FIELDS}
+            data[self.pokemon[pid]]["checks_counters"] = []
+        for field in DICT_FIELDS:
+            labels = self.labels[field]
+            table = self.entries[field]
+            rows = table[table["month"] == m]
+            for pid, label, value in zip(rows["pokemon"].tolist(), rows["label"].tolist(), rows["value"].tolist()):
+                data[self.pokemon[pid]][field][labels[label]] = value
+        texts = self.labels["checks_counters"]
+        for _, pid, name, detail in self.checks[self.checks["month"] == m].tolist():
+            data[self.pokemon[pid]]["checks_counters"].append({"name": texts[name], "detail": texts[detail]})
+        for pid in ids:
+            entry = data[self.pokemon[pid]]
+            entry["raw_count"] = int(self.raw_count[m, pid])
+            entry["viability_ceiling"] = int(self.viability[m, pid])
+        return data
+
+    def usage_share(self) -> np.ndarray:
+        """Part de chaque Pokémon dans les raw counts du mois, en %, shape (mois, Pokémon)."""
+        totals = self.raw_count.sum(axis=1, keepdims=True)
+        return 100 * self.raw_count / np.maximum(totals, 1)
+
+    def trends(self, field: str = "usage", last: int = 6) -> np.ndarray:
+        """Pente (par mois) de chaque Pokémon sur les `last` derniers mois, régression pondérée.
+
+        "usage" : un mois absent compte comme 0 %. "viability" : seuls les mois présents comptent.
+        """
+        values = self.usage_share() if field == "usage" else self.viability.astype(np.float64)
+        values = values[-last:]
+        weights = np.ones_like(values) if field == "usage" else self.present[-last:].astype(np.float64)
+        x = np.arange(values.shape[0], dtype=np.float64)[:, None]
+        total = weights.sum(axis=0)
+        safe = np.maximum(total, 1)
+        x_mean = (weights * x).sum(axis=0) / safe
+        y_mean = (weights * values).sum(axis=0) / safe
+        dx = x - x_mean
+        var = (weights * dx ** 2).sum(axis=0)
+        slope = (weights * dx * (values - y_mean)).sum(axis=0) / np.where(var > 0, var, 1)
+        slope[(total < 2) | (var == 0)] = 0.0
+        return slope
+
+    def rising_threats(self, last: int = 6, top_n: int = 10, field: str = "usage") -> List[Tuple[str, float]]:
+        """Pokémon dont l'usage (ou la viabilité) monte le plus sur les derniers mois."""
+        slope = self.trends(field, last)
+        order = np.argsort(-slope, kind="stable")[:top_n]
+        return [(self.pokemon[i], float(slope[i])) for i in order if slope[i] > 0]
+
+
+_history: Optional[MetagameHistory] = None
+_history_mtime: Optional[float] = None
+
+
+def load_history(directory: str = HISTORY_DIR) -> Optional[MetagameHistory]:
+    """Historique sur disque, rechargé s'il a changé ; None s'il n'existe pas encore."""
+    global _history, _history_mtime
+    path = os.path.join(directory, "index.json")
+    if not os.path.exists(path):
+        return None
+    mtime = os.path.getmtime(path)
+    if _history is None or _history_mtime != mtime:
+        _history = MetagameHistory.load(directory)
+        _history_mtime = mtime
+    return _history
+
+
+# === CLI ===
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Historique mensuel du metagame")
+    parser.add_argument("command", choices=["add", "rising", "info"])
+    parser.add_argument("files", nargs="*", help="add : fichiers {mois}.json au format parsed_metagame.json")
+    parser.add_argument("--dir", default=HISTORY_DIR)
+    parser.add_argument("--last", type=int, default=6)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--field", choices=["usage", "viability"], default="usage")
+    args = parser.parse_args()
+
+    history = load_history(args.dir) or MetagameHistory()
+    if args.command == "add":
+        for path in args.files:
+            month = os.path.splitext(os.path.basename(path))[0]
+            with open(path, "r", encoding="utf-8") as f:
+                history.add_month(month, json.load(f))
+            print(f"✅ {month} ajouté")
+        history.save(args.dir)
+        print(f"📁 {len(history.months)} mois, {len(history.pokemon)} Pokémon dans {args.dir}")
+    elif not history.months:
+        print("❌ Historique vide. Lance d'abord : python -m core.metagame_history add <mois>.json")
+    elif args.command == "rising":
+        print(f"📈 Menaces en hausse ({args.field}, {min(args.last, len(history.months))} derniers mois) :")
+        for name, slope in history.rising_threats(args.last, args.top, args.field):
+            print(f"{name} (+{slope:.2f}/mois)")
+    else:
+        print(f"📦 {len(history.months)} mois ({history.months[0]} → {history.months[-1]}), {len(history.pokemon)} Pokémon")
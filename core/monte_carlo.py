@@ -0,0 +1,351 @@
+import math
+import os
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from core.duel_simulator import WIN, DRAW, LOSS, verdicts_from_turns
+from data.moves import get_move
+
+# Tirages par camp : MC_MIN_TRIALS d'abord, puis ce qu'il faut (au plus MC_TRIALS) pour que
+# les intervalles de victoire et de défaite de la paire de sets tiennent dans ± MC_PRECISION
+MC_TRIALS = int(os.environ.get("MC_TRIALS", 4096))
+MC_MIN_TRIALS = 256
+MC_PRECISION = 0.025
+MC_SEED = 0
+CRIT_CHANCE = 1 / 24  # tiré comme 16 cases sur 16 × 24 dans _sample_turns_to_ko
+CONFIDENCE_Z = 1.96  # intervalle à 95 %
+MAX_CHUNK_ELEMENTS = 4_000_000  # camps × tirages faits d'un coup
+# Poids des 16 jets normaux puis des 16 jets critiques d'un coup au but
+HIT_WEIGHTS = np.concatenate([np.full(16, (1 - CRIT_CHANCE) / 16), np.full(16, CRIT_CHANCE / 16)])
+# Colonnes de simulate_duels_monte_carlo
+OUTCOME_COLUMNS = ("win", "draw", "loss", "win_var", "loss_var", "trials")
+
+
+def wilson_interval(successes: int, n: int, z: float = CONFIDENCE_Z) -> Tuple[float, float]:
+    """Intervalle de confiance de Wilson pour une proportion."""
+    if n == 0:
+        return 0.0, 1.0
+    p = successes / n
+    denom = 1 + z * z / n
+    center = (p + z * z / (2 * n)) / denom
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return max(0.0, center - half), min(1.0, center + half)
+
+
+def estimate_intervals(p: np.ndarray, variance: np.ndarray, trials: np.ndarray, z: float = CONFIDENCE_Z) -> np.ndarray:
+    """Intervalles de Wilson de probabilités estimées, shape (..., 2).
+
+    L'effectif est celui qui donnerait la même variance, p(1 - p) / variance, ou le nombre
+    de tirages quand la variance estimée est nulle ; une probabilité exacte (0 tirage) a un
+    intervalle réduit à elle-même.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        n = np.where(variance > 1e-12, p * (1 - p) / variance, trials)
+        denom = 1 + z * z / n
+        center = (p + z * z / (2 * n)) / denom
+        half = z * np.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    exact = trials == 0
+    return np.stack([np.where(exact, p, np.maximum(0.0, center - half)),
+                     np.where(exact, p, np.minimum(1.0, center + half))], axis=-1)
+
+
+def matchup_interval(probs: np.ndarray, variances: np.ndarray, z: float = CONFIDENCE_Z) -> Tuple[float, float]:
+    """Intervalle de la moyenne des probabilités par paire de sets.
+
+    Les paires de sets sont les unités : l'erreur type combine la dispersion entre paires
+    (quel set on affronte) et l'erreur d'estimation de chaque paire. Mettre tous les tirages
+    en commun comme un seul échantillon donnerait un intervalle bien trop étroit.
+    """
+    n = len(probs)
+    if n == 0:
+        return 0.0, 1.0
+    mean = float(probs.mean())
+    between = float(probs.var(ddof=1)) / n if n > 1 else 0.0
+    within = float(variances.sum()) / (n * n)
+    half = z * math.sqrt(between + within)
+    return max(0.0, mean - half), min(1.0, mean + half)
+
+
+NO_PROFILE = ([0] * 16, [0] * 16, 0.0)
+
+
+@lru_cache(maxsize=None)
+def move_accuracy(name: str) -> float:
+    data = get_move(name)
+    return 1.0 if data is None or data["accuracy"] is None else data["accuracy"] / 100
+
+
+def move_profile(move: dict) -> Tuple[list, list, float]:
+    """(16 jets, 16 jets critiques, précision) d'un move de run_matchup(..., rolls=True).
+
+    Sans jets détaillés (table précalculée, ancien cache), on interpole entre min et max.
+    """
+    if "max" not in move:
+        return NO_PROFILE
+    if "rolls" in move:
+        rolls = move["rolls"]
+        crit = move.get("critRolls") or [r * 3 // 2 for r in rolls]
+    else:
+        lo, hi = move["min"], move["max"]
+        rolls = [lo + (hi - lo) * i // 15 for i in range(16)]
+        crit = [r * 3 // 2 for r in rolls]
+    return rolls, crit, move_accuracy(move["name"])
+
+
+def best_move_profile(moves: List[dict]) -> Tuple[list, list, float]:
+    """Le move à la meilleure espérance de dégâts (précision et critiques compris)."""
+    best, best_expected = NO_PROFILE, -1.0
+    for move in moves:
+        rolls, crit, accuracy = profile = move_profile(move)
+        expected = accuracy * ((1 - CRIT_CHANCE) * sum(rolls) + CRIT_CHANCE * sum(crit))
+        if expected > best_expected:
+            best, best_expected = profile, expected
+    return best
+
+
+def _sample_turns_to_ko(rng: np.random.Generator, hp: np.ndarray, table: np.ndarray,
+                        accuracy: np.ndarray, trials: int, max_turns: int) -> np.ndarray:
+    """Tours nécessaires pour mettre KO (inf au-delà de max_turns), shape (camps, essais).
+
+    `table` contient par camp les 16 jets normaux suivis des 16 jets critiques. On tire
+    d'abord les coups au but (jet parmi 16, critique à 1/24) pour savoir combien il en faut,
+    puis les ratés intercalés avant le dernier : binomiale négative de la précision.
+    """
+    n = len(hp)
+    # Au-delà de ce nombre de coups au but, même le plus petit jet a mis KO
+    with np.errstate(divide="ignore"):
+        needed = np.ceil(hp / table.min(axis=1))
+    hits_cap = int(min(max_turns, needed.max())) if n else 1
+    # Case k parmi 16 × 24 : jet k % 16, critique pour les 16 premières
+    slots = np.arange(16 * 24)
+    lookup = table[:, np.where(slots < 16, 16 + slots, slots % 16)].ravel()
+    draws = rng.integers(0, 16 * 24, size=(n, trials * hits_cap), dtype=np.int16)
+    damage = lookup[draws + (16 * 24 * np.arange(n))[:, None]].reshape(n, trials, hits_cap)
+    # Les dégâts cumulés ne font que croître : coups nécessaires = cumuls encore sous les PV + 1
+    dealt = np.cumsum(damage, axis=2, dtype=np.int32)
+    hits = (dealt < np.asarray(hp)[:, None, None]).sum(axis=2, dtype=np.int32) + 1
+
+    turns = hits.astype(np.float64)
+    misses = accuracy < 1
+    if misses.any():
+        sub = np.minimum(hits[misses], hits_cap)
+        turns[misses] += rng.negative_binomial(sub, np.maximum(accuracy[misses], 1e-9)[:, None])
+    return np.where((hits <= hits_cap) & (turns <= max_turns), turns, np.inf)
+
+
+def _turn_bounds(hp: np.ndarray, table: np.ndarray, accuracy: np.ndarray, max_turns: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Tours pour mettre KO dans le meilleur cas (plus gros jet à chaque coup) et le pire (plus petit jet, inf si le move peut rater)."""
+    with np.errstate(divide="ignore"):
+        fastest = np.ceil(hp / table.max(axis=1))
+        slowest = np.where(accuracy < 1, np.inf, np.ceil(hp / table.min(axis=1)))
+    return (np.where(fastest > max_turns, np.inf, fastest),
+            np.where(slowest > max_turns, np.inf, slowest))
+
+
+def _exact_turn_distribution(hp: np.ndarray, table: np.ndarray, accuracy: np.ndarray, fastest: np.ndarray,
+                             slowest: np.ndarray, max_turns: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Loi du tour de KO des camps qui se calculent sans tirage, shape (camps, max_turns + 1), et leur masque.
+
+    Dernière colonne : pas de KO en max_turns tours. Exacte quand le tour de KO est joué
+    d'avance, ou quand le plus petit jet met KO en 3 coups au but au plus : il suffit alors
+    des sommes de 1 et 2 coups (32 et 32 × 32 cas), les ratés suivant une binomiale négative.
+    """
+    n = len(hp)
+    dist = np.zeros((n, max_turns + 1))
+    fixed = np.flatnonzero(fastest == slowest)
+    dist[fixed, np.where(np.isinf(fastest[fixed]), max_turns, fastest[fixed] - 1).astype(np.intp)] = 1
+
+    with np.errstate(divide="ignore"):
+        needed = np.ceil(hp / table.min(axis=1))
+    rows = np.flatnonzero((fastest != slowest) & (needed <= 3))
+    if len(rows):
+        t, h = table[rows], hp[rows, None]
+        one = (t >= h) @ HIT_WEIGHTS
+        two = ((t[:, :, None] + t[:, None, :]).reshape(len(rows), -1) >= h) @ np.outer(HIT_WEIGHTS, HIT_WEIGHTS).ravel()
+        hits = np.stack([one, two - one, 1 - two], axis=1)  # P(1, 2 ou 3 coups au but nécessaires)
+        a = accuracy[rows, None]
+        turns = np.arange(1, max_turns + 1)
+        for k in range(3):
+            # Le (k+1)-ième coup au but tombe au tour t : k coups au but parmi les t - 1 premiers
+            ways = np.array([math.comb(t - 1, k) for t in turns])
+            dist[rows, :max_turns] += hits[:, k, None] * ways * a ** (k + 1) * (1 - a) ** np.maximum(turns - k - 1, 0)
+        dist[rows, max_turns] = np.maximum(0.0, 1 - dist[rows, :max_turns].sum(axis=1))
+
+    exact = np.zeros(n, dtype=bool)
+    exact[fixed] = exact[rows] = True
+    return dist, exact
+
+
+def _turn_histogram(turns: np.ndarray, max_turns: int) -> np.ndarray:
+    """Nombre de tirages par tour de KO (dernière colonne : pas de KO), shape (camps, max_turns + 1)."""
+    n = len(turns)
+    bins = np.where(np.isinf(turns), max_turns, turns - 1).astype(np.intp) + (max_turns + 1) * np.arange(n)[:, None]
+    return np.bincount(bins.ravel(), minlength=n * (max_turns + 1)).reshape(n, max_turns + 1)
+
+
+def _outcome_masks(speedA: np.ndarray, speedB: np.ndarray, max_turns: int) -> np.ndarray:
+    """Victoire puis défaite de A pour chaque couple (tour de KO de A, tour de KO de B), shape (paires, 2, T, T)."""
+    t = np.append(np.arange(1, max_turns + 1), np.inf)
+    verdicts = verdicts_from_turns(t[None, :, None], t[None, None, :], speedA[:, None, None], speedB[:, None, None], max_turns)
+    return np.stack([verdicts == WIN, verdicts == LOSS], axis=1).astype(np.float64)
+
+
+def _combine(distA: np.ndarray, distB: np.ndarray, samplesA: np.ndarray, samplesB: np.ndarray,
+             masks: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Probabilités victoire / nul / défaite des deux lois combinées, et variances d'estimation (victoire, défaite).
+
+    Chaque camp tiré apporte Var(P(issue | son tour de KO)) / tirages (au premier ordre).
+    """
+    p = np.einsum("nt,nktu,nu->nk", distA, masks, distB)
+    givenA = np.einsum("nktu,nu->nkt", masks, distB)
+    givenB = np.einsum("nt,nktu->nku", distA, masks)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        var = np.where(samplesA[:, None] > 0, ((distA[:, None] * givenA ** 2).sum(axis=2) - p ** 2) / samplesA[:, None], 0.0)
+        var += np.where(samplesB[:, None] > 0, ((distB[:, None] * givenB ** 2).sum(axis=2) - p ** 2) / samplesB[:, None], 0.0)
+    win_p, loss_p = p[:, 0], p[:, 1]
+    return np.stack([win_p, np.maximum(0.0, 1 - win_p - loss_p), loss_p], axis=1), np.maximum(var, 0.0)
+
+
+def simulate_duels_monte_carlo(hpA, hpB, speedA, speedB, profilesA: list, profilesB: list,
+                               trials: int = MC_TRIALS, max_turns: int = 8, seed: int = MC_SEED,
+                               min_trials: int = MC_MIN_TRIALS, precision: float = MC_PRECISION) -> np.ndarray:
+    """Issue de chaque paire de sets, shape (N, 6) : colonnes OUTCOME_COLUMNS.
+
+    Chaque tour, chaque camp utilise son meilleur move : jet parmi 16, critique à 1/24,
+    précision du move. Les deux camps sont indépendants : la loi du tour de KO de chacun est
+    exacte quand elle se calcule sans tirage (_exact_turn_distribution), sinon estimée sur
+    min_trials tirages, puis davantage (au plus `trials`) tant que l'intervalle de victoire
+    ou de défaite de la paire dépasse ± precision ; les deux lois se combinent ensuite
+    exactement. Colonnes : probabilités victoire / nul / défaite de A, variances d'estimation
+    de la victoire et de la défaite, tirages par camp (0 : paire exacte). Reproductible à seed égale.
+    """
+    hpA, hpB = np.asarray(hpA, dtype=np.float64), np.asarray(hpB, dtype=np.float64)
+    speedA, speedB = np.asarray(speedA), np.asarray(speedB)
+    n = len(hpA)
+    # Camps de A (coups vers B) puis camps de B (coups vers A)
+    hp = np.concatenate([hpB, hpA])
+    table = np.array([p[0] + p[1] for p in profilesA + profilesB], dtype=np.int32).reshape(2 * n, 32)
+    accuracy = np.array([p[2] for p in profilesA + profilesB], dtype=np.float64)
+
+    fastest, slowest = _turn_bounds(hp, table, accuracy, max_turns)
+    dist, exact = _exact_turn_distribution(hp, table, accuracy, fastest, slowest, max_turns)
+    # Issue jouée d'avance (le verdict ne dépend que des tours de KO, et de façon monotone)
+    best = verdicts_from_turns(fastest[:n], slowest[n:], speedA, speedB, max_turns)
+    settled = best == verdicts_from_turns(slowest[:n], fastest[n:], speedA, speedB, max_turns)
+    masks = _outcome_masks(speedA, speedB, max_turns)
+
+    rng = np.random.default_rng(seed)
+    counts = np.zeros_like(dist)
+    samples = np.zeros(2 * n)
+    pending = np.flatnonzero(~settled & ~(exact[:n] & exact[n:]))
+    done, batch = 0, min(min_trials, trials)
+    while len(pending) and batch > 0:
+        sides = np.concatenate([pending, pending + n])
+        sides = sides[~exact[sides]]
+        chunk = max(1, MAX_CHUNK_ELEMENTS // batch)
+        for start in range(0, len(sides), chunk):
+            s = sides[start:start + chunk]
+            counts[s] += _turn_histogram(_sample_turns_to_ko(rng, hp[s], table[s], accuracy[s], batch, max_turns), max_turns)
+        samples[sides] += batch
+        dist[sides] = counts[sides] / samples[sides, None]
+        done += batch
+
+        _, variances = _combine(dist[pending], dist[pending + n], samples[pending], samples[pending + n], masks[pending])
+        worst = variances.max(axis=1)
+        wide = CONFIDENCE_Z * np.sqrt(worst) > precision
+        pending = pending[wide]
+        if len(pending):
+            # La variance baisse comme 1 / tirages : ce qu'il faut à la paire la plus incertaine
+            needed = done * CONFIDENCE_Z ** 2 * worst[wide].max() / precision ** 2
+            batch = int(min(trials, max(2 * done, needed))) - done
+
+    probs, variances = _combine(dist[:n], dist[n:], samples[:n], samples[n:], masks)
+    probs[settled] = np.stack([best[settled] == WIN, best[settled] == DRAW, best[settled] == LOSS], axis=1)
+    variances[settled] = 0
+    return np.column_stack([probs, variances, np.where(settled, 0, np.maximum(samples[:n], samples[n:]))])
+
+
+def simulate_matchup(matchup: Dict[Tuple[str, str], dict], trials: int = MC_TRIALS, seed: int = MC_SEED) -> np.ndarray:
+    """simulate_duels_monte_carlo sur chaque paire de sets d'un run_matchup(..., rolls=True), shape (N, 6)."""
+    entries = list(matchup.values())
+    if not entries:
+        return np.zeros((0, len(OUTCOME_COLUMNS)))
+    return simulate_duels_monte_carlo(
+        [e['attacker']['hp'] for e in entries], [e['defender']['hp'] for e in entries],
+        [e['attacker']['speed'] for e in entries], [e['defender']['speed'] for e in entries],
+        [best_move_profile(e['moves']) for e in entries],
+        [best_move_profile(e['reverseMoves']) for e in entries],
+        trials=trials, seed=seed
+    )
+
+
+def set_pair_outcomes(matchup: Dict[Tuple[str, str], dict], trials: int = MC_TRIALS,
+                      seed: int = MC_SEED) -> Dict[Tuple[str, str], dict]:
+    """Probabilités victoire / nul / défaite de chaque paire de sets, avec leurs intervalles de confiance."""
+    outcomes = simulate_matchup(matchup, trials, seed)
+    intervals = estimate_intervals(outcomes[:, [0, 2]], outcomes[:, [3, 4]], outcomes[:, 5, None])
+    return {
+        key: {
+            "win_prob": round(float(outcomes[i, 0]), 4),
+            "draw_prob": round(float(outcomes[i, 1]), 4),
+            "loss_prob": round(float(outcomes[i, 2]), 4),
+            "win_ci": [round(float(x), 4) for x in intervals[i, 0]],
+            "loss_ci": [round(float(x), 4) for x in intervals[i, 1]],
+            "trials": int(outcomes[i, 5])
+        }
+        for i, key in enumerate(matchup)
+    }
+
+
+def monte_carlo_summary(matchup: Dict[Tuple[str, str], dict], trials: int = MC_TRIALS, seed: int = MC_SEED) -> dict:
+    """Résumé probabiliste d'un matchup de run_matchup(..., rolls=True) (voir outcomes_summary)."""
+    return outcomes_summary(simulate_matchup(matchup, trials, seed))
+
+
+def outcomes_summary(outcomes: np.ndarray) -> dict:
+    """Résumé des issues par paire de sets de simulate_duels_monte_carlo.
+
+    Mêmes clés que le résumé déterministe (wins/losses/draws = paires de sets par issue
+    la plus probable, winrate en %), plus les probabilités moyennes sur les paires de sets
+    et leurs intervalles de confiance (voir matchup_interval). Le détail par paire de sets
+    est donné par set_pair_outcomes.
+    """
+    probs, variances, samples = outcomes[:, :3], outcomes[:, 3:5], outcomes[:, 5]
+    win_prob, draw_prob, loss_prob = (float(x) for x in probs.mean(axis=0)) if len(probs) else (0.0, 0.0, 0.0)
+    outcome = probs.argmax(axis=1)
+    winrate = 100 * win_prob
+    win_ci = matchup_interval(probs[:, 0], variances[:, 0])
+    loss_ci = matchup_interval(probs[:, 2], variances[:, 1])
+    return {
+        "wins": int((outcome == 0).sum()),
+        "losses": int((outcome == 2).sum()),
+        "draws": int((outcome == 1).sum()),
+        "winrate": round(winrate, 1),
+        "verdict": "✅ Win" if winrate > 50 else "❌ Loss" if winrate < 50 else "⚖️ Draw",
+        "win_prob": round(win_prob, 4),
+        "draw_prob": round(draw_prob, 4),
+        "loss_prob": round(loss_prob, 4),
+        "win_ci": [round(win_ci[0], 4), round(win_ci[1], 4)],
+        "loss_ci": [round(loss_ci[0], 4), round(loss_ci[1], 4)],
+        "set_pairs": len(probs),
+        "exact_pairs": int((samples == 0).sum()),
+        "trials": int(samples.sum())
+    }
+
+
+def invert_monte_carlo_summary(summary: dict) -> dict:
+    """Le même duel vu depuis le défenseur."""
+    winrate = 100 * summary["loss_prob"]
+    return {
+        **summary,
+        "wins": summary["losses"],
+        "losses": summary["wins"],
+        "winrate": round(winrate, 1),
+        "verdict": "✅ Win" if winrate > 50 else "❌ Loss" if winrate < 50 else "⚖️ Draw",
+        "win_prob": summary["loss_prob"],
+        "loss_prob": summary["win_prob"],
+        "win_ci": summary["loss_ci"],
+        "loss_ci": summary["win_ci"]
+    }
@@ -1,72 +1,225 @@
+import os
 import pprint
+import numpy as np
 from core.metagame_analyzer import (
     load_metagame_data,
     get_metagame_entry,
     get_top_threats,
-    detect_common_cores
+    get_metagame_store
 )
-from core.duel_simulator import run_damage_calc, is_valid_set, simulate_multi_turn_duel
+from core.duel_simulator import WIN, LOSS, DRAW, run_matchup, run_matchup_batch, resolve_matchup
+from core.matchup_cache import get_matchup_cache
+from core.monte_carlo import invert_monte_carlo_summary, outcomes_summary, simulate_matchup
+from core.tournament import load_winrate_matrix
 from data.pokedex import (
     get_pokemon_data,
     get_roles,
     get_base_stats,
     get_types,
-    get_all_sets
+    get_all_sets,
+    get_parsed_sets,
+    StrategySet
 )
+from data.name_index import normalize
 
-def normalize(name: str) -> str:
-    return name.lower().replace(" ", "").replace("-", "")
+# "max" : dégâts max déterministes ; "montecarlo" : jets, précision et critiques tirés au sort.
+# Monte Carlo est sur demande (DUEL_MODEL=montecarlo) : ses jets ne sont ni dans la table de
+# dégâts précalculée ni dans la matrice du tournoi, chaque duel repasse donc par le calc.
+DUEL_MODEL = os.environ.get("DUEL_MODEL", "max")
+DUEL_CACHE_NAMESPACES = {"max": "duel", "montecarlo": "duel_mc"}
+# Format des résumés de duels : à incrémenter quand leurs clés ou leur sens changent
+DUEL_SUMMARY_VERSION = 3
+# Clés ajoutées par early_exit_summary quand le verdict est acquis avant la fin
+EARLY_EXIT_KEYS = ("exact", "evaluated", "skipped")
 
-def duel_result_summary(attacker_name: str, defender_name: str, cache: dict) -> dict:
+def get_duel_cache(model: str = None):
+    """Cache des résumés de duels du modèle donné (un namespace par modèle)."""
+    return get_matchup_cache(DUEL_CACHE_NAMESPACES[model or DUEL_MODEL], version=DUEL_SUMMARY_VERSION)
+
+def build_summary(wins: int, losses: int, draws: int) -> dict:
+    total = wins + losses + draws
+    winrate = 100 * wins / total if total else 0
+    return {
+        "wins": wins,
+        "losses": losses,
+        "draws": draws,
+        "winrate": round(winrate, 1),
+        "verdict": "✅ Win" if winrate > 50 else "❌ Loss" if winrate < 50 else "⚖️ Draw"
+    }
+
+def matchup_outcomes(matchup: dict, model: str) -> np.ndarray:
+    """Issue de chaque paire de sets : (victoire, nul, défaite) de A à 0 / 1 en "max",
+    probabilités suivies de leurs variances et tirages en "montecarlo" (simulate_matchup)."""
+    if model == "montecarlo":
+        return simulate_matchup(matchup)
+    verdicts = resolve_matchup(matchup)
+    return np.stack([verdicts == WIN, verdicts == DRAW, verdicts == LOSS], axis=-1).reshape(-1, 3).astype(np.int64)
+
+def summarize_outcomes(outcomes: np.ndarray, model: str) -> dict:
+    if model == "montecarlo":
+        return outcomes_summary(outcomes)
+    wins, draws, losses = (int(x) for x in outcomes.sum(axis=0))
+    return build_summary(wins, losses, draws)
+
+def summarize_matchup(matchup: dict, model: str = None) -> dict:
+    """Résumé d'un matchup de run_matchup : un duel par paire de sets (setA, setB)."""
+    model = model or DUEL_MODEL
+    return summarize_outcomes(matchup_outcomes(matchup, model), model)
+
+def invert_summary(summary: dict) -> dict:
+    """Le même duel vu depuis le défenseur : victoires et défaites s'échangent.
+
+    Les clés d'un verdict anticipé (exact, evaluated, skipped) sont gardées, pour qu'un appel
+    exact=True ne prenne pas l'inverse d'un résumé partiel pour un résumé complet.
+    """
+    if "error" in summary:
+        return summary
+    if "win_prob" in summary:
+        return invert_monte_carlo_summary(summary)
+    early = {k: summary[k] for k in EARLY_EXIT_KEYS if k in summary}
+    return {**build_summary(summary["losses"], summary["wins"], summary["draws"]), **early}
+
+def store_duel_summary(a: str, b: str, summary: dict, cache: dict):
+    # Un seul calcul répond aux deux sens du duel
+    cache[(a, b)] = summary
+    if "error" in summary:
+        return
+    # Un verdict anticipé de défaite ne dit rien du verdict adverse (les nuls comptent)
+    if summary.get("exact", True) or summary["verdict"] == "✅ Win":
+        cache[(b, a)] = invert_summary(summary)
+
+def set_likelihood_order(name: str) -> list:
+    """Sets stratégiques du plus au moins probable sur le ladder (usage de l'objet, du talent et des moves)."""
+    meta = get_metagame_store().entry(name) or {}
+    usage = {}
+    for key in ("items", "abilities", "moves"):
+        usage[key] = {normalize(k): pct for k, pct in meta.get(key, {}).items()}
+
+    def likelihood(s: StrategySet) -> float:
+        moves = [usage["moves"].get(normalize(m), 0) for m in s.moves]
+        return (usage["items"].get(normalize(s.item or ""), 0)
+                + usage["abilities"].get(normalize(s.ability or ""), 0)
+                + (sum(moves) / len(moves) if moves else 0))
+
+    return [s.name for s in sorted(get_parsed_sets(name), key=likelihood, reverse=True)]
+
+def sets_before_verdict(wins: float, evaluated: int, remaining: int, per_set: int) -> int:
+    """Nombre minimal de sets à évaluer avant que le verdict puisse être acquis (au moins 1)."""
+    if not per_set:
+        return 1
+    total = evaluated + remaining
+    # Victoire : les nouvelles paires toutes gagnées ; défaite : toutes perdues
+    to_win = (total / 2 - wins) // per_set + 1
+    to_lose = (wins + remaining - total / 2) // per_set + 1
+    return max(1, int(min(to_win, to_lose)))
+
+def early_exit_summary(a: str, b: str, model: str = None) -> dict:
+    """Verdict en évaluant les sets de a du plus probable au moins probable.
+
+    On s'arrête dès que les paires restantes ne peuvent plus faire passer le winrate de
+    l'autre côté de 50 % ; le résumé porte alors "exact": False et le nombre de paires sautées.
+    Chaque batch ne demande que les sets sans lesquels le verdict ne peut pas être acquis.
+    """
+    model = model or DUEL_MODEL
+    order = set_likelihood_order(a)
+    per_set = len(get_parsed_sets(b))
+    outcomes = []
+    wins, evaluated, done = 0.0, 0, 0
+    while done < len(order):
+        remaining = (len(order) - done) * per_set
+        chunk = order[done:done + sets_before_verdict(wins, evaluated, remaining, per_set)]
+        pairs = [(f"{a}:{set_name}", b) for set_name in chunk]
+        for _, _, matchup, error in run_matchup_batch(pairs, rolls=model == "montecarlo"):
+            if error:
+                raise RuntimeError(error)
+            outcomes.append(matchup_outcomes(matchup, model))
+            # Victoires des paires évaluées (0 / 1 en "max", probabilités en "montecarlo")
+            wins += float(outcomes[-1][:, 0].sum())
+            evaluated += len(outcomes[-1])
+        done += len(chunk)
+        remaining = (len(order) - done) * per_set
+        if not remaining:
+            break
+        # Pire cas pour chaque verdict : toutes les paires restantes perdues / gagnées
+        if wins / (evaluated + remaining) > 0.5 or (wins + remaining) / (evaluated + remaining) < 0.5:
+            return {**summarize_outcomes(np.concatenate(outcomes), model), "exact": False,
+                    "evaluated": evaluated, "skipped": remaining}
+    return summarize_outcomes(np.concatenate(outcomes), model) if outcomes else build_summary(0, 0, 0)
+
+def tournament_summary(a: str, b: str, model: str) -> dict | None:
+    """Résumé lu dans la matrice du tournoi (python -m core.tournament), si elle couvre le duel."""
+    matrix = load_winrate_matrix() if model == "max" else None
+    outcome = matrix.outcome(a, b) if matrix is not None else None
+    return build_summary(*outcome) if outcome is not None else None
+
+def duel_result_summary(attacker_name: str, defender_name: str, cache: dict, model: str = None, exact: bool = False) -> dict:
+    """Résumé du duel attaquant vs défenseur.
+
+    Par défaut, l'évaluation s'arrête dès que le verdict est acquis (early_exit_summary) ;
+    exact=True force toutes les paires de sets quand le winrate lui-même est affiché.
+    """
+    model = model or DUEL_MODEL
     a = normalize(attacker_name)
     b = normalize(defender_name)
     key = (a, b)
 
-    if key in cache:
-        return cache[key]
+    cached = cache[key] if key in cache else None
+    if cached is not None and (not exact or cached.get("exact", True)):
+        return cached
 
-    try:
-        atk_res = run_damage_calc(a, b)
-        def_res = run_damage_calc(b, a)
+    summary = tournament_summary(a, b, model)
+    if summary is not None:
+        cache[key] = summary
+        return summary
 
-        results = []
-        for atk_entry in atk_res:
-            if not is_valid_set(atk_entry):
-                continue
-            setA = atk_entry['attacker']
-            setB = atk_entry['defender']
-            movesA = atk_entry['moves']
-
-            mirror = next(
-                (r for r in def_res if is_valid_set(r)
-                 and r['setNames']['a'] == atk_entry['setNames']['b']
-                 and r['setNames']['b'] == atk_entry['setNames']['a']),
-                None
-            )
-
-            if mirror:
-                movesB = mirror['moves']
-                verdict = simulate_multi_turn_duel(setA, setB, movesA, movesB)
-                results.append(verdict)
-
-        wins = results.count("win")
-        losses = results.count("loss")
-        draws = results.count("draw")
-        total = len(results)
-        winrate = 100 * wins / total if total else 0
-        summary = {
-            "wins": wins,
-            "losses": losses,
-            "draws": draws,
-            "winrate": round(winrate, 1),
-            "verdict": "✅ Win" if winrate > 50 else "❌ Loss" if winrate < 50 else "⚖️ Draw"
-        }
+    try:
+        if not exact:
+            summary = early_exit_summary(a, b, model)
+        else:
+            summary = summarize_matchup(run_matchup(a, b, rolls=model == "montecarlo"), model)
     except Exception as e:
         summary = {"error": str(e)}
 
-    cache[key] = summary
+    store_duel_summary(a, b, summary, cache)
     return summary
 
+def prefetch_duel_results(pairs: list, cache: dict, model: str = None) -> int:
+    """Remplit le cache pour toutes les paires (attaquant, défenseur) en un seul batch Node.
+
+    Chaque matchup calcule les deux sens d'un coup : (b, a) n'est jamais redemandé
+    quand (a, b) est déjà prévu. Renvoie le nombre de duels calculés.
+    """
+    todo = {}
+    for attacker_name, defender_name in pairs:
+        key = (normalize(attacker_name), normalize(defender_name))
+        if key not in todo and key[::-1] not in todo and key not in cache:
+            todo[key] = None
+
+    model = model or DUEL_MODEL
+    for key in list(todo):
+        summary = tournament_summary(*key, model)
+        if summary is not None:
+            cache[key] = summary
+            del todo[key]
+    if not todo:
+        return 0
+
+    computed = 0
+    try:
+        for a, b, matchup, error in run_matchup_batch(list(todo), rolls=model == "montecarlo"):
+            summary = {"error": error} if error else summarize_matchup(matchup, model)
+            store_duel_summary(a, b, summary, cache)
+            computed += 1
+    except Exception:
+        # Batch interrompu (worker planté, délai dépassé) : les paires restantes passent une
+        # par une, et chaque échec est gardé dans son résumé ({"error": ...})
+        for a, b in todo:
+            if (a, b) not in cache:
+                duel_result_summary(a, b, cache, model, exact=True)
+                computed += 1
+
+    return computed
+
 def analyze_pokemon(name: str, top_n: int = 10) -> dict:
     normalized = normalize(name)
     meta_data = load_metagame_data()
@@ -100,17 +253,18 @@ def analyze_pokemon(name: str, top_n: int = 10) -> dict:
             "counters": [entry["name"] for entry in meta_entry.get("checks_counters", [])]
         }
 
-    duel_cache = {}
+    duel_cache = get_duel_cache()
 
     # Matchups vs top threats
     top_threats = get_top_threats(meta_data, top_n=top_n)
     for threat, _ in top_threats:
         if normalize(threat) == normalized:
             continue
-        analysis["matchups"][threat] = duel_result_summary(normalized, threat, duel_cache)
+        # Winrates affichés tels quels (graphique de pokemon_viewer) : évaluation complète
+        analysis["matchups"][threat] = duel_result_summary(normalized, threat, duel_cache, exact=True)
 
     # Cores où ce Pokémon est utilisé
-    all_cores = detect_common_cores(meta_data, min_pct=15.0)
+    all_cores = get_metagame_store().common_cores(min_pct=15.0)
     analysis["core_synergies"] = [
         core for core in all_cores if normalized in [normalize(x) for x in core]
     ]
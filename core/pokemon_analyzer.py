@@ -9,14 +9,14 @@ from core.metagame_analyzer import (
 from data.pokedex import (
     get_pokemon_data, get_roles, get_base_stats, get_all_sets, get_types
 )
+from data.name_index import normalize as normalize_name
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 SCRIPT_PATH = os.path.join(BASE_DIR, "tools", "callDamageFromJSON.mjs")
 
-metagame = load_metagame_data()
-
 def analyze_pokemon(name: str, top_n: int = 10) -> dict:
     poke_data = get_pokemon_data(name)
+    metagame = load_metagame_data()
     meta_data = get_metagame_entry(name, metagame)
     if not poke_data:
         raise ValueError(f"Pokémon non trouvé : {name}")
@@ -44,9 +44,6 @@ def analyze_pokemon(name: str, top_n: int = 10) -> dict:
 
     return analysis
 
-def normalize_name(name: str) -> str:
-    return name.lower().replace("-", "").replace(" ", "")
-
 def call_damage_script(poke1: str, poke2: str) -> str:
     try:
         process = subprocess.run(
@@ -73,7 +70,7 @@ def summarize_duel(log_text: str) -> list[str]:
     return summaries
 
 def simulate_matchups(name: str, top_n: int = 10) -> dict:
-    top_threats = [t for t, _ in get_top_threats(metagame, top_n=top_n)]
+    top_threats = [t for t, _ in get_top_threats(load_metagame_data(), top_n=top_n)]
     results = {}
     os.makedirs("data/results", exist_ok=True)
     summary_log = open(f"data/results/{normalize_name(name)}_matchups_summary.txt", "w", encoding="utf-8")
@@ -4,7 +4,7 @@ from typing import List, Dict
 from collections import Counter
 
 from data.pokedex import get_pokemon_data, get_roles
-from core.duel_simulator import simulate_multi_turn_duel, run_damage_calc
+from core.duel_simulator import WIN, best_move_damage, resolve_duels_batch, run_damage_calc
 from core.metagame_analyzer import load_metagame_data
 
 # === Constantes ===
@@ -31,12 +31,15 @@ def get_forced_moves(roles: List[str], legal_moves: List[str]) -> List[str]:
     return list(set(forced))
 
 def count_wins(attacker, movesA, threats: List[Dict]) -> int:
-    wins = 0
-    for entry in threats:
-        result = simulate_multi_turn_duel(attacker, entry["defender"], movesA, entry["moves"])
-        if result == "win":
-            wins += 1
-    return wins
+    # Tous les duels du set résolus en un seul appel vectorisé
+    if not threats:
+        return 0
+    verdicts = resolve_duels_batch(
+        attacker["hp"], [entry["defender"]["hp"] for entry in threats],
+        attacker["speed"], [entry["defender"]["speed"] for entry in threats],
+        best_move_damage(movesA), [best_move_damage(entry["moves"]) for entry in threats]
+    )
+    return int((verdicts == WIN).sum())
 
 def simulate_duels_against_targets(pokemon_name: str, targets: List[str]) -> List[Dict]:
     raw_results = []
@@ -124,11 +127,7 @@ def optimize_spread(set_data: Dict, threats: List[Dict], moves: List[str], log:
     evs["spe"] = 252
     evs["hp"] = 4
 
-    wins = 0
-    for duel in threats:
-        result = simulate_multi_turn_duel(set_data, duel["defender"], moves, duel["moves"])
-        if result == "win":
-            wins += 1
+    wins = count_wins(set_data, moves, threats)
 
     log.append(f"⚙️ Recalcul après EVs : {wins} victoires conservées")
     return {
@@ -1,77 +1,135 @@
 import sys
 import json
-from core.new_pokemon_analyzer import duel_result_summary
-from core.metagame_analyzer import load_metagame_data, detect_common_cores
-from data.pokedex import get_roles
+from core.new_pokemon_analyzer import get_duel_cache
+from core.threat_bitsets import BeatsIndex
+from core.metagame_analyzer import get_metagame_store
+from data.pokedex import get_pokemon_data, get_roles
+from data.role_index import get_role_index
+from data.type_matrix import EFFECTIVENESS, TYPES, defensive_profiles, stab_matrix
+from data.name_index import normalize
 from collections import Counter, defaultdict
-from typing import List
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
 
 LOG_PATH = "data/results/synergy_core_summary.txt"
 JSON_PATH = "data/results/synergy_result.json"
 
-metagame = load_metagame_data()
-common_cores = detect_common_cores(metagame)
-all_pokemon_names = list(metagame.keys())
 
-def get_top_pokemon(n=20):
-    return sorted(all_pokemon_names, key=lambda x: metagame[x].get("raw_count", 0), reverse=True)[:n]
+# Au-delà, un ajout empile trop de membres sur un même type ou une même faiblesse
+MAX_SHARED_TYPE = 2
+MAX_SHARED_WEAKNESS = 2
+
+# Pré-filtre de find_best_counter : seuls les SCREEN_KEEP meilleurs candidats passent aux duels exacts
+SCREEN_KEEP = 40
+SPEED_BONUS = 0.5
+
+def dex_entries(names: List[str]) -> List[dict]:
+    return [get_pokemon_data(normalize(name)) or get_pokemon_data(name) or {} for name in names]
+
+def screen_scores(candidates: List[dict], threats: List[dict]) -> np.ndarray:
+    """Estimation grossière du nombre de menaces battues par chaque candidat, shape (C,).
+
+    Pour chaque paire : meilleur STAB de chacun sur l'autre, pondéré par la meilleure
+    stat offensive et la bulk adverse, plus un bonus de vitesse ; le tout passé dans une
+    sigmoïde puis sommé sur les menaces. Aucun duel n'est calculé.
+    """
+    def offence_and_bulk(entries):
+        stats = np.array([[e.get(k, 0) for k in ("hp", "atk", "def", "spa", "spd", "spe")] for e in entries], dtype=np.float64)
+        stats = stats.reshape(len(entries), 6)
+        offence = np.maximum(stats[:, 1], stats[:, 3])
+        bulk = stats[:, 0] * (stats[:, 2] + stats[:, 4]) / 2
+        return offence, np.maximum(bulk, 1), stats[:, 5]
+
+    off_c, bulk_c, spe_c = offence_and_bulk(candidates)
+    off_t, bulk_t, spe_t = offence_and_bulk(threats)
+    # (C, T) : meilleur multiplicateur STAB du candidat sur la menace, et inversement
+    hit_t = (stab_matrix(candidates)[:, None, :] * defensive_profiles(threats)[None, :, :]).max(axis=2)
+    hit_c = (stab_matrix(threats)[:, None, :] * defensive_profiles(candidates)[None, :, :]).max(axis=2).T
+
+    eps = 1e-3
+    pressure_c = off_c[:, None] * hit_t / bulk_t[None, :]
+    pressure_t = off_t[None, :] * hit_c / bulk_c[:, None]
+    edge = np.log((pressure_c + eps) / (pressure_t + eps)) + SPEED_BONUS * np.sign(spe_c[:, None] - spe_t[None, :])
+    return (1 / (1 + np.exp(-edge))).sum(axis=1)
+
+def compatible_candidates(team: List[dict], candidates: List[dict]) -> np.ndarray:
+    """Masque des candidats (entrées du dex) compatibles avec la team, en quelques opérations matricielles."""
+    if not candidates:
+        return np.zeros(0, dtype=bool)
+    team_types = stab_matrix(team).sum(axis=0)
+    team_weak = (defensive_profiles(team) > 1).sum(axis=0)
+    cand_types = stab_matrix(candidates)
+    cand_weak = defensive_profiles(candidates) > 1
+    too_many_types = (cand_types & (team_types >= MAX_SHARED_TYPE)).any(axis=1)
+    stacked_weakness = (cand_weak & (team_weak >= MAX_SHARED_WEAKNESS)).any(axis=1)
+    return ~(too_many_types | stacked_weakness)
+
+def is_compatible_with_team(team: List[dict], candidate: dict) -> bool:
+    return bool(compatible_candidates(team, [candidate])[0])
+
+def get_team_type_coverage(team: List[dict]) -> Dict[str, int]:
+    """Pour chaque type, nombre de membres dont un STAB le touche en super efficace."""
+    super_effective = EFFECTIVENESS > 1
+    covered = (stab_matrix(team).astype(np.int32) @ super_effective.astype(np.int32)) > 0
+    return dict(zip(TYPES, covered.sum(axis=0).tolist()))
 
-def identify_threats(core: List[str], top_n: int, duel_cache: dict, log: List[str], duel_log: dict) -> List[str]:
-    top_pokemon = get_top_pokemon(top_n)
-    beat_all_core = []
+def get_top_pokemon(n: Optional[int] = 20) -> List[str]:
+    # n=None : tout le metagame, trié par usage
+    return [name for name, _ in get_metagame_store().top_usage(n)]
 
+def all_pokemon_names() -> List[str]:
+    return get_metagame_store().names()
+
+def identify_threats(core: List[str], top_n: int, beats: BeatsIndex, log: List[str], duel_log: dict) -> List[str]:
     log.append(f"\n🔎 Analyse des menaces dans le top {top_n} Pokémon :")
 
-    for threat in top_pokemon:
-        if threat in core:
-            continue
-        wins = 0
+    # Masques de bits : seuls les duels pas encore résolus partent au calc
+    threats_mask = beats.threats_to(core, top_n)
+    for threat in beats.names_of(beats.top_mask(top_n) & ~beats.mask(core)):
         for target in core:
-            duel = duel_result_summary(threat, target, duel_cache)
-            verdict = duel.get("verdict")
-            duel_log.setdefault(str(threat), {})[str(target)] = verdict
-            if verdict == "✅ Win":
-                wins += 1
-
-        if len(core) >= 2 and wins == len(core):
-            beat_all_core.append(threat)
-        elif len(core) < 2 and wins > 0:
-            beat_all_core.append(threat)
+            duel_log.setdefault(str(threat), {})[str(target)] = beats.verdict(threat, target)
+    beat_all_core = beats.names_of(threats_mask)
 
+    store = get_metagame_store()
     log.append(f"\n📊 Menaces conservées (battent {'tout' if len(core) >= 2 else 'au moins un'} le core) :")
     for threat in beat_all_core:
         score = 1.0
-        score += metagame[threat].get("raw_count", 0) / 100000
-        score += sum(threat in c for c in common_cores) * 0.5
+        score += store.data[threat].get("raw_count", 0) / 100000
+        score += sum(threat in c for c in store.common_cores()) * 0.5
         log.append(f" - {threat} (score approx : {round(score, 2)})")
 
     return beat_all_core
 
-def find_best_counter(threats: List[str], core: List[str], used: set, desired_roles: List[str], duel_cache: dict, log: List[str], duel_log: dict) -> str:
-    scores = Counter()
-
-    for candidate in all_pokemon_names:
-        if candidate in used or candidate in core:
-            continue
-        if desired_roles and not any(role in get_roles(candidate) for role in desired_roles):
-            continue
-
-        score = 0
+def find_best_counter(threats: List[str], core: List[str], used: set, desired_roles: List[str], beats: BeatsIndex, log: List[str], duel_log: dict,
+                      progress: Optional[Callable[[dict], None]] = None, screen: bool = True) -> str:
+    roles = get_role_index()
+    candidates = [
+        candidate for candidate in all_pokemon_names()
+        if candidate not in used and candidate not in core
+        and (not desired_roles or roles.has_any(candidate, desired_roles))
+    ]
+    if screen and threats and len(candidates) > SCREEN_KEEP:
+        # 1er étage : heuristique vectorisée, seuls les meilleurs passent aux duels exacts
+        estimate = screen_scores(dex_entries(candidates), dex_entries(threats))
+        order = np.argsort(-estimate, kind="stable")
+        dropped = [candidates[i] for i in order[SCREEN_KEEP:]]
+        candidates = [candidates[i] for i in sorted(order[:SCREEN_KEEP])]
+        threats_mask = beats.mask(threats)
+        skipped = sum((threats_mask & ~beats.known[beats.id(name)] & ~(1 << beats.id(name))).bit_count() for name in dropped)
+        log.append(f"\n🧹 Pré-filtre : {len(candidates)}/{len(candidates) + len(dropped)} candidats gardés, "
+                   f"{skipped} duels évités")
+    scores = Counter(beats.counter_scores(candidates, beats.mask(threats)))
+    for candidate in candidates:
         for threat in threats:
-            duel = duel_result_summary(candidate, threat, duel_cache)
-            verdict = duel.get("verdict")
-            duel_log.setdefault(str(candidate), {})[str(threat)] = verdict
-            if verdict == "✅ Win":
-                score += 1
-            elif verdict == "⚖️ Draw":
-                score += 0.5
-
-        if score:
-            scores[candidate] = score
+            if candidate != threat:
+                duel_log.setdefault(str(candidate), {})[str(threat)] = beats.verdict(candidate, threat)
 
     log.append("\n🎯 Candidats (qui couvrent les menaces et respectent les rôles) :")
     for name, sc in scores.most_common(10):
         log.append(f" - {name}: {sc} (rôles: {', '.join(get_roles(name))})")
+    if progress:
+        progress({"stage": "candidates", "scores": scores.most_common(10)})
 
     return scores.most_common(1)[0][0] if scores else None
 
@@ -83,12 +141,27 @@ def sanitize_keys(obj):
     else:
         return obj
 
-def build_synergy_core(around: List[str], role_targets: List[List[str]], core_size: int = 3) -> List[str]:
+def parse_roles(role_args: List[str]) -> List[List[str]]:
+    """Rôles visés par slot ("aucun" = pas de contrainte, "a,b" = l'un ou l'autre)."""
+    return [[] if role.lower() == "aucun" else role.split(",") for role in role_args]
+
+def build_synergy_core(around: List[str], role_targets: List[List[str]], core_size: int = 3,
+                       progress: Optional[Callable[[dict], None]] = None, screen: bool = True) -> List[str]:
+    """Core glouton autour de `around`.
+
+    `screen=False` désactive le pré-filtre des candidats (comparaison avec les duels complets).
+
+    `progress` reçoit les résultats partiels (itération, menaces, candidats, ajouts) ;
+    c'est aussi le point où un job annulé s'interrompt (core.jobs).
+    """
+    report = progress or (lambda event: None)
     core = list(around)
     used = set(core)
     log = [f"🌐 Construction d’un core de {core_size} Pokémon autour de : {', '.join(around)}"]
     duel_log = {}
-    duel_cache = {}
+    duel_cache = get_duel_cache()
+    # Le metagame trié par usage : le top N correspond aux N premiers bits
+    beats = BeatsIndex(get_top_pokemon(None), duel_cache)
 
     while len(core) < core_size:
         top_n = 20
@@ -96,14 +169,17 @@ def build_synergy_core(around: List[str], role_targets: List[List[str]], core_si
 
         while not found and top_n <= 100:
             log.append(f"\n--- Nouvelle itération avec top {top_n} ---")
-            threats = identify_threats(core, top_n, duel_cache, log, duel_log)
+            report({"stage": "iteration", "core": list(core), "top_n": top_n})
+            threats = identify_threats(core, top_n, beats, log, duel_log)
+            report({"stage": "threats", "top_n": top_n, "threats": threats})
             desired_roles = role_targets[len(core)] if len(role_targets) > len(core) else []
 
-            best = find_best_counter(threats, core, used, desired_roles, duel_cache, log, duel_log)
+            best = find_best_counter(threats, core, used, desired_roles, beats, log, duel_log, progress=report, screen=screen)
             if best:
                 core.append(best)
                 used.add(best)
                 log.append(f"\n✅ Ajouté au core : {best} (rôles visés : {', '.join(desired_roles) or 'aucun'})")
+                report({"stage": "added", "pokemon": best, "core": list(core)})
                 found = True
             else:
                 log.append("⚠️ Aucun bon partenaire trouvé, élargissement du metagame analysé.")
@@ -113,6 +189,10 @@ def build_synergy_core(around: List[str], role_targets: List[List[str]], core_si
             log.append("❌ Arrêt : impossible de compléter le core dans les contraintes actuelles.")
             break
 
+    stats = duel_cache.stats()
+    log.append(f"\n🗃️ Cache des duels : {stats['memory_hits'] + stats['disk_hits']} hits "
+               f"({stats['disk_hits']} disque), {stats['misses']} misses ({stats['hit_rate']}%)")
+
     log.append("\n🏁 Core final :")
     for mon in core:
         log.append(f" - {mon}")
@@ -132,13 +212,63 @@ def build_synergy_core(around: List[str], role_targets: List[List[str]], core_si
     print(f"📦 Données enregistrées dans {JSON_PATH}")
     return core
 
+def search_synergy_cores(around: List[str], role_targets: List[List[str]], core_size: int = 3, beam_width: int = 8) -> List[dict]:
+    """Mode --beam : classement des meilleurs cores (core_search), le premier est sauvegardé comme core."""
+    from core.core_search import DEFAULT_TOP_N, search_cores
+
+    beats = BeatsIndex(get_top_pokemon(None), get_duel_cache())
+    ranking = search_cores(around, role_targets, core_size, beam_width=beam_width, results=beam_width, beats=beats)
+    log = [f"🌐 Beam search (largeur {beam_width}) d’un core de {core_size} Pokémon autour de : {', '.join(around)}",
+           f"\n🏆 Meilleurs cores contre le top {DEFAULT_TOP_N} :"]
+    for rank, result in enumerate(ranking, 1):
+        log.append(f" {rank}. {', '.join(result['core'])} — score {result['score']} "
+                   f"({len(result['uncovered'])} menaces non couvertes)")
+
+    if not ranking:
+        log.append("❌ Aucun core ne respecte les contraintes de rôles.")
+        print("\n".join(log))
+        return ranking
+
+    core = ranking[0]["core"]
+    duel_log = {}
+    for threat in beats.names_of(beats.top_mask(DEFAULT_TOP_N) & ~beats.mask(core)):
+        for target in core:
+            duel_log.setdefault(str(threat), {})[str(target)] = beats.verdict(threat, target)
+
+    print("\n".join(log))
+    with open(LOG_PATH, "w", encoding="utf-8") as f:
+        f.write("\n".join(log))
+    with open(JSON_PATH, "w", encoding="utf-8") as f:
+        json.dump({
+            "core": core,
+            "ranking": ranking,
+            "log": log,
+            "duels": sanitize_keys(duel_log)
+        }, f, indent=2)
+
+    print(f"\n📁 Résumé complet écrit dans {LOG_PATH}")
+    print(f"📦 Données enregistrées dans {JSON_PATH}")
+    return ranking
+
 # === CLI ===
 if __name__ == "__main__":
     if "--roles" not in sys.argv:
-        print("❌ Usage : python -m core.synergy_calculator <core_size> <poke1> <poke2> ... --roles <role_n> ...")
+        print("❌ Usage : python -m core.synergy_calculator <core_size> <poke1> <poke2> ... [--beam K] [--no-screen] --roles <role_n> ...")
         print("💡 Exemple : python -m core.synergy_calculator 4 Iron_Valiant --roles aucun physical_wall setup_sweeper")
         sys.exit(1)
 
+    # --beam K : beam search au lieu du glouton, classement des K meilleurs cores
+    beam_width = None
+    if "--beam" in sys.argv:
+        beam_idx = sys.argv.index("--beam")
+        beam_width = int(sys.argv[beam_idx + 1])
+        del sys.argv[beam_idx:beam_idx + 2]
+
+    # --no-screen : duels exacts pour tous les candidats (sans pré-filtre)
+    screen = "--no-screen" not in sys.argv
+    if not screen:
+        sys.argv.remove("--no-screen")
+
     idx = sys.argv.index("--roles")
     core_size = int(sys.argv[1])
     around = [arg.replace("_", " ") for arg in sys.argv[2:idx]]
@@ -148,8 +278,9 @@ if __name__ == "__main__":
         print("❌ Incohérence entre nombre de Pokémon fixés et rôles fournis.")
         sys.exit(1)
 
-    roles = []
-    for role in role_args:
-        roles.append([] if role.lower() == "aucun" else role.split(","))
+    roles = parse_roles(role_args)
 
-    build_synergy_core(around, roles, core_size)
+    if beam_width:
+        search_synergy_cores(around, roles, core_size, beam_width)
+    else:
+        build_synergy_core(around, roles, core_size, screen=screen)
@@ -1,16 +1,15 @@
-from core.metagame_analyzer import load_metagame_data, get_top_threats
+from core.metagame_analyzer import get_metagame_store
 from data.pokedex import get_pokemon_data, get_types
 from core.synergy_calculator import is_compatible_with_team  # à créer bientôt
+from core.tournament import load_winrate_matrix
 
 from typing import List
 
-metagame = load_metagame_data()
-
 class TeamBuilder:
     def __init__(self, style: str = "balance"):
         self.team = []
         self.style = style.lower()
-        self.threats = [name for name, _ in get_top_threats(metagame)]
+        self.threats = [name for name, _ in get_metagame_store().top_viability(10)]
 
     def add_pokemon(self, name: str, force: bool = False) -> bool:
         """Ajoute un Pokémon à la team si compatible. Force = ignorer les synergies."""
@@ -53,8 +52,21 @@ class TeamBuilder:
         from core.team_validator import print_team_diagnostics
         print_team_diagnostics(self.team)
 
+    def rank_by_tournament(self, candidates: List[str]) -> List[str]:
+        """Trie les candidats par winrate moyen contre les menaces (matrice du tournoi, si dispo)."""
+        matrix = load_winrate_matrix()
+        if matrix is None:
+            return candidates
+
+        def score(name: str) -> float:
+            rates = [matrix.get(name, threat) for threat in self.threats]
+            rates = [r for r in rates if r is not None]
+            return sum(rates) / len(rates) if rates else 0.0
+
+        return sorted(candidates, key=score, reverse=True)
+
     def suggest_next_member(self) -> str | None:
-        candidates = [name for name, _ in get_top_threats(metagame, top_n=40)]
+        candidates = self.rank_by_tournament([name for name, _ in get_metagame_store().top_viability(40)])
 
         for name in candidates:
             if name.lower() in [p["name"].lower() for p in self.team]:
@@ -0,0 +1,126 @@
+from typing import Dict, Iterable, List, Optional
+
+from core.new_pokemon_analyzer import duel_result_summary, invert_summary, prefetch_duel_results
+from data.name_index import normalize
+
+
+def bits(mask: int) -> Iterable[int]:
+    """Indices des bits à 1 d'un masque, du plus petit au plus grand."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class BeatsIndex:
+    """Résultats des duels du metagame sous forme de masques d'entiers.
+
+    Le bit i correspond à names[i] (le metagame trié par usage) : le top N est donc le
+    masque des N premiers bits, et élargir le top n'ajoute que des bits. Chaque duel
+    n'est résolu qu'une fois, à la demande, et remplit les deux sens quand son résumé le permet.
+    """
+
+    def __init__(self, names: List[str], duel_cache: dict, model: str = None):
+        self.names = []
+        self.index = {}
+        self.duel_cache = duel_cache
+        self.model = model
+        self.beats = []      # beats[i] : adversaires battus par i
+        self.beaten_by = []  # beaten_by[j] : Pokémon qui battent j
+        self.draws = []
+        self.errors = []
+        self.known = []      # known[i] : duels de i déjà résolus
+        for name in names:
+            self.id(name)
+        self.metagame_size = len(self.names)
+
+    def id(self, name: str) -> int:
+        """Bit d'un Pokémon ; un nom hors metagame (core imposé) prend le bit suivant."""
+        key = normalize(name)
+        if key not in self.index:
+            self.index[key] = len(self.names)
+            self.names.append(name)
+            for table in (self.beats, self.beaten_by, self.draws, self.errors, self.known):
+                table.append(0)
+        return self.index[key]
+
+    def mask(self, names: Iterable[str]) -> int:
+        m = 0
+        for name in names:
+            m |= 1 << self.id(name)
+        return m
+
+    def top_mask(self, top_n: int) -> int:
+        return (1 << min(top_n, self.metagame_size)) - 1
+
+    def names_of(self, mask: int) -> List[str]:
+        return [self.names[i] for i in bits(mask)]
+
+    def _record(self, i: int, j: int, summary: dict):
+        self._store(i, j, summary)
+        # Le sens inverse se relit sur les mêmes compteurs (une défaite n'est pas une victoire
+        # adverse quand les nuls comptent) ; un verdict anticipé autre qu'une victoire n'en dit rien
+        if "error" in summary or summary.get("exact", True) or summary.get("verdict") == "✅ Win":
+            self._store(j, i, invert_summary(summary))
+
+    def _store(self, i: int, j: int, summary: dict):
+        verdict = summary.get("verdict")
+        self.known[i] |= 1 << j
+        if "error" in summary:
+            self.errors[i] |= 1 << j
+        elif verdict == "✅ Win":
+            self.beats[i] |= 1 << j
+            self.beaten_by[j] |= 1 << i
+        elif verdict != "❌ Loss":
+            self.draws[i] |= 1 << j
+
+    def ensure(self, rows: int, cols: int) -> int:
+        """Résout les duels (ligne, colonne) encore inconnus ; renvoie leur nombre."""
+        todo = []
+        for i in bits(rows):
+            for j in bits(cols & ~self.known[i] & ~(1 << i)):
+                todo.append((i, j))
+        if not todo:
+            return 0
+        prefetch_duel_results([(self.names[i], self.names[j]) for i, j in todo], self.duel_cache, self.model)
+        for i, j in todo:
+            if not self.known[i] >> j & 1:
+                self._record(i, j, duel_result_summary(self.names[i], self.names[j], self.duel_cache, self.model))
+        return len(todo)
+
+    def verdict(self, a: str, b: str) -> Optional[str]:
+        """Verdict de a contre b tel que stocké (None si inconnu ou en erreur)."""
+        i, j = self.id(a), self.id(b)
+        if not self.known[i] >> j & 1 or self.errors[i] >> j & 1:
+            return None
+        if self.beats[i] >> j & 1:
+            return "✅ Win"
+        if self.draws[i] >> j & 1:
+            return "⚖️ Draw"
+        return "❌ Loss"
+
+    def threats_to(self, core: List[str], top_n: int) -> int:
+        """Masque des Pokémon du top N qui battent tout le core (au moins un membre si core < 2)."""
+        core_mask = self.mask(core)
+        rows = self.top_mask(top_n) & ~core_mask
+        self.ensure(rows, core_mask)
+        if len(core) >= 2:
+            hit = rows
+            for name in core:
+                hit &= self.beaten_by[self.id(name)]
+        else:
+            hit = 0
+            for name in core:
+                hit |= self.beaten_by[self.id(name)]
+        return hit & rows
+
+    def counter_scores(self, candidates: List[str], threats: int) -> Dict[str, float]:
+        """Score de chaque candidat : menaces battues + 0.5 par nul (popcount), scores nuls exclus."""
+        self.ensure(self.mask(candidates), threats)
+        scores = {}
+        for name in candidates:
+            i = self.id(name)
+            score = (self.beats[i] & threats).bit_count() + 0.5 * (self.draws[i] & threats).bit_count()
+            if score:
+                scores[name] = score
+        return scores
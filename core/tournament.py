@@ -0,0 +1,271 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from itertools import combinations
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from core.duel_simulator import WIN, LOSS, DRAW, run_matchup, resolve_matchup
+from core.matchup_cache import diff_set_hashes, get_calc_version, set_content_hash, set_hashes
+from core.metagame_analyzer import load_metagame_data
+from data.name_index import normalize
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TOURNAMENT_DIR = os.path.join(BASE_DIR, "data", "results", "tournament")
+CHECKPOINT_FILE = "checkpoint.ndjson"
+
+DEFAULT_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+
+
+# === Matchs ===
+
+def play_pair(pair: Tuple[str, str]) -> dict:
+    """Un match du tournoi : victoires / défaites / nuls de a contre b, sur toutes les paires de sets.
+
+    Exécuté dans un process du pool ; le sens (b, a) s'en déduit par symétrie.
+    """
+    a, b = pair
+    try:
+        verdicts = resolve_matchup(run_matchup(a, b))
+    except Exception as e:
+        return {"a": a, "b": b, "error": str(e)}
+    return {
+        "a": a, "b": b,
+        "w": int((verdicts == WIN).sum()),
+        "l": int((verdicts == LOSS).sum()),
+        "d": int((verdicts == DRAW).sum())
+    }
+
+
+def write_checkpoint(path: str, meta: dict, results: Dict[Tuple[str, str], dict]):
+    """Réécrit le checkpoint avec seulement les matchs encore valides."""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(json.dumps({"meta": meta}) + "\n")
+        for record in results.values():
+            f.write(json.dumps(record) + "\n")
+
+
+def read_checkpoint(path: str) -> Tuple[Optional[dict], Dict[Tuple[str, str], dict]]:
+    """(en-tête, résultats réussis par paire) d'un checkpoint NDJSON ; lignes tronquées ignorées."""
+    meta, results = None, {}
+    if not os.path.exists(path):
+        return meta, results
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # dernière ligne coupée par une interruption
+            if "meta" in record:
+                meta = record["meta"]
+            elif "error" not in record:
+                results[(record["a"], record["b"])] = record
+    return meta, results
+
+
+def build_matrices(names: List[str], results: Dict[Tuple[str, str], dict]) -> Tuple[np.ndarray, np.ndarray]:
+    """Matrice dense des winrates (NaN = match absent) et compteurs (victoires, défaites, nuls)."""
+    index = {name: i for i, name in enumerate(names)}
+    outcomes = np.zeros((len(names), len(names), 3), dtype=np.int32)
+    winrate = np.full((len(names), len(names)), np.nan, dtype=np.float32)
+    for (a, b), r in results.items():
+        if a not in index or b not in index:
+            continue
+        i, j = index[a], index[b]
+        outcomes[i, j] = (r["w"], r["l"], r["d"])
+        outcomes[j, i] = (r["l"], r["w"], r["d"])
+        total = r["w"] + r["l"] + r["d"]
+        if total:
+            winrate[i, j] = 100 * r["w"] / total
+            winrate[j, i] = 100 * r["l"] / total
+    np.fill_diagonal(winrate, 50.0)
+    return winrate, outcomes
+
+
+def write_matrices(directory: str, names: List[str], results: Dict[Tuple[str, str], dict]):
+    winrate, outcomes = build_matrices(names, results)
+    np.save(os.path.join(directory, "winrate.npy"), winrate)
+    np.save(os.path.join(directory, "outcomes.npy"), outcomes)
+    with open(os.path.join(directory, "names.json"), "w", encoding="utf-8") as f:
+        json.dump({
+            "calc_version": get_calc_version(),
+            "names": names,
+            "hashes": {name: set_content_hash(name) for name in names},
+            "set_hashes": {name: set_hashes(name) for name in names}
+        }, f)
+
+
+def run_tournament(directory: str = TOURNAMENT_DIR, workers: int = DEFAULT_WORKERS,
+                   names: Optional[List[str]] = None, restart: bool = False) -> dict:
+    """Round-robin complet du metagame, reprenable et incrémental.
+
+    Chaque match terminé est écrit au fil de l'eau avec l'empreinte des sets des deux
+    Pokémon : au lancement suivant, seuls les matchs manquants ou dont un des deux
+    Pokémon a changé de sets sont rejoués.
+    """
+    if names is None:
+        names = [normalize(n) for n in load_metagame_data()]
+    os.makedirs(directory, exist_ok=True)
+    checkpoint = os.path.join(directory, CHECKPOINT_FILE)
+    meta = {"calc_version": get_calc_version()}
+    hashes = {name: set_content_hash(name) for name in names}
+
+    previous_meta, records = read_checkpoint(checkpoint)
+    if restart or previous_meta != meta:
+        if previous_meta is not None and not restart:
+            print("♻️ Checkpoint d'une autre version du calc : on repart de zéro.")
+        records = {}
+
+    # Matchs réutilisables : les deux Pokémon sont toujours là, avec les mêmes sets
+    results = {
+        pair: r for pair, r in records.items()
+        if r.get("ha") == hashes.get(r["a"]) and r.get("hb") == hashes.get(r["b"])
+    }
+    stale = len(records) - len(results)
+    if restart or previous_meta != meta or stale:
+        write_checkpoint(checkpoint, meta, results)
+
+    pairs = [(a, b) for a, b in combinations(names, 2) if (a, b) not in results and (b, a) not in results]
+    print(f"🏟️ {len(names)} Pokémon : {len(results)} matchs réutilisés, {len(pairs)} à (re)calculer "
+          f"dont {stale} invalidés par un changement de sets ({workers} process)")
+
+    errors = 0
+    # Un seul worker : les matchs tournent dans ce process (mêmes réglages et même dex, sans fork)
+    executor_class = ProcessPoolExecutor if workers > 1 else ThreadPoolExecutor
+    try:
+        with open(checkpoint, "a", encoding="utf-8") as out, executor_class(max_workers=workers) as executor:
+            futures = [executor.submit(play_pair, pair) for pair in pairs]
+            for done, future in enumerate(as_completed(futures), 1):
+                record = future.result()
+                record["ha"], record["hb"] = hashes[record["a"]], hashes[record["b"]]
+                out.write(json.dumps(record) + "\n")
+                out.flush()
+                if "error" in record:
+                    errors += 1
+                else:
+                    results[(record["a"], record["b"])] = record
+                if done % 500 == 0:
+                    print(f"   ⏳ {done}/{len(pairs)} matchs")
+    except KeyboardInterrupt:
+        print("⏸️ Interrompu : relance la même commande pour reprendre.")
+        raise
+    finally:
+        write_matrices(directory, names, results)
+
+    return {
+        "pokemon": len(names), "played": len(pairs) - errors, "errors": errors,
+        "reused": len(results) - (len(pairs) - errors), "stale": stale, "total": len(results)
+    }
+
+
+def refresh_tournament(directory: str = TOURNAMENT_DIR, workers: int = DEFAULT_WORKERS) -> dict:
+    """Après un nouveau dex ou metagame : détaille les sets modifiés puis ne rejoue que leurs matchs."""
+    names = [normalize(n) for n in load_metagame_data()]
+    previous = {}
+    index_path = os.path.join(directory, "names.json")
+    if os.path.exists(index_path):
+        with open(index_path, "r", encoding="utf-8") as f:
+            previous = json.load(f).get("set_hashes", {})
+
+    changed = diff_set_hashes(previous, names)
+    removed = [name for name in previous if name not in names]
+    for name, sets in changed.items():
+        label = "nouveau" if name not in previous else f"{len(sets)} set(s) modifié(s)"
+        print(f"   🔄 {name} : {label}")
+    for name in removed:
+        print(f"   ➖ {name} : retiré du metagame")
+    return run_tournament(directory, workers=workers, names=names)
+
+
+# === Lecture ===
+
+class WinrateMatrix:
+    """Résultats du tournoi : winrate[i, j] = % de paires de sets gagnées par i contre j."""
+
+    def __init__(self, directory: str = TOURNAMENT_DIR):
+        self.directory = directory
+        with open(os.path.join(directory, "names.json"), "r", encoding="utf-8") as f:
+            index = json.load(f)
+        self.calc_version = index["calc_version"]
+        self.names = index["names"]
+        self.hashes = index["hashes"]
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.winrate = np.load(os.path.join(directory, "winrate.npy"), mmap_mode="r")
+        self.outcomes = np.load(os.path.join(directory, "outcomes.npy"), mmap_mode="r")
+
+    def is_fresh(self, name: str) -> bool:
+        return name in self.hashes and self.hashes[name] == set_content_hash(name)
+
+    def has(self, a: str, b: str) -> bool:
+        a, b = normalize(a), normalize(b)
+        if a == b or self.calc_version != get_calc_version() or not (self.is_fresh(a) and self.is_fresh(b)):
+            return False
+        return not np.isnan(self.winrate[self.index[a], self.index[b]])
+
+    def get(self, a: str, b: str) -> Optional[float]:
+        """Winrate de a contre b en %, None si le match n'est pas (ou plus) valide."""
+        if not self.has(a, b):
+            return None
+        return float(self.winrate[self.index[normalize(a)], self.index[normalize(b)]])
+
+    def outcome(self, a: str, b: str) -> Optional[Tuple[int, int, int]]:
+        """(victoires, défaites, nuls) de a contre b."""
+        if not self.has(a, b):
+            return None
+        w, l, d = self.outcomes[self.index[normalize(a)], self.index[normalize(b)]]
+        return int(w), int(l), int(d)
+
+    def row(self, name: str) -> Dict[str, float]:
+        """Winrates de `name` contre tout le metagame (matchs valides seulement)."""
+        rates = {}
+        for other in self.names:
+            rate = self.get(name, other) if other != normalize(name) else None
+            if rate is not None:
+                rates[other] = rate
+        return rates
+
+
+_matrix: Optional[WinrateMatrix] = None
+_matrix_mtime: Optional[float] = None
+
+
+def load_winrate_matrix(directory: str = TOURNAMENT_DIR) -> Optional[WinrateMatrix]:
+    """Matrice du dernier tournoi, rechargée si elle a changé ; None si aucun tournoi n'a tourné."""
+    global _matrix, _matrix_mtime
+    path = os.path.join(directory, "names.json")
+    if not os.path.exists(path):
+        return None
+    mtime = os.path.getmtime(path)
+    if _matrix is None or _matrix_mtime != mtime or _matrix.directory != directory:
+        _matrix = WinrateMatrix(directory)
+        _matrix_mtime = mtime
+    return _matrix
+
+
+# === CLI ===
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Tournoi round-robin du metagame")
+    parser.add_argument("command", nargs="?", default="run", choices=["run", "refresh", "info"])
+    parser.add_argument("--out", default=TOURNAMENT_DIR)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--restart", action="store_true", help="ignore le checkpoint existant")
+    args = parser.parse_args()
+
+    if args.command in ("run", "refresh"):
+        if args.command == "refresh":
+            summary = refresh_tournament(args.out, workers=args.workers)
+        else:
+            summary = run_tournament(args.out, workers=args.workers, restart=args.restart)
+        print(f"✅ {summary['reused']} matchs réutilisés, {summary['played']} recalculés, "
+              f"{summary['errors']} erreurs, {summary['total']} au total pour {summary['pokemon']} Pokémon")
+        print(f"📁 Matrice écrite dans {args.out}")
+    else:
+        matrix = load_winrate_matrix(args.out)
+        if matrix is None:
+            print("❌ Aucun tournoi trouvé. Lance d'abord : python -m core.tournament")
+        else:
+            played = int(np.count_nonzero(~np.isnan(np.asarray(matrix.winrate)))) - len(matrix.names)
+            print(f"📦 {len(matrix.names)} Pokémon, {played // 2} matchs, calc {matrix.calc_version}")
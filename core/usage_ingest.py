@@ -0,0 +1,318 @@
+import gzip
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, TextIO, Tuple
+
+from core.metagame_analyzer import DATA_PATH
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATS_DIR = os.path.join(BASE_DIR, "data", "stats")
+
+DEFAULT_FORMAT = "gen9ou"
+DEFAULT_CUTOFF = 1695
+DEFAULT_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+CHUNK_SIZE = 1 << 20
+
+# Sections des fichiers moveset → clés de parsed_metagame.json
+SECTIONS = {
+    "Abilities": "abilities",
+    "Items": "items",
+    "Spreads": "spreads",
+    "Moves": "moves",
+    "Tera Types": "tera_types",
+    "Teammates": "teammates",
+    "Checks and Counters": "checks_counters",
+}
+
+# Mêmes coupes que les fichiers moveset quand on part du chaos JSON
+CUMULATIVE_CUTOFF = 95.0
+MAX_SPREADS = 6
+MAX_TEAMMATES = 12
+MIN_CHECK_BATTLES = 20
+MIN_CHECK_SCORE = 0.5
+
+ENTRY_RE = re.compile(r"^(.*?)\s+\+?(-?[\d.]+)%$")
+CHECK_RE = re.compile(r"^(.*?\s[\d.]+)\s+\((.*)\)$")
+
+
+def open_text(path: str) -> TextIO:
+    """Ouvre un fichier de stats, compressé ou non."""
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+def stats_paths(root: str, month: str, fmt: str = DEFAULT_FORMAT, cutoff: int = DEFAULT_CUTOFF) -> Dict[str, Optional[str]]:
+    """Fichiers d'un mois, rangés comme smogon.com/stats : {mois}/moveset/{format}-{cutoff}.txt, {mois}/chaos/...json."""
+    paths = {}
+    for kind, ext in (("moveset", "txt"), ("chaos", "json")):
+        base = os.path.join(root, month, kind, f"{fmt}-{cutoff}.{ext}")
+        paths[kind] = next((p for p in (base, base + ".gz") if os.path.exists(p)), None)
+    return paths
+
+
+def empty_entry() -> dict:
+    entry = {key: {} for key in SECTIONS.values()}
+    entry["checks_counters"] = []
+    entry["raw_count"] = 0
+    entry["viability_ceiling"] = 0
+    return entry
+
+
+# === Fichiers moveset (texte) ===
+
+def iter_moveset(lines: Iterator[str]) -> Iterator[Tuple[str, dict]]:
+    """Parse un fichier moveset ligne à ligne : (Pokémon, entrée) au fil de la lecture.
+
+    Chaque bloc est encadré de séparateurs "+---+" : deux séparateurs consécutifs
+    annoncent un nouveau Pokémon, un seul annonce une section.
+    """
+    name, entry, section = None, None, None
+    separators = 2
+    for raw in lines:
+        line = raw.strip()
+        if line.startswith("+"):
+            separators += 1
+            continue
+        line = line.strip("|").strip()
+        if not line:
+            continue
+        after, separators = separators, 0
+
+        if after >= 2:
+            if name is not None:
+                yield name, entry
+            name, entry, section = line, empty_entry(), None
+            continue
+        if line.startswith("Raw count:"):
+            entry["raw_count"] = int(line.split(":", 1)[1])
+            section = None
+        elif line.startswith("Viability Ceiling:"):
+            entry["viability_ceiling"] = int(line.split(":", 1)[1])
+        elif after == 1:
+            # Sections inconnues (Happiness...) ignorées
+            section = SECTIONS.get(line, "") if not line.startswith("Avg. weight") else None
+        elif section == "checks_counters":
+            match = CHECK_RE.match(line)
+            if match:
+                entry["checks_counters"].append({"name": match.group(1), "detail": match.group(2)})
+        elif section:
+            match = ENTRY_RE.match(line)
+            if match:
+                entry[section][match.group(1)] = float(match.group(2))
+    if name is not None:
+        yield name, entry
+
+
+# === Chaos JSON ===
+
+class _Incomplete(Exception):
+    pass
+
+
+def iter_chaos(f: TextIO, chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[str, dict]]:
+    """Parcourt l'objet "data" d'un chaos JSON entrée par entrée, sans charger le fichier.
+
+    Seul le morceau en cours de décodage (une entrée + un bloc de lecture) reste en mémoire.
+    """
+    decoder = json.JSONDecoder()
+    buf, pos, eof = "", 0, False
+
+    def fill():
+        nonlocal buf, pos, eof
+        chunk = f.read(chunk_size)
+        eof = not chunk
+        buf, pos = buf[pos:] + chunk, 0
+
+    def skip(i: int, chars: str = " \t\r\n") -> int:
+        while i < len(buf) and buf[i] in chars:
+            i += 1
+        if i >= len(buf):
+            raise _Incomplete()
+        return i
+
+    # Début de l'objet "data" (après le petit bloc "info")
+    while True:
+        start = buf.find('"data"', pos)
+        if start >= 0:
+            try:
+                i = skip(start + len('"data"'))
+                if buf[i] == ":":
+                    i = skip(i + 1)
+                    if buf[i] != "{":
+                        raise ValueError("chaos JSON : \"data\" n'est pas un objet")
+                    pos = i + 1
+                    break
+                pos = start + 1
+                continue
+            except _Incomplete:
+                pos = start
+        else:
+            pos = max(pos, len(buf) - len('"data"'))
+        if eof:
+            raise ValueError("chaos JSON : objet \"data\" introuvable")
+        fill()
+
+    while True:
+        try:
+            i = skip(pos, " \t\r\n,")
+            if buf[i] == "}":
+                return
+            key, i = decoder.raw_decode(buf, i)
+            i = skip(i)
+            if buf[i] != ":":
+                raise ValueError(f"chaos JSON : ':' attendu après {key!r}")
+            value, i = decoder.raw_decode(buf, skip(i + 1))
+        except (_Incomplete, json.JSONDecodeError):
+            if eof:
+                raise ValueError("chaos JSON : fichier tronqué")
+            fill()
+            continue
+        pos = i
+        yield key, value
+
+
+def to_id(label: str) -> str:
+    return re.sub(r"[^a-z0-9]", "", label.lower())
+
+
+@lru_cache(maxsize=1)
+def display_labels() -> Dict[str, str]:
+    """id Showdown → nom affiché ("rockyhelmet" → "Rocky Helmet"), appris sur les sets du dex."""
+    from data.pokedex import get_pokedex
+
+    labels = {}
+    for data in get_pokedex().values():
+        for key, text in data.items():
+            if not key.startswith("strategy: "):
+                continue
+            for line in text.splitlines():
+                line = line.strip()
+                if line.startswith("@ "):
+                    label = line[2:]
+                elif line.startswith(("Ability: ", "Tera Type: ")):
+                    label = line.split(": ", 1)[1]
+                elif line.startswith("- "):
+                    label = line[2:]
+                else:
+                    continue
+                for option in label.split(" / "):
+                    labels.setdefault(to_id(option), option.strip())
+    return labels
+
+
+def shares(counts: dict, total: float, scale: float = 100.0, limit: Optional[int] = None,
+           other: bool = True) -> Dict[str, float]:
+    """Pourcentages triés coupés comme les fichiers moveset (95 % cumulés), le reste dans "Other"."""
+    labels = display_labels()
+    out, acc = {}, 0.0
+    for key, count in sorted(counts.items(), key=lambda x: x[1], reverse=True):
+        if not key or count <= 0 or (limit and len(out) >= limit) or acc >= scale * CUMULATIVE_CUTOFF / 100:
+            break
+        pct = 100 * count / total
+        out[labels.get(key, key)] = round(pct, 3)
+        acc += pct
+    if other and scale - acc >= 0.001:
+        out["Other"] = round(scale - acc, 3)
+    return out
+
+
+def chaos_entry(raw: dict) -> dict:
+    """Entrée chaos (comptes pondérés, ids Showdown) → schéma de parsed_metagame.json."""
+    entry = empty_entry()
+    total = sum(raw.get("Abilities", {}).values())
+    if total <= 0:
+        return entry
+    entry["abilities"] = shares(raw.get("Abilities", {}), total)
+    entry["items"] = shares(raw.get("Items", {}), total)
+    entry["spreads"] = shares(raw.get("Spreads", {}), total, limit=MAX_SPREADS)
+    # 4 slots de moves : la colonne somme à 400 %
+    entry["moves"] = shares({k: v for k, v in raw.get("Moves", {}).items() if k}, total, scale=400.0)
+    entry["tera_types"] = shares(raw.get("Tera Types", {}), total)
+    entry["teammates"] = shares(raw.get("Teammates", {}), total, limit=MAX_TEAMMATES, other=False)
+
+    checks = []
+    for name, (battles, p, d) in raw.get("Checks and Counters", {}).items():
+        score = p - 4 * d
+        if battles > MIN_CHECK_BATTLES and score > MIN_CHECK_SCORE:
+            checks.append((score, name, p, d))
+    entry["checks_counters"] = [
+        {"name": f"{name} {100 * score:.3f}", "detail": f"{100 * p:.2f}±{100 * d:.2f}"}
+        for score, name, p, d in sorted(checks, reverse=True)
+    ]
+    entry["raw_count"] = int(raw.get("Raw count", 0))
+    viability = raw.get("Viability Ceiling") or [0, 0]
+    entry["viability_ceiling"] = int(viability[1])
+    return entry
+
+
+# === Ingestion ===
+
+def ingest_month(args: Tuple[str, str, str, int]) -> Tuple[str, dict]:
+    """Un mois (exécuté dans un process du pool) : moveset si présent, chaos JSON sinon."""
+    root, month, fmt, cutoff = args
+    paths = stats_paths(root, month, fmt, cutoff)
+    if paths["moveset"]:
+        with open_text(paths["moveset"]) as f:
+            data = dict(iter_moveset(f))
+    elif paths["chaos"]:
+        with open_text(paths["chaos"]) as f:
+            data = {name: chaos_entry(raw) for name, raw in iter_chaos(f)}
+        data = dict(sorted(data.items(), key=lambda x: x[1]["raw_count"], reverse=True))
+    else:
+        raise FileNotFoundError(f"Aucune stat {fmt}-{cutoff} pour {month} dans {root}")
+    return month, data
+
+
+def ingest_months(months: List[str], root: str = STATS_DIR, fmt: str = DEFAULT_FORMAT,
+                  cutoff: int = DEFAULT_CUTOFF, workers: int = DEFAULT_WORKERS) -> Dict[str, dict]:
+    """Parse plusieurs mois en parallèle : {mois: données au format parsed_metagame.json}."""
+    jobs = [(root, month, fmt, cutoff) for month in months]
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as executor:
+            return dict(sorted(executor.map(ingest_month, jobs)))
+    return dict(sorted(map(ingest_month, jobs)))
+
+
+def write_metagame(data: dict, path: str = DATA_PATH):
+    """Écriture atomique : les lecteurs (MetagameStore) ne voient jamais un fichier à moitié écrit."""
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Ingestion des stats d'usage Smogon (moveset / chaos)")
+    parser.add_argument("months", nargs="+", help="mois au format AAAA-MM")
+    parser.add_argument("--root", default=STATS_DIR, help="dossier des stats téléchargées ({mois}/moveset, {mois}/chaos)")
+    parser.add_argument("--format", default=DEFAULT_FORMAT)
+    parser.add_argument("--cutoff", type=int, default=DEFAULT_CUTOFF)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--output", default=DATA_PATH, help="reçoit le mois le plus récent")
+    parser.add_argument("--out-dir", help="écrit aussi chaque mois dans {out-dir}/{mois}.json")
+    parser.add_argument("--history", action="store_true", help="ajoute les mois à l'historique (core/metagame_history.py)")
+    args = parser.parse_args()
+
+    print(f"📥 Ingestion {args.format}-{args.cutoff} : {', '.join(args.months)}")
+    results = ingest_months(args.months, args.root, args.format, args.cutoff, args.workers)
+    for month, data in results.items():
+        print(f"✅ {month} : {len(data)} Pokémon")
+        if args.out_dir:
+            os.makedirs(args.out_dir, exist_ok=True)
+            write_metagame(data, os.path.join(args.out_dir, f"{month}.json"))
+    if args.history:
+        from core.metagame_history import HISTORY_DIR, MetagameHistory, load_history
+        history = load_history() or MetagameHistory()
+        for month, data in results.items():
+            history.add_month(month, data)
+        history.save(HISTORY_DIR)
+        print(f"🗂️ Historique : {len(history.months)} mois")
+    latest = max(results)
+    write_metagame(results[latest], args.output)
+    print(f"📁 {latest} écrit dans {args.output}")
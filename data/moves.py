@@ -0,0 +1,294 @@
+import re
+
+# 🗡️ Données de moves Gen 9 pour le moteur de dégâts natif (core.damage_engine)
+# (type, catégorie, puissance, précision, flags) — précision None = ne rate jamais
+# Les moves à puissance variable, multi-coups ou à dégâts fixes ne sont volontairement
+# pas listés : ils restent calculés par @smogon/calc.
+ATTACKING_MOVES = {
+    # === Physiques ===
+    "accelerock":       ("rock", "physical", 40, 100, "contact priority"),
+    "acrobatics":       ("flying", "physical", 55, 100, "contact acrobatics"),
+    "aquajet":          ("water", "physical", 40, 100, "contact priority"),
+    "aquacutter":       ("water", "physical", 70, 100, "slicing"),
+    "aquastep":         ("water", "physical", 80, 100, "contact"),
+    "axekick":          ("fighting", "physical", 120, 90, "contact"),
+    "bite":             ("dark", "physical", 60, 100, "contact bite"),
+    "bitterblade":      ("fire", "physical", 90, 100, "contact slicing"),
+    "bodypress":        ("fighting", "physical", 80, 100, "contact bodypress"),
+    "bodyslam":         ("normal", "physical", 85, 100, "contact"),
+    "bravebird":        ("flying", "physical", 120, 100, "contact"),
+    "breakingswipe":    ("dragon", "physical", 60, 100, "contact"),
+    "bugbite":          ("bug", "physical", 60, 100, "contact"),
+    "bulldoze":         ("ground", "physical", 60, 100, ""),
+    "bulletpunch":      ("steel", "physical", 40, 100, "contact punch priority"),
+    "ceaselessedge":    ("dark", "physical", 65, 90, "contact slicing"),
+    "closecombat":      ("fighting", "physical", 120, 100, "contact"),
+    "crabhammer":       ("water", "physical", 100, 90, "contact"),
+    "crunch":           ("dark", "physical", 80, 100, "contact bite"),
+    "darkestlariat":    ("dark", "physical", 85, 100, "contact"),
+    "diamondstorm":     ("rock", "physical", 100, 95, ""),
+    "dig":              ("ground", "physical", 80, 100, "contact"),
+    "doubleedge":       ("normal", "physical", 120, 100, "contact"),
+    "doubleshock":      ("electric", "physical", 120, 100, "contact"),
+    "dragonclaw":       ("dragon", "physical", 80, 100, "contact"),
+    "dragontail":       ("dragon", "physical", 60, 90, "contact"),
+    "drainpunch":       ("fighting", "physical", 75, 100, "contact punch"),
+    "drillrun":         ("ground", "physical", 80, 95, "contact"),
+    "drumbeating":      ("grass", "physical", 80, 100, ""),
+    "earthquake":       ("ground", "physical", 100, 100, ""),
+    "explosion":        ("normal", "physical", 250, 100, ""),
+    "extremespeed":     ("normal", "physical", 80, 100, "contact priority"),
+    "fakeout":          ("normal", "physical", 40, 100, "contact priority"),
+    "feint":            ("normal", "physical", 30, 100, "priority"),
+    "firefang":         ("fire", "physical", 65, 95, "contact bite"),
+    "firepunch":        ("fire", "physical", 75, 100, "contact punch"),
+    "facade":           ("normal", "physical", 70, 100, "contact"),
+    "firstimpression":  ("bug", "physical", 90, 100, "contact priority"),
+    "flamecharge":      ("fire", "physical", 50, 100, "contact"),
+    "flareblitz":       ("fire", "physical", 120, 100, "contact"),
+    "flipturn":         ("water", "physical", 60, 100, "contact"),
+    "fly":              ("flying", "physical", 90, 95, "contact"),
+    "foulplay":         ("dark", "physical", 95, 100, "contact foulplay"),
+    "gigaimpact":       ("normal", "physical", 150, 90, "contact"),
+    "gigatonhammer":    ("steel", "physical", 160, 100, ""),
+    "grassyglide":      ("grass", "physical", 55, 100, "contact"),
+    "gunkshot":         ("poison", "physical", 120, 80, ""),
+    "hammerarm":        ("fighting", "physical", 100, 90, "contact punch"),
+    "headlongrush":     ("ground", "physical", 120, 100, "contact punch"),
+    "headsmash":        ("rock", "physical", 150, 80, "contact"),
+    "highhorsepower":   ("ground", "physical", 95, 95, "contact"),
+    "highjumpkick":     ("fighting", "physical", 130, 90, "contact"),
+    "hornleech":        ("grass", "physical", 75, 100, "contact"),
+    "hyperspacefury":   ("dark", "physical", 100, None, ""),
+    "icefang":          ("ice", "physical", 65, 95, "contact bite"),
+    "icepunch":         ("ice", "physical", 75, 100, "contact punch"),
+    "iceshard":         ("ice", "physical", 40, 100, "priority"),
+    "icespinner":       ("ice", "physical", 80, 100, "contact"),
+    "iciclecrash":      ("ice", "physical", 85, 90, ""),
+    "ironhead":         ("steel", "physical", 80, 100, "contact"),
+    "irontail":         ("steel", "physical", 100, 75, "contact"),
+    "jawlock":          ("dark", "physical", 80, 100, "contact bite"),
+    "knockoff":         ("dark", "physical", 65, 100, "contact knockoff"),
+    "kowtowcleave":     ("dark", "physical", 85, None, "contact slicing"),
+    "leafblade":        ("grass", "physical", 90, 100, "contact slicing"),
+    "leechlife":        ("bug", "physical", 80, 100, "contact"),
+    "liquidation":      ("water", "physical", 85, 100, "contact"),
+    "machpunch":        ("fighting", "physical", 40, 100, "contact punch priority"),
+    "megahorn":         ("bug", "physical", 120, 85, "contact"),
+    "meteormash":       ("steel", "physical", 90, 90, "contact punch"),
+    "mightycleave":     ("rock", "physical", 95, 100, "contact slicing"),
+    "mortalspin":       ("poison", "physical", 30, 100, "contact"),
+    "nightslash":       ("dark", "physical", 70, 100, "contact slicing"),
+    "nuzzle":           ("electric", "physical", 20, 100, "contact"),
+    "outrage":          ("dragon", "physical", 120, 100, "contact"),
+    "phantomforce":     ("ghost", "physical", 90, 100, "contact"),
+    "playrough":        ("fairy", "physical", 90, 90, "contact"),
+    "poisonjab":        ("poison", "physical", 80, 100, "contact"),
+    "poltergeist":      ("ghost", "physical", 110, 90, ""),
+    "pounce":           ("bug", "physical", 50, 100, "contact"),
+    "powerwhip":        ("grass", "physical", 120, 85, "contact"),
+    "psyblade":         ("psychic", "physical", 80, 100, "contact slicing"),
+    "psychicfangs":     ("psychic", "physical", 85, 100, "contact bite"),
+    "psychocut":        ("psychic", "physical", 70, 100, "slicing"),
+    "pyroball":         ("fire", "physical", 120, 90, "bullet"),
+    "quickattack":      ("normal", "physical", 40, 100, "contact priority"),
+    "ragingfury":       ("fire", "physical", 120, 100, ""),
+    "rapidspin":        ("normal", "physical", 50, 100, "contact"),
+    "razorshell":       ("water", "physical", 75, 95, "contact slicing"),
+    "rockslide":        ("rock", "physical", 75, 90, ""),
+    "rocktomb":         ("rock", "physical", 60, 95, "contact"),
+    "rockwrecker":      ("rock", "physical", 150, 90, "bullet"),
+    "sacredfire":       ("fire", "physical", 100, 95, ""),
+    "sacredsword":      ("fighting", "physical", 90, 100, "contact slicing"),
+    "saltcure":         ("rock", "physical", 40, 100, ""),
+    "sandtomb":         ("ground", "physical", 35, 85, ""),
+    "seedbomb":         ("grass", "physical", 80, 100, "bullet"),
+    "selfdestruct":     ("normal", "physical", 200, 100, ""),
+    "shadowclaw":       ("ghost", "physical", 70, 100, "contact"),
+    "shadowsneak":      ("ghost", "physical", 40, 100, "contact priority"),
+    "skittersmack":     ("bug", "physical", 70, 90, "contact"),
+    "skyattack":        ("flying", "physical", 140, 90, ""),
+    "smackdown":        ("rock", "physical", 50, 100, ""),
+    "solarblade":       ("grass", "physical", 125, 100, "contact slicing"),
+    "spiritbreak":      ("fairy", "physical", 75, 100, "contact"),
+    "spiritshackle":    ("ghost", "physical", 80, 100, ""),
+    "steelwing":        ("steel", "physical", 70, 90, "contact"),
+    "stoneaxe":         ("rock", "physical", 65, 90, "contact slicing"),
+    "stoneedge":        ("rock", "physical", 100, 80, ""),
+    "stompingtantrum":  ("ground", "physical", 75, 100, "contact"),
+    "suckerpunch":      ("dark", "physical", 70, 100, "contact priority"),
+    "sunsteelstrike":   ("steel", "physical", 100, 100, "contact"),
+    "supercellslam":    ("electric", "physical", 100, 95, "contact"),
+    "superpower":       ("fighting", "physical", 120, 100, "contact"),
+    "temperflare":      ("fire", "physical", 75, 100, "contact"),
+    "throatchop":       ("dark", "physical", 80, 100, "contact"),
+    "thunderouskick":   ("fighting", "physical", 90, 100, "contact"),
+    "thunderpunch":     ("electric", "physical", 75, 100, "contact punch"),
+    "trailblaze":       ("grass", "physical", 50, 100, "contact"),
+    "triplearrows":     ("fighting", "physical", 90, 100, ""),
+    "uturn":            ("bug", "physical", 70, 100, "contact"),
+    "vcreate":          ("fire", "physical", 180, 95, "contact"),
+    "waterfall":        ("water", "physical", 80, 100, "contact"),
+    "wavecrash":        ("water", "physical", 120, 100, "contact"),
+    "wildcharge":       ("electric", "physical", 90, 100, "contact"),
+    "woodhammer":       ("grass", "physical", 120, 100, "contact"),
+    "xscissor":         ("bug", "physical", 80, 100, "contact slicing"),
+    "zenheadbutt":      ("psychic", "physical", 80, 90, "contact"),
+    # === Spéciaux ===
+    "acidspray":        ("poison", "special", 40, 100, "bullet"),
+    "airslash":         ("flying", "special", 75, 95, "slicing"),
+    "alluringvoice":    ("fairy", "special", 80, 100, "sound"),
+    "armorcannon":      ("fire", "special", 120, 100, ""),
+    "aurasphere":       ("fighting", "special", 80, None, "pulse bullet"),
+    "blastburn":        ("fire", "special", 150, 90, ""),
+    "bleakwindstorm":   ("flying", "special", 100, 80, ""),
+    "blizzard":         ("ice", "special", 110, 70, ""),
+    "boomburst":        ("normal", "special", 140, 100, "sound"),
+    "bugbuzz":          ("bug", "special", 90, 100, "sound"),
+    "chargebeam":       ("electric", "special", 50, 90, ""),
+    "chillingwater":    ("water", "special", 50, 100, ""),
+    "chloroblast":      ("grass", "special", 150, 95, ""),
+    "clangingscales":   ("dragon", "special", 110, 100, "sound"),
+    "clearsmog":        ("poison", "special", 50, None, ""),
+    "darkpulse":        ("dark", "special", 80, 100, "pulse"),
+    "dazzlinggleam":    ("fairy", "special", 80, 100, ""),
+    "discharge":        ("electric", "special", 80, 100, ""),
+    "dracometeor":      ("dragon", "special", 130, 90, ""),
+    "dragonenergy":     ("dragon", "special", 150, 100, ""),
+    "dragonpulse":      ("dragon", "special", 85, 100, "pulse"),
+    "drainingkiss":     ("fairy", "special", 50, 100, ""),
+    "earthpower":       ("ground", "special", 90, 100, ""),
+    "electroweb":       ("electric", "special", 55, 95, ""),
+    "energyball":       ("grass", "special", 90, 100, "bullet"),
+    "eruption":         ("fire", "special", 150, 100, ""),
+    "expandingforce":   ("psychic", "special", 80, 100, ""),
+    "extrasensory":     ("psychic", "special", 80, 100, ""),
+    "fierydance":       ("fire", "special", 80, 100, ""),
+    "fierywrath":       ("dark", "special", 90, 100, ""),
+    "fireblast":        ("fire", "special", 110, 85, ""),
+    "firespin":         ("fire", "special", 35, 85, ""),
+    "flamethrower":     ("fire", "special", 90, 100, ""),
+    "flashcannon":      ("steel", "special", 80, 100, ""),
+    "focusblast":       ("fighting", "special", 120, 70, "bullet"),
+    "freezingglare":    ("psychic", "special", 90, 100, ""),
+    "frenzyplant":      ("grass", "special", 150, 90, ""),
+    "futuresight":      ("psychic", "special", 120, 100, ""),
+    "gigadrain":        ("grass", "special", 75, 100, ""),
+    "glaciate":         ("ice", "special", 65, 95, ""),
+    "heatwave":         ("fire", "special", 95, 90, ""),
+    "hex":              ("ghost", "special", 65, 100, ""),
+    "hiddenpowerfire":  ("fire", "special", 60, 100, ""),
+    "hiddenpowergrass": ("grass", "special", 60, 100, ""),
+    "hiddenpowerice":   ("ice", "special", 60, 100, ""),
+    "hurricane":        ("flying", "special", 110, 70, ""),
+    "hydrocannon":      ("water", "special", 150, 90, ""),
+    "hydropump":        ("water", "special", 110, 80, ""),
+    "hydrosteam":       ("water", "special", 80, 100, ""),
+    "hyperbeam":        ("normal", "special", 150, 90, ""),
+    "hypervoice":       ("normal", "special", 90, 100, "sound"),
+    "freezedry":        ("ice", "special", 70, 100, "freezedry"),
+    "icebeam":          ("ice", "special", 90, 100, ""),
+    "icywind":          ("ice", "special", 55, 95, ""),
+    "infernalparade":   ("ghost", "special", 60, 100, ""),
+    "infestation":      ("bug", "special", 20, 100, ""),
+    "lavaplume":        ("fire", "special", 80, 100, ""),
+    "leafstorm":        ("grass", "special", 130, 90, ""),
+    "lusterpurge":      ("psychic", "special", 95, 100, ""),
+    "magmastorm":       ("fire", "special", 100, 75, ""),
+    "makeitrain":       ("steel", "special", 120, 100, ""),
+    "malignantchain":   ("poison", "special", 100, 100, ""),
+    "matchagotcha":     ("grass", "special", 80, 90, ""),
+    "meteorbeam":       ("rock", "special", 120, 90, ""),
+    "mistball":         ("psychic", "special", 95, 100, "bullet"),
+    "moonblast":        ("fairy", "special", 95, 100, ""),
+    "moongeistbeam":    ("ghost", "special", 100, 100, ""),
+    "mudshot":          ("ground", "special", 55, 95, ""),
+    "muddywater":       ("water", "special", 90, 85, ""),
+    "mysticalfire":     ("fire", "special", 75, 100, ""),
+    "overdrive":        ("electric", "special", 80, 100, "sound"),
+    "overheat":         ("fire", "special", 130, 90, ""),
+    "paraboliccharge":  ("electric", "special", 65, 100, ""),
+    "pollenpuff":       ("bug", "special", 90, 100, "bullet"),
+    "powergem":         ("rock", "special", 80, 100, ""),
+    "psychic":          ("psychic", "special", 90, 100, ""),
+    "psychicnoise":     ("psychic", "special", 75, 100, "sound"),
+    "psychoboost":      ("psychic", "special", 140, 90, ""),
+    "psyshock":         ("psychic", "special", 80, 100, "targetdef"),
+    "risingvoltage":    ("electric", "special", 70, 100, ""),
+    "scald":            ("water", "special", 80, 100, ""),
+    "scorchingsands":   ("ground", "special", 70, 100, ""),
+    "secretsword":      ("fighting", "special", 85, 100, "slicing targetdef"),
+    "seedflare":        ("grass", "special", 120, 85, ""),
+    "shadowball":       ("ghost", "special", 80, 100, "bullet"),
+    "sludgebomb":       ("poison", "special", 90, 100, "bullet"),
+    "sludgewave":       ("poison", "special", 95, 100, ""),
+    "snarl":            ("dark", "special", 55, 95, "sound"),
+    "solarbeam":        ("grass", "special", 120, 100, ""),
+    "sparklingaria":    ("water", "special", 90, 100, "sound"),
+    "steameruption":    ("water", "special", 110, 95, ""),
+    "steelbeam":        ("steel", "special", 140, 95, ""),
+    "storedpower":      ("psychic", "special", 20, 100, ""),
+    "strangesteam":     ("fairy", "special", 90, 95, ""),
+    "surf":             ("water", "special", 90, 100, ""),
+    "syrupbomb":        ("grass", "special", 60, 85, "bullet"),
+    "terablast":        ("normal", "special", 80, 100, "terablast"),
+    "thunder":          ("electric", "special", 110, 70, ""),
+    "thunderbolt":      ("electric", "special", 90, 100, ""),
+    "thunderclap":      ("electric", "special", 70, 100, "priority"),
+    "torchsong":        ("fire", "special", 80, 100, "sound"),
+    "triattack":        ("normal", "special", 80, 100, ""),
+    "uproar":           ("normal", "special", 90, 100, "sound"),
+    "vacuumwave":       ("fighting", "special", 40, 100, "priority"),
+    "voltswitch":       ("electric", "special", 70, 100, ""),
+    "waterspout":       ("water", "special", 150, 100, ""),
+    "weatherball":      ("normal", "special", 50, 100, "bullet"),
+    "whirlpool":        ("water", "special", 35, 90, ""),
+    "wildboltstorm":    ("electric", "special", 100, 80, ""),
+    "zapcannon":        ("electric", "special", 120, 50, "bullet"),
+}
+
+# Moves de statut : 0 dégât, comme le renvoie @smogon/calc
+STATUS_MOVES = {
+    "acidarmor", "afteryou", "agility", "allyswitch", "amnesia", "aromatherapy", "auroraveil",
+    "autotomize", "banefulbunker", "batonpass", "bellydrum", "block", "bulkup", "burningbulwark",
+    "calmmind", "celebrate", "charge", "charm", "chillyreception", "clangoroussoul", "coaching",
+    "coil", "confide", "conversion", "copycat", "cosmicpower", "cottonguard", "courtchange",
+    "curse", "decorate", "defog", "destinybond", "detect", "disable", "dragondance", "eerieimpulse",
+    "encore", "endure", "entrainment", "faketears", "floralhealing", "focusenergy", "followme",
+    "glare", "gravity", "growth", "happyhour", "haze", "healbell", "healingwish", "healpulse",
+    "helpinghand", "hypnosis", "irondefense", "junglehealing", "leechseed", "lifedew",
+    "lightscreen", "lunarblessing", "lunardance", "magiccoat", "magnetrise", "meanlook", "memento",
+    "minimize", "mistyterrain", "moonlight", "morningsun", "nastyplot", "noretreat", "painsplit",
+    "partingshot", "perishsong", "poisongas", "protect", "psychicterrain", "quiverdance",
+    "ragepowder", "raindance", "recover", "recycle", "reflect", "rest", "revivalblessing", "roar",
+    "roost", "shedtail", "shellsmash", "shiftgear", "shoreup", "silktrap", "sing", "skillswap",
+    "slackoff", "sleeppowder", "sleeptalk", "snowscape", "soak", "softboiled", "spikes",
+    "spikyshield", "spore", "stealthrock", "stickyweb", "strengthsap", "stunspore", "substitute",
+    "sunnyday", "swordsdance", "synthesis", "tailglow", "tailwind", "takeheart", "taunt",
+    "teleport", "thunderwave", "tidyup", "topsyturvy", "toxic", "toxicspikes", "transform",
+    "trick", "trickroom", "victorydance", "whirlwind", "wideguard", "willowisp", "wish", "workup",
+    "yawn", "switcheroo",
+}
+
+
+def to_id(name: str) -> str:
+    return re.sub(r"[^a-z0-9]", "", name.lower())
+
+
+def get_move(name: str) -> dict | None:
+    """Données d'un move connu du moteur natif, ou None s'il n'est pas supporté."""
+    move_id = to_id(name)
+    if move_id in STATUS_MOVES:
+        return {"id": move_id, "type": None, "category": "status", "bp": 0, "accuracy": None, "flags": set()}
+    data = ATTACKING_MOVES.get(move_id)
+    if not data:
+        return None
+    move_type, category, bp, accuracy, flags = data
+    return {
+        "id": move_id,
+        "type": move_type,
+        "category": category,
+        "bp": bp,
+        "accuracy": accuracy,
+        "flags": set(flags.split())
+    }
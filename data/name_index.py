@@ -0,0 +1,140 @@
+import unicodedata
+from collections import Counter
+from functools import lru_cache
+from collections.abc import Iterable
+
+FUZZY_CUTOFF = 0.7
+FUZZY_CANDIDATES = 32
+MAX_MEMO = 65536
+
+# Tout caractère ASCII non alphanumérique disparaît du nom canonique
+_DROP = str.maketrans("", "", "".join(chr(c) for c in range(128) if not chr(c).isalnum()))
+
+# Formes écrites avant le nom ("Mega Charizard X", "Alolan Ninetales") → suffixe des clés du dex
+FORM_WORDS = {
+    "mega": ("mega",),
+    "alola": ("alolan", "alola"),
+    "galar": ("galarian", "galar"),
+    "hisui": ("hisuian", "hisui"),
+    "paldea": ("paldean", "paldea"),
+    "gmax": ("gigantamax", "gmax"),
+}
+
+
+@lru_cache(maxsize=8192)
+def normalize(name: str) -> str:
+    """Forme canonique d'un nom : "Great Tusk", "great-tusk", "Flabébé", "Mr. Mime" → clé du dex."""
+    name = name.replace("♀", "f").replace("♂", "m")
+    name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii")
+    return name.lower().translate(_DROP)
+
+
+def trigrams(text: str) -> set:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def form_aliases(key: str, keys: set) -> list[str]:
+    """Variantes d'une clé de forme : charizardmegax → megacharizardx, ninetalesalola → alolanninetales."""
+    aliases = []
+    for form, words in FORM_WORDS.items():
+        i = key.find(form, 1)
+        if i > 0 and key[:i] in keys:
+            base, rest = key[:i], key[i + len(form):]
+            for word in words:
+                aliases.append(word + base + rest)
+                aliases.append(base + word + rest)
+    return [alias for alias in aliases if alias != key and alias not in keys]
+
+
+class NameIndex:
+    """Index unique des noms : toute variante (espaces, tirets, formes, noms du metagame) → clé du dex.
+
+    Les fautes de frappe passent par un index de trigrammes (construit à la première
+    faute) : seuls les candidats qui partagent le plus de trigrammes avec la requête
+    sont comparés avec difflib. Chaque nom résolu est mémorisé.
+    """
+
+    def __init__(self, keys: Iterable[str]):
+        self.keys = set(keys)
+        self.aliases: dict[str, str] = {}
+        self._targets: list[str] = []    # chaînes indexées (clés et alias normalisés)
+        self._owners: list[str] = []     # clé du dex de chaque chaîne indexée
+        self._grams: dict[str, list[int]] | None = None
+        self._resolved: dict[tuple, str | None] = {}
+        for key in sorted(self.keys):
+            for alias in form_aliases(key, self.keys):
+                self.add_alias(alias, key)
+
+    def _build_grams(self):
+        self._targets = sorted(self.keys) + list(self.aliases)
+        self._owners = [self.aliases.get(text, text) for text in self._targets]
+        self._grams = {}
+        for slot, text in enumerate(self._targets):
+            for gram in trigrams(text):
+                self._grams.setdefault(gram, []).append(slot)
+
+    def add_alias(self, alias: str, key: str):
+        alias = normalize(alias)
+        if alias and alias not in self.keys and alias not in self.aliases:
+            self.aliases[alias] = key
+            self._grams = None
+            self._resolved.clear()
+
+    def exact(self, name: str) -> str | None:
+        key = normalize(name)
+        if key in self.keys:
+            return key
+        return self.aliases.get(key)
+
+    def fuzzy(self, name: str, cutoff: float = FUZZY_CUTOFF) -> str | None:
+        """Clé la plus proche (ratio difflib >= cutoff) parmi les candidats trouvés par trigrammes."""
+        from difflib import SequenceMatcher
+
+        query = normalize(name)
+        if not query:
+            return None
+        if self._grams is None:
+            self._build_grams()
+        counts = Counter()
+        for gram in trigrams(query):
+            counts.update(self._grams.get(gram, ()))
+        matcher = SequenceMatcher()
+        matcher.set_seq2(query)
+        best, best_score = None, cutoff
+        for slot, _ in counts.most_common(FUZZY_CANDIDATES):
+            matcher.set_seq1(self._targets[slot])
+            if matcher.real_quick_ratio() >= best_score and matcher.quick_ratio() >= best_score:
+                score = matcher.ratio()
+                if score > best_score or (score == best_score and best is None):
+                    best, best_score = self._owners[slot], score
+        return best
+
+    def resolve(self, name: str, suggest: bool = True, cutoff: float = FUZZY_CUTOFF) -> str | None:
+        """Clé du dex d'un nom quelconque, None si introuvable (mémorisé)."""
+        memo = (name, suggest, cutoff)
+        if memo in self._resolved:
+            return self._resolved[memo]
+        key = self.exact(name)
+        if key is None and suggest:
+            key = self.fuzzy(name, cutoff)
+        if len(self._resolved) >= MAX_MEMO:
+            self._resolved.clear()
+        self._resolved[memo] = key
+        return key
+
+
+_index: NameIndex | None = None
+_source: dict | None = None
+
+
+def get_name_index() -> NameIndex:
+    """Index des noms du dex chargé, reconstruit si le dex a été rechargé."""
+    global _index, _source
+    from data.pokedex import get_pokedex
+
+    dex = get_pokedex()
+    if _index is None or _source is not dex:
+        _index = NameIndex(dex)
+        _source = dex
+    return _index
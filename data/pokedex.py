@@ -1,12 +1,99 @@
-import json
+import marshal
 import os
-import re
-from difflib import get_close_matches
+import sys
+from functools import lru_cache
 
-POKEDEX_PATH = os.path.join(os.path.dirname(__file__), "pokedex_with_full_moves_and_sets.json")
+from data.name_index import get_name_index
+
+# json et hashlib ne sont importés qu'au besoin : `import data.pokedex` reste quasi instantané
 
-with open(POKEDEX_PATH, "r", encoding="utf-8") as f:
-    pokedex = json.load(f)
+POKEDEX_PATH = os.path.join(os.path.dirname(__file__), "pokedex_with_full_moves_and_sets.json")
+POKEDEX_CACHE_PATH = os.path.splitext(POKEDEX_PATH)[0] + ".marshal"
+
+# marshal dépend de la version de Python : elle fait partie de la clé du cache
+CACHE_FORMAT = f"{marshal.version}-{sys.version_info[0]}.{sys.version_info[1]}"
+
+_pokedex: dict | None = None
+_pokedex_stat: tuple | None = None
+
+
+def _json_stat() -> tuple:
+    st = os.stat(POKEDEX_PATH)
+    return st.st_mtime_ns, st.st_size
+
+
+def _json_hash() -> str:
+    import hashlib
+    with open(POKEDEX_PATH, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def _write_cache(stat: tuple, digest: str, data: dict):
+    # En-tête texte "format mtime_ns taille sha1" puis le dex en marshal
+    tmp = POKEDEX_CACHE_PATH + ".tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(f"{CACHE_FORMAT} {stat[0]} {stat[1]} {digest}\n".encode("ascii"))
+            f.write(marshal.dumps(data))
+        os.replace(tmp, POKEDEX_CACHE_PATH)
+    except OSError:
+        pass  # dossier en lecture seule : on relira le JSON la prochaine fois
+
+
+def load_pokedex() -> dict:
+    """Dex depuis le cache binaire à côté du JSON, reconstruit si le JSON a changé.
+
+    Même mtime et même taille : le cache est lu directement. Sinon on compare le
+    hash du JSON (un checkout git change le mtime sans changer le contenu).
+    """
+    stat = _json_stat()
+    try:
+        with open(POKEDEX_CACHE_PATH, "rb") as f:
+            raw = f.read()
+        header, _, payload = raw.partition(b"\n")
+        cache_format, mtime_ns, size, digest = header.decode("ascii").split()
+        if cache_format == CACHE_FORMAT:
+            if (int(mtime_ns), int(size)) == stat:
+                return marshal.loads(payload)
+            if digest == _json_hash():
+                data = marshal.loads(payload)
+                _write_cache(stat, digest, data)
+                return data
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+
+    import json
+    with open(POKEDEX_PATH, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    _write_cache(stat, _json_hash(), data)
+    return data
+
+
+def get_pokedex() -> dict:
+    """Dex complet, chargé à la première utilisation (l'import du module reste instantané)."""
+    global _pokedex, _pokedex_stat
+    if _pokedex is None:
+        _pokedex_stat = _json_stat()
+        _pokedex = load_pokedex()
+        _clear_sets()
+    return _pokedex
+
+
+def refresh_pokedex() -> bool:
+    """Recharge le dex si le JSON a changé depuis le chargement ; True si rechargé."""
+    global _pokedex, _pokedex_stat
+    if _pokedex is not None and _json_stat() == _pokedex_stat:
+        return False
+    _pokedex = None
+    get_pokedex()
+    return True
+
+
+def __getattr__(name: str):
+    # Compatibilité : `pokedex` reste accessible comme attribut du module, mais chargé à la demande
+    if name == "pokedex":
+        return get_pokedex()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # 🔁 Table des types (simplifiée)
 TYPES = [
@@ -16,18 +103,12 @@ TYPES = [
 ]
 
 def get_pokemon_data(name: str, suggest: bool = True) -> dict | None:
-    name = name.lower()
-    if name in pokedex:
-        return pokedex[name]
-
-    if suggest:
-        matches = get_close_matches(name, pokedex.keys(), n=1, cutoff=0.7)
-        if matches:
-            return pokedex[matches[0]]
-    return None
+    # Toutes les variantes de nom passent par l'index partagé (data/name_index.py)
+    key = get_name_index().resolve(name, suggest)
+    return get_pokedex()[key] if key else None
 
 def list_all_pokemon() -> list[str]:
-    return sorted(pokedex.keys())
+    return sorted(get_pokedex().keys())
 
 def get_types(name: str) -> tuple[str, str | None]:
     data = get_pokemon_data(name)
@@ -65,135 +146,200 @@ def get_abilities(name: str) -> list[str]:
         data.get("hidden ability")
     ]))
 
-def get_all_sets(name: str) -> list[dict]:
-    """Parse tous les sets stratégiques connus pour un Pokémon."""
-    data = get_pokemon_data(name)
-    if not data:
-        return []
-
-    sets = []
-    for key, value in data.items():
-        if not key.startswith("strategy:"):
-            continue
-
-        set_data = {
-            "name": key.replace("strategy:", "").strip(),
-            "raw": value,
-            "ability": None,
-            "tera_type": None,
-            "evs": {},
-            "ivs": {},
-            "nature": None,
-            "item": None,
-            "moves": []
+# === Sets stratégiques ===
+
+STAT_KEYS = ("hp", "atk", "def", "spa", "spd", "spe")
+# Libellés des lignes EVs / IVs (Showdown ou abrégés du dex) → position dans STAT_KEYS
+STAT_SLOTS = {
+    "hp": 0, "atk": 1, "at": 1, "def": 2, "df": 2,
+    "spa": 3, "sa": 3, "spd": 4, "sd": 4, "spe": 5, "sp": 5
+}
+NO_EVS = (0,) * 6
+MAX_IVS = (31,) * 6
+
+
+class StrategySet:
+    """Un set stratégique parsé une seule fois.
+
+    Objets, talents, natures, types tera et moves sont des chaînes internées (partagées
+    par tous les sets), les EVs / IVs des tuples d'entiers dans l'ordre de STAT_KEYS.
+    Les moves gardent la casse du dex, comme la sortie de @smogon/calc.
+    """
+
+    __slots__ = ("pokemon", "name", "item", "ability", "tera_type", "nature", "evs", "ivs", "moves", "boosts")
+
+    def __init__(self, pokemon: str, name: str, item: str | None = None, ability: str | None = None,
+                 tera_type: str | None = None, nature: str | None = None, evs: tuple = NO_EVS,
+                 ivs: tuple = MAX_IVS, moves: tuple = (), boosts: tuple = ()):
+        intern = sys.intern
+        self.pokemon = intern(pokemon)
+        self.name = intern(name)
+        self.item = intern(item) if item else None
+        self.ability = intern(ability) if ability else None
+        self.tera_type = intern(tera_type) if tera_type else None
+        self.nature = intern(nature) if nature else None
+        self.evs = _SPREADS.setdefault(tuple(evs), tuple(evs))
+        self.ivs = _SPREADS.setdefault(tuple(ivs), tuple(ivs))
+        self.moves = tuple(intern(move) for move in moves)
+        self.boosts = tuple(boosts)
+
+    @property
+    def key(self) -> str:
+        return f"strategy: {self.name}"
+
+    def calc_set(self) -> dict:
+        """Le set au format de parseSet (tools/callDamageFromJSON.mjs), envoyé tel quel au worker Node."""
+        payload = {
+            "name": self.pokemon,
+            "item": self.item or "",
+            "ability": self.ability or "",
+            "moves": list(self.moves),
+            "evs": dict(zip(STAT_KEYS, self.evs)),
+            "ivs": dict(zip(STAT_KEYS, self.ivs)),
+            "boosts": dict(self.boosts)
         }
+        # Champs absents côté JS (undefined) : @smogon/calc applique alors ses valeurs par défaut
+        if self.nature:
+            payload["nature"] = self.nature
+        if self.tera_type:
+            payload["teraType"] = self.tera_type
+        return payload
+
+    def __repr__(self) -> str:
+        return f"StrategySet({self.pokemon!r}, {self.name!r})"
+
+
+# Répartitions EV / IV partagées entre sets (beaucoup de sets ont le même spread)
+_SPREADS: dict[tuple, tuple] = {}
+# Sets parsés par clé du dex, table (clé du dex, nom du set) → set, et format dict historique
+_parsed_sets: dict[str, tuple] = {}
+_set_table: dict[tuple[str, str], StrategySet] = {}
+_legacy_sets: dict[str, list[dict]] = {}
+
+
+def _clear_sets():
+    _parsed_sets.clear()
+    _set_table.clear()
+    _legacy_sets.clear()
+
+
+def _parse_boosts(text: str) -> list[tuple[str, int]]:
+    # "Boosts: Atk+1, Spe+2" (les baisses "Def-1" sont aussi lues)
+    boosts = []
+    for part in text.split(","):
+        stat, sign, value = part.strip().partition("+")
+        if not sign:
+            stat, sign, value = part.strip().partition("-")
+        if sign and value.strip().isdigit():
+            boosts.append((sys.intern(stat.strip().lower()), int(sign + value.strip())))
+    return boosts
+
+
+def _parse_set(pokemon: str, set_key: str, raw: str) -> tuple[StrategySet, dict]:
+    """Parse le texte d'un set : le record compact et le dict historique de get_all_sets."""
+    legacy = {
+        "name": set_key.replace("strategy:", "").strip(),
+        "raw": raw,
+        "ability": None,
+        "tera_type": None,
+        "evs": {},
+        "ivs": {},
+        "nature": None,
+        "item": None,
+        "moves": []
+    }
+    spreads = {"evs": list(NO_EVS), "ivs": list(MAX_IVS)}
+    moves, boosts = [], []
+
+    for line in raw.splitlines():
+        line = line.strip()
+        lower = line.lower()
+        if line.startswith("@"):
+            legacy["item"] = line[1:].strip()
+        elif lower.startswith("ability:"):
+            legacy["ability"] = line.split(":", 1)[1].strip()
+        elif lower.startswith("tera type:"):
+            legacy["tera_type"] = line.split(":", 1)[1].strip()
+        elif lower.startswith(("evs:", "ivs:")):
+            field = lower[:3]
+            for part in line.split(":", 1)[1].strip().split("/"):
+                value, stat = part.strip().split()
+                stat = stat.lower()
+                legacy[field][stat] = int(value)
+                if stat in STAT_SLOTS:
+                    spreads[field][STAT_SLOTS[stat]] = int(value)
+        elif lower.startswith("boosts:"):
+            boosts = _parse_boosts(line.split(":", 1)[1])
+        elif lower.endswith("nature"):
+            legacy["nature"] = line.replace("Nature", "").strip()
+        elif line.startswith("-"):
+            moves.append(line[1:].strip())
+            legacy["moves"].append(moves[-1].lower())
+
+    record = StrategySet(
+        pokemon, legacy["name"], legacy["item"], legacy["ability"], legacy["tera_type"],
+        legacy["nature"], spreads["evs"], spreads["ivs"], moves, boosts
+    )
+    return record, legacy
+
+
+def _sets_of(key: str) -> tuple:
+    """Sets d'une clé du dex, parsés à la première demande puis gardés jusqu'au rechargement du dex."""
+    records = _parsed_sets.get(key)
+    if records is None:
+        parsed = [
+            _parse_set(key, set_key, raw)
+            for set_key, raw in get_pokedex()[key].items()
+            if set_key.startswith("strategy:")
+        ]
+        records = tuple(record for record, _ in parsed)
+        for record in records:
+            _set_table[(key, record.name)] = record
+        _legacy_sets[key] = [legacy for _, legacy in parsed]
+        _parsed_sets[key] = records
+    return records
+
+
+def get_parsed_sets(name: str, suggest: bool = True) -> tuple:
+    """Sets stratégiques d'un Pokémon sous forme de StrategySet (parsés une seule fois)."""
+    key = get_name_index().resolve(name, suggest)
+    return _sets_of(key) if key else ()
+
+
+def get_set(name: str, set_name: str) -> StrategySet | None:
+    """Set par (Pokémon, nom du set) ; `set_name` accepte aussi la clé "strategy: ..." du dex."""
+    key = get_name_index().resolve(name)
+    if not key:
+        return None
+    _sets_of(key)
+    set_name = set_name.strip()
+    if set_name.startswith("strategy:"):
+        set_name = set_name[len("strategy:"):].strip()
+    return _set_table.get((key, set_name))
 
-        lines = value.splitlines()
-        for line in lines:
-            line = line.strip()
-            if line.startswith("@"):
-                set_data["item"] = line[1:].strip()
-            elif line.lower().startswith("ability:"):
-                set_data["ability"] = line.split(":", 1)[1].strip()
-            elif line.lower().startswith("tera type:"):
-                set_data["tera_type"] = line.split(":", 1)[1].strip()
-            elif line.lower().startswith("evs:"):
-                ev_parts = line.split(":", 1)[1].strip().split("/")
-                for ev in ev_parts:
-                    val, stat = ev.strip().split()
-                    set_data["evs"][stat.lower()] = int(val)
-            elif line.lower().startswith("ivs:"):
-                iv_parts = line.split(":", 1)[1].strip().split("/")
-                for iv in iv_parts:
-                    val, stat = iv.strip().split()
-                    set_data["ivs"][stat.lower()] = int(val)
-            elif line.lower().endswith("nature"):
-                set_data["nature"] = line.replace("Nature", "").strip()
-            elif line.startswith("-"):
-                move = line[1:].strip().lower()
-                set_data["moves"].append(move)
-
-        sets.append(set_data)
-    return sets
 
-def get_roles(name: str) -> list[str]:
-    data = get_pokemon_data(name)
-    if not data:
+def get_all_sets(name: str) -> list[dict]:
+    """Sets au format dict historique (texte brut inclus), pour l'affichage et les empreintes de cache."""
+    key = get_name_index().resolve(name)
+    if not key:
         return []
+    _sets_of(key)
+    # Copies de surface : les appelants peuvent modifier leurs dicts sans toucher au cache
+    return [dict(legacy) for legacy in _legacy_sets[key]]
 
-    stats = get_base_stats(name)
-    moves = get_all_moves(name)
-    abilities = get_abilities(name)
-    roles = set()
-
-    # 🎯 Offensif (stat + abilité)
-    if stats["atk"] >= 100 or "huge power" in abilities or "pure power" in abilities:
-        roles.add("physical attacker")
-    if stats["spa"] >= 100:
-        roles.add("special attacker")
-
-    if stats["spe"] >= 100:
-        roles.add("fast")
-    elif stats["spe"] <= 60:
-        roles.add("slow")
-
-    # 🛡️ Défensif
-    bulk_score = stats["hp"] * ((stats["def"] + stats["spd"]) / 2)
-    if bulk_score >= 40000:
-        roles.add("tank")
-
-    # 💼 Rôles fonctionnels via moves
-    if any(m in moves for m in [
-        "stealthrock", "spikes", "stickyweb", "toxicspikes"
-    ]):
-        roles.add("hazard setter")
-
-    if any(m in moves for m in ["defog", "rapidspin", "courtchange"]):
-        roles.add("hazard control")
-
-    if any(m in moves for m in ["uturn", "voltswitch", "flipturn"]):
-        roles.add("pivot")
-
-    if any(m in moves for m in [
-        "swordsdance", "nastyplot", "calmmind", "bulkup", "dragondance", "bellydrum",
-        "irondefense", "agility", "quiverdance", "shellsmash", "growth", "curse",
-        "victorydance", "takeheart", "clangoroussoul", "tailglow"
-    ]):
-        roles.add("setup sweeper")
-
-    if any(m in moves for m in ["wish", "lunardance", "healingwish"]):
-        roles.add("support")
-
-    if any(m in moves for m in ["reflect", "lightscreen", "auroraveil"]):
-        roles.add("screen")
-
-    if any(m in moves for m in ["taunt", "encore", "trick", "switcheroo"]):
-        roles.add("utilitaire")
-
-    if any(m in moves for m in [
-        "shadowsneak", "iceshard", "bulletpunch", "aquajet",
-        "extremespeed", "suckerpunch", "machpunch", "vacuumwave"
-    ]):
-        roles.add("priority")
-    
-    if "contrary" in abilities:
-        roles.add("setup sweeper")
-
-    if "chillyreception" in moves:
-        roles.add("pivot")
-
-    if any(weather in abilities for weather in ["drought", "drizzle", "snowwarning", "sandstream"]):
-        roles.add("weather setter")
-
-    return sorted(roles)
+def get_roles(name: str) -> list[str]:
+    # Rôles précalculés pour tout le dex (data/role_index.py)
+    from data.role_index import get_role_index
+    return get_role_index().roles_of(name)
 
 def get_tier(name: str) -> str:
     """Retourne le tier Smogon du Pokémon (ex: 'OU', 'UU', etc.)."""
     data = get_pokemon_data(name)
     return data.get("format", "Inconnu") if data else "Inconnu"
 
+@lru_cache(maxsize=None)
 def get_type_chart() -> dict:
-    """Retourne le tableau des types (efficacités offensives/défensives)."""
+    """Retourne le tableau des types (efficacités offensives/défensives), construit une seule fois."""
     # Source simplifiée mais exacte (Gen 9), peut être étendue si besoin
     chart = {
         "normal":   {"offensive": ["ghost"], "weak": ["fighting"], "resist": [], "immune": ["ghost"]},
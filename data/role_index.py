@@ -0,0 +1,135 @@
+import os
+from typing import Dict, Iterable, List, Set
+
+from data.name_index import get_name_index, normalize
+from data.pokedex import POKEDEX_PATH, get_pokedex, refresh_pokedex
+
+# Ordre fixe : le rôle i est le bit i du masque d'un Pokémon
+ROLES = [
+    "physical attacker", "special attacker", "fast", "slow", "tank",
+    "hazard setter", "hazard control", "pivot", "setup sweeper", "support",
+    "screen", "utilitaire", "priority", "weather setter"
+]
+ROLE_BITS = {role: 1 << i for i, role in enumerate(ROLES)}
+
+HAZARD_MOVES = {"stealthrock", "spikes", "stickyweb", "toxicspikes"}
+HAZARD_CONTROL_MOVES = {"defog", "rapidspin", "courtchange"}
+PIVOT_MOVES = {"uturn", "voltswitch", "flipturn", "chillyreception"}
+SETUP_MOVES = {
+    "swordsdance", "nastyplot", "calmmind", "bulkup", "dragondance", "bellydrum",
+    "irondefense", "agility", "quiverdance", "shellsmash", "growth", "curse",
+    "victorydance", "takeheart", "clangoroussoul", "tailglow"
+}
+SUPPORT_MOVES = {"wish", "lunardance", "healingwish"}
+SCREEN_MOVES = {"reflect", "lightscreen", "auroraveil"}
+UTILITY_MOVES = {"taunt", "encore", "trick", "switcheroo"}
+PRIORITY_MOVES = {
+    "shadowsneak", "iceshard", "bulletpunch", "aquajet",
+    "extremespeed", "suckerpunch", "machpunch", "vacuumwave"
+}
+WEATHER_ABILITIES = {"drought", "drizzle", "snowwarning", "sandstream"}
+
+
+def compute_roles(data: dict) -> Set[str]:
+    """Rôles d'une entrée du dex (stats de base, moves appris, talents)."""
+    stats = {k: data.get(k, 0) for k in ("hp", "atk", "def", "spa", "spd", "spe")}
+    moves = set(data.get("moves", []))
+    abilities = set(filter(None, [data.get("ability1"), data.get("ability2"), data.get("hidden ability")]))
+    roles = set()
+
+    # 🎯 Offensif (stat + abilité)
+    if stats["atk"] >= 100 or "huge power" in abilities or "pure power" in abilities:
+        roles.add("physical attacker")
+    if stats["spa"] >= 100:
+        roles.add("special attacker")
+
+    if stats["spe"] >= 100:
+        roles.add("fast")
+    elif stats["spe"] <= 60:
+        roles.add("slow")
+
+    # 🛡️ Défensif
+    if stats["hp"] * ((stats["def"] + stats["spd"]) / 2) >= 40000:
+        roles.add("tank")
+
+    # 💼 Rôles fonctionnels via moves
+    for role, role_moves in (
+        ("hazard setter", HAZARD_MOVES), ("hazard control", HAZARD_CONTROL_MOVES),
+        ("pivot", PIVOT_MOVES), ("setup sweeper", SETUP_MOVES), ("support", SUPPORT_MOVES),
+        ("screen", SCREEN_MOVES), ("utilitaire", UTILITY_MOVES), ("priority", PRIORITY_MOVES)
+    ):
+        if moves & role_moves:
+            roles.add(role)
+
+    if "contrary" in abilities:
+        roles.add("setup sweeper")
+    if abilities & WEATHER_ABILITIES:
+        roles.add("weather setter")
+    return roles
+
+
+def roles_mask(roles: Iterable[str]) -> int:
+    """Masque de bits d'une liste de rôles (rôles inconnus ignorés)."""
+    mask = 0
+    for role in roles:
+        mask |= ROLE_BITS.get(role, 0)
+    return mask
+
+
+class RoleIndex:
+    """Rôles de tout le dex calculés une fois : rôle → noms, nom → masque de rôles."""
+
+    def __init__(self, pokedex: Dict[str, dict]):
+        self.masks: Dict[str, int] = {}
+        self.by_role: Dict[str, Set[str]] = {role: set() for role in ROLES}
+        for name, data in pokedex.items():
+            roles = compute_roles(data)
+            self.masks[name] = roles_mask(roles)
+            for role in roles:
+                self.by_role[role].add(name)
+
+    def mask_of(self, name: str) -> int:
+        """Masque de rôles d'un nom quelconque ("Great Tusk", "great-tusk"...), 0 si inconnu."""
+        key = normalize(name)
+        if key not in self.masks:
+            key = get_name_index().resolve(name)
+        return self.masks.get(key, 0)
+
+    def roles_of(self, name: str) -> List[str]:
+        mask = self.mask_of(name)
+        return sorted(role for role, bit in ROLE_BITS.items() if mask & bit)
+
+    def has_all(self, name: str, roles: Iterable[str]) -> bool:
+        """Le Pokémon a tous les rôles demandés ; un rôle inconnu n'est jamais satisfait."""
+        roles = list(roles)
+        if any(role not in ROLE_BITS for role in roles):
+            return False
+        wanted = roles_mask(roles)
+        return self.mask_of(name) & wanted == wanted
+
+    def has_any(self, name: str, roles: Iterable[str]) -> bool:
+        return bool(self.mask_of(name) & roles_mask(roles))
+
+    def query(self, *roles: str) -> Set[str]:
+        """Pokémon qui ont tous les rôles demandés, ex. query("pivot", "fast")."""
+        if not roles:
+            return set(self.masks)
+        result = set(self.by_role.get(roles[0], set()))
+        for role in roles[1:]:
+            result &= self.by_role.get(role, set())
+        return result
+
+
+_index: RoleIndex | None = None
+_index_mtime: float | None = None
+
+
+def get_role_index() -> RoleIndex:
+    """Index des rôles, reconstruit si le fichier du dex a changé depuis le dernier calcul."""
+    global _index, _index_mtime
+    mtime = os.path.getmtime(POKEDEX_PATH)
+    if _index is None or _index_mtime != mtime:
+        refresh_pokedex()
+        _index = RoleIndex(get_pokedex())
+        _index_mtime = mtime
+    return _index
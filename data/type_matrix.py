@@ -0,0 +1,69 @@
+from typing import Iterable, List
+
+import numpy as np
+
+from data.pokedex import TYPES, get_type_chart
+
+TYPE_INDEX = {t: i for i, t in enumerate(TYPES)}
+NO_TYPE = len(TYPES)  # colonne "pas de second type" de la table double type
+
+
+def build_effectiveness_matrix() -> np.ndarray:
+    """EFFECTIVENESS[attaque, défense] : multiplicateur d'un type offensif sur un type défensif."""
+    matrix = np.ones((len(TYPES), len(TYPES)), dtype=np.float32)
+    for t, entry in get_type_chart().items():
+        d = TYPE_INDEX[t]
+        defensive = entry["defensive"]
+        for attacker in defensive["weak"]:
+            matrix[TYPE_INDEX[attacker], d] = 2.0
+        for attacker in defensive["resist"]:
+            matrix[TYPE_INDEX[attacker], d] = 0.5
+        for attacker in defensive["immune"]:
+            matrix[TYPE_INDEX[attacker], d] = 0.0
+    return matrix
+
+
+EFFECTIVENESS = build_effectiveness_matrix()
+
+# DUAL_TYPE[t1, t2] : multiplicateurs des 18 types offensifs sur la paire (t1, t2), t2 = NO_TYPE si mono-type
+DUAL_TYPE = np.ones((len(TYPES), len(TYPES) + 1, len(TYPES)), dtype=np.float32)
+DUAL_TYPE[:, :NO_TYPE, :] = EFFECTIVENESS.T[:, None, :] * EFFECTIVENESS.T[None, :, :]
+DUAL_TYPE[:, NO_TYPE, :] = EFFECTIVENESS.T
+DUAL_TYPE[np.arange(len(TYPES)), np.arange(len(TYPES)), :] = EFFECTIVENESS.T  # (t, t) = mono-type
+
+
+def type_pair(types: Iterable[str]) -> tuple:
+    """Indices (t1, t2) dans DUAL_TYPE ; types inconnus ou vides ignorés."""
+    ids = [TYPE_INDEX[t.lower()] for t in types if t and t.lower() in TYPE_INDEX][:2]
+    if not ids:
+        return None
+    return ids[0], ids[1] if len(ids) > 1 else NO_TYPE
+
+
+def effectiveness(move_type: str, defender_types: Iterable[str]) -> float:
+    """Multiplicateur d'un type offensif sur un Pokémon (1.0 pour un type inconnu)."""
+    pair = type_pair(defender_types)
+    attacker = TYPE_INDEX.get(move_type)
+    if pair is None or attacker is None:
+        return 1.0
+    return float(DUAL_TYPE[pair[0], pair[1], attacker])
+
+
+def defensive_profiles(entries: List[dict]) -> np.ndarray:
+    """Multiplicateurs subis par chaque entrée du dex, shape (N, 18)."""
+    profiles = np.ones((len(entries), len(TYPES)), dtype=np.float32)
+    for row, data in enumerate(entries):
+        pair = type_pair([data.get("type1"), data.get("type2")])
+        if pair is not None:
+            profiles[row] = DUAL_TYPE[pair]
+    return profiles
+
+
+def stab_matrix(entries: List[dict]) -> np.ndarray:
+    """Types propres (STAB) de chaque entrée du dex en one-hot, shape (N, 18)."""
+    stab = np.zeros((len(entries), len(TYPES)), dtype=bool)
+    for row, data in enumerate(entries):
+        for t in (data.get("type1"), data.get("type2")):
+            if t and t.lower() in TYPE_INDEX:
+                stab[row, TYPE_INDEX[t.lower()]] = True
+    return stab
@@ -1,11 +1,11 @@
 from langchain.agents import initialize_agent, AgentType, Tool
 from langchain_community.chat_models import ChatOllama
 import subprocess
-import os
 import json
-from difflib import get_close_matches
 from langchain_core.tools import Tool as LangTool
 import re
+from data.name_index import get_name_index
+from data.pokedex import get_pokedex
 
 # --- LLM ---
 llm = ChatOllama(model="mistral")
@@ -50,24 +50,12 @@ damage_tool = LangTool.from_function(
 # === TOOL 2: POKEDEX ===
 
 def search_pokedex(pokemon_name: str, output_mode: str = "fr"):
-    path = "C:/Users/rapha/Desktop/AI TeamBuilder/Important/pokedex_with_full_moves_and_sets.json"
-    if not os.path.exists(path):
-        return "❌ Fichier pokedex introuvable."
-
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-
-        name_lower = pokemon_name.lower()
-        pkmn = data.get(name_lower)
-
-        if not pkmn:
-            matches = get_close_matches(name_lower, data.keys(), n=1, cutoff=0.6)
-            if matches:
-                pkmn = data[matches[0]]
-                name_lower = matches[0]
-            else:
-                return f"❌ Aucun Pokémon trouvé pour « {pokemon_name} »."
+        # Même index de noms que le reste du projet (formes, noms du metagame, fautes de frappe)
+        name_lower = get_name_index().resolve(pokemon_name, cutoff=0.6)
+        if not name_lower:
+            return f"❌ Aucun Pokémon trouvé pour « {pokemon_name} »."
+        pkmn = get_pokedex()[name_lower]
 
         if output_mode == "json":
             result = {
@@ -2,6 +2,7 @@ import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
 from core.new_pokemon_analyzer import analyze_pokemon
+from core.tournament import load_winrate_matrix
 
 st.set_page_config(page_title="AI TeamBuilder – Analyse de Pokémon", layout="wide")
 st.title("🔍 Analyse de Pokémon (AI TeamBuilder)")
@@ -89,6 +90,21 @@ if name:
         else:
             st.info("Aucun matchup trouvé.")
 
+        # Résultats du tournoi round-robin (python -m core.tournament), s'il a tourné
+        matrix = load_winrate_matrix()
+        row = matrix.row(name) if matrix is not None else {}
+        if row:
+            st.subheader("🏟️ Tournoi du metagame")
+            ranked = sorted(row.items(), key=lambda x: -x[1])
+            st.markdown(f"**Winrate moyen**: {round(sum(row.values()) / len(row), 1)}% sur {len(row)} adversaires")
+            col5, col6 = st.columns(2)
+            with col5:
+                st.markdown("**Meilleurs matchups**")
+                st.dataframe(pd.DataFrame(ranked[:10], columns=["Opponent", "Winrate"]))
+            with col6:
+                st.markdown("**Pires matchups**")
+                st.dataframe(pd.DataFrame(ranked[-10:][::-1], columns=["Opponent", "Winrate"]))
+
     # === Onglet Core Synergies
     with tab3:
         st.subheader("🔗 Cores où ce Pokémon est utilisé")
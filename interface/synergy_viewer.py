@@ -1,39 +1,73 @@
 import streamlit as st
 import json
 import os
-import subprocess
+import time
+from core.jobs import get_job_runner
 from data.pokedex import get_roles
 
 JSON_PATH = "data/results/synergy_result.json"
-CALCULATOR_PATH = "core/synergy_calculator.py"
+
+
+def show_progress(events: list):
+    """Derniers résultats partiels du calcul en cours."""
+    last = {}
+    for event in events:
+        last[event["stage"]] = event
+    if "iteration" in last:
+        it = last["iteration"]
+        st.markdown(f"🔁 Core actuel : **{', '.join(it['core'])}** — analyse du top {it['top_n']}")
+    if "threats" in last:
+        threats = last["threats"]["threats"]
+        st.markdown(f"🛡️ {len(threats)} menace(s) : {', '.join(threats) or 'aucune'}")
+    if "candidates" in last:
+        scores = last["candidates"]["scores"]
+        st.markdown("🎯 Meilleurs candidats : " + ", ".join(f"{name} ({score})" for name, score in scores))
+    for event in events:
+        if event["stage"] == "added":
+            st.markdown(f"✅ Ajouté : **{event['pokemon']}**")
+
 
 st.set_page_config(page_title="Synergy Viewer", layout="wide")
 st.title("🧠 Synergy Core Viewer")
 
+# Runner partagé par toutes les sessions : metagame, index et caches restent chargés entre deux calculs
+runner = get_job_runner()
+job = runner.get(st.session_state.get("synergy_job")) if "synergy_job" in st.session_state else None
+
 # === Formulaire de configuration du calcul ===
 with st.expander("⚙️ Générer un core personnalisé", expanded=not os.path.exists(JSON_PATH)):
     with st.form("form_calc"):
         n_core = st.number_input("Taille du core", min_value=2, max_value=6, value=3)
         base_pokemon = st.text_input("Pokémon fixes (séparés par des virgules)", value="Kyurem")
         roles_input = st.text_input("Rôles visés pour les autres slots (séparés par des virgules)", value="aucun, special_sweeper")
-        submitted = st.form_submit_button("Lancer le calcul")
+        submitted = st.form_submit_button("Lancer le calcul", disabled=job is not None and not job.finished)
 
     if submitted:
-        base_args = [p.strip().replace(" ", "_") for p in base_pokemon.split(",") if p.strip()]
+        base_args = [p.strip() for p in base_pokemon.split(",") if p.strip()]
         role_args = [r.strip() for r in roles_input.split(",") if r.strip()]
         if len(base_args) + len(role_args) != n_core:
             st.error("Nombre de Pokémon + rôles ne correspond pas à la taille du core.")
             st.stop()
 
-        full_cmd = ["python", "-m", "core.synergy_calculator", str(n_core)] + base_args + ["--roles"] + role_args
-        st.info("🔄 Calcul en cours (cela peut prendre plusieurs minutes)...")
-        with st.spinner("Simulation stratégique..."):
-            result = subprocess.run(full_cmd, capture_output=True, text=True)
-        if result.returncode != 0:
-            st.error(f"Erreur :\n{result.stderr}")
-        else:
-            st.success("✅ Core généré avec succès. Résultats affichés ci-dessous 👇")
-            st.rerun()
+        from core.synergy_calculator import build_synergy_core, parse_roles
+        job = runner.submit(f"Core de {n_core} autour de {', '.join(base_args)}",
+                            build_synergy_core, base_args, parse_roles(role_args), int(n_core))
+        st.session_state["synergy_job"] = job.id
+
+    # === Suivi du calcul en arrière-plan ===
+    if job is not None and not job.finished:
+        st.info(f"🔄 {job.label} : calcul en cours...")
+        show_progress(job.events_since())
+        if st.button("⛔ Annuler le calcul"):
+            job.cancel()
+        time.sleep(1)
+        st.rerun()
+    elif job is not None and job.status == "cancelled":
+        st.warning("⛔ Calcul annulé.")
+    elif job is not None and job.status == "error":
+        st.error(f"Erreur :\n{job.error}")
+    elif job is not None and job.status == "done":
+        st.success("✅ Core généré avec succès. Résultats affichés ci-dessous 👇")
 
 # === Vérification des résultats ===
 if not os.path.exists(JSON_PATH):
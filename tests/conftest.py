@@ -0,0 +1,59 @@
+import pytest
+
+from core import damage_tensor, matchup_cache
+from core.damage_engine import calc_matchups
+from data import pokedex
+
+
+@pytest.fixture(autouse=True)
+def isolated_matchup_cache(monkeypatch, tmp_path):
+    """Caches partagés (get_matchup_cache) dans tmp_path : les tests ne lisent ni n'écrivent
+    data/results/matchup_cache.sqlite."""
+    monkeypatch.setattr(matchup_cache, "CACHE_PATH", str(tmp_path / "matchup_cache.sqlite"))
+    monkeypatch.setattr(matchup_cache, "_caches", {})
+    yield
+    for cache in matchup_cache._caches.values():
+        cache.close()
+
+
+@pytest.fixture
+def edit_set(monkeypatch):
+    """edit_set(pokémon, set, old, new) : remplace `old` par `new` dans le texte d'un set.
+
+    Travaille sur une copie du dex ; le dex et les sets parsés sont restaurés après le test.
+    """
+    def edit(name: str, set_key: str, old: str, new: str):
+        dex = dict(pokedex.get_pokedex())
+        dex[name] = {**dex[name], set_key: dex[name][set_key].replace(old, new)}
+        monkeypatch.setattr(pokedex, "_pokedex", dex)
+        pokedex._clear_sets()
+
+    yield edit
+    pokedex._clear_sets()
+
+
+class NativePool:
+    """Remplace le pool Node : même flux (entry / pairDone), calculé par le moteur natif."""
+
+    requests = []
+
+    def __init__(self, size: int = 1):
+        pass
+
+    def stream_batch(self, pairs):
+        for a, b in pairs:
+            NativePool.requests.append((a, b))
+            for entry in calc_matchups(a, b):
+                yield {"pair": [a, b], "entry": entry}
+            yield {"pair": [a, b], "pairDone": True}
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def native_pool(monkeypatch):
+    """Build de la table de dégâts sans Node (Pokémon couverts par le moteur natif)."""
+    monkeypatch.setattr(damage_tensor, "CalcWorkerPool", NativePool)
+    NativePool.requests = []
+    return NativePool
@@ -0,0 +1,95 @@
+import shutil
+import threading
+
+import pytest
+
+from core import duel_simulator
+from core.calc_pool import CalcWorkerError, CalcWorkerPool
+
+pytestmark = pytest.mark.skipif(shutil.which("node") is None, reason="node absent")
+
+# Faux worker NDJSON : renvoie (a, b, pid), plante sur "crash", ne répond jamais à "hang".
+# En batch : deux entrées puis pairDone par paire, une erreur pour "bad", puis done.
+FAKE_WORKER = """
+import readline from 'readline';
+const write = obj => process.stdout.write(JSON.stringify(obj) + '\\n');
+const rl = readline.createInterface({ input: process.stdin, terminal: false });
+rl.on('line', line => {
+  const request = JSON.parse(line);
+  if (request.op === 'batch') {
+    for (const pair of request.pairs) {
+      if (pair[0] === 'bad') { write({ id: request.id, pair, error: 'introuvable', pairDone: true }); continue; }
+      for (const n of [0, 1]) write({ id: request.id, pair, entry: { n } });
+      write({ id: request.id, pair, pairDone: true });
+    }
+    write({ id: request.id, done: true });
+    return;
+  }
+  if (request.a === 'crash') { console.error(`boom ${request.b}`); process.exit(1); }
+  if (request.a === 'hang') return;
+  process.stdout.write(JSON.stringify({ id: request.id, result: [request.a, request.b, process.pid] }) + '\\n');
+});
+"""
+
+
+@pytest.fixture
+def pool(tmp_path):
+    script = tmp_path / "fake_worker.mjs"
+    script.write_text(FAKE_WORKER, encoding="utf-8")
+    pool = CalcWorkerPool(size=1, script_path=str(script), timeout=1)
+    yield pool
+    pool.close()
+
+
+def test_round_trip_reuses_the_worker(pool):
+    a, b, pid = pool.damage_calc("x", "y")
+    assert (a, b) == ("x", "y")
+    assert pool.damage_calc("z", "w")[2] == pid
+
+
+def test_dead_worker_is_restarted_with_its_stderr(pool):
+    pid = pool.damage_calc("x", "y")[2]
+    with pytest.raises(CalcWorkerError, match="boom y"):
+        pool.damage_calc("crash", "y")
+    assert pool.restarts == 2  # la requête est rejouée une fois
+    assert pool.damage_calc("x", "y")[2] != pid
+
+
+def test_hung_worker_times_out(pool):
+    with pytest.raises(CalcWorkerError, match="sans réponse"):
+        pool.damage_calc("hang", "y")
+    assert pool.damage_calc("x", "y")[:2] == ["x", "y"]
+
+
+def test_close_wakes_waiting_threads(pool):
+    busy = pool._acquire()
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(pool.damage_calc("x", "y")))
+    waiter.start()
+    pool.close()
+    waiter.join(timeout=5)
+    assert not waiter.is_alive() and results[0][:2] == ["x", "y"]
+    pool._release(busy)
+    assert busy.process is None
+
+
+def test_batch_stream_is_grouped_by_pair(pool, monkeypatch):
+    monkeypatch.setattr(duel_simulator, "get_calc_pool", lambda: pool)
+    monkeypatch.setattr(duel_simulator, "native_damage_calc", lambda *args, **kwargs: None)
+    results = list(duel_simulator.run_damage_calc_batch([("x", "y"), ("bad", "y"), ("z", "y")]))
+    assert results == [
+        ("x", "y", [{"n": 0}, {"n": 1}], None),
+        ("bad", "y", [], "introuvable"),
+        ("z", "y", [{"n": 0}, {"n": 1}], None),
+    ]
+    # Le flux s'arrête sur `done` : aucune ligne ne reste en attente pour la requête suivante
+    assert pool.damage_calc("x", "y")[:2] == ["x", "y"]
+
+
+def test_abandoned_batch_restarts_the_worker(pool):
+    pid = pool.damage_calc("x", "y")[2]
+    stream = pool.stream_batch(pairs=[("x", "y"), ("z", "y")])
+    assert next(stream)["entry"] == {"n": 0}
+    stream.close()
+    # Des lignes du batch étaient encore en vol : nouveau process, réponses resynchronisées
+    assert pool.damage_calc("x", "y") [2] != pid
@@ -0,0 +1,35 @@
+from itertools import combinations
+
+from core import duel_simulator
+from core.core_search import core_score, search_cores
+from core.threat_bitsets import BeatsIndex
+
+# Pokémon dont tous les sets passent par le moteur natif : pas besoin de Node
+NAMES = ["Roaring Moon", "Gholdengo", "Darkrai", "Garganacl", "Corviknight", "Clefable", "Toxapex"]
+
+def test_wide_beam_finds_exhaustive_best(monkeypatch):
+    monkeypatch.setattr(duel_simulator, "DAMAGE_BACKEND", "native")
+    beats = BeatsIndex(NAMES, {}, "max")
+    ranking = search_cores(["Gholdengo"], [], core_size=3, beam_width=20, top_n=len(NAMES),
+                           results=3, workers=2, beats=beats, pool=NAMES)
+
+    def score(core):
+        covered = draws = 0
+        for name in core:
+            covered |= beats.beats[beats.id(name)]
+            draws |= beats.draws[beats.id(name)]
+        return core_score(covered, draws)
+
+    exhaustive = sorted(((score(("Gholdengo",) + pair), pair) for pair in combinations(NAMES[:1] + NAMES[2:], 2)), reverse=True)
+    # Duels réellement résolus : sans eux, toutes les équipes vaudraient 0 et l'égalité serait triviale
+    assert beats.duel_cache and not any("error" in summary for summary in beats.duel_cache.values())
+    best_score, best_pair = exhaustive[0]
+    assert best_score > 0 and best_score > exhaustive[1][0]
+    assert [r["score"] for r in ranking] == [s for s, _ in exhaustive[:3]]
+    assert sorted(ranking[0]["core"]) == sorted(("Gholdengo",) + best_pair)
+    assert all("Gholdengo" in r["core"] for r in ranking)
+
+    # Beam étroit sur un seul process : jamais mieux que le beam large
+    narrow = search_cores(["Gholdengo"], [], core_size=3, beam_width=1, top_n=len(NAMES),
+                          results=1, workers=1, beats=beats, pool=NAMES)
+    assert narrow[0]["score"] <= ranking[0]["score"]
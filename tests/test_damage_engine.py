@@ -0,0 +1,78 @@
+import json
+import os
+
+import pytest
+from core.damage_engine import PARITY_CORPUS_PATH, calculate_rolls, calc_matchups, prepare_side, UnsupportedMechanic
+from data.moves import get_move
+from data.pokedex import StrategySet
+
+def make_side(name, moves, item="", ability="", tera=None, nature="Hardy"):
+    return prepare_side(name, StrategySet(name, "test", item, ability, tera, nature, moves=moves))
+
+def damage(attacker, defender, move):
+    return calculate_rolls([(attacker, defender, get_move(move))])[0]
+
+def test_rolls_are_sorted_and_within_85_percent():
+    chomp = make_side("garchomp", ["Earthquake"], ability="Rough Skin")
+    heatran = make_side("heatran", ["Lava Plume"], ability="Flash Fire")
+    rolls = damage(chomp, heatran, "Earthquake")
+    assert len(rolls) == 16
+    assert list(rolls) == sorted(rolls)
+    assert rolls[0] / rolls[-1] == pytest.approx(0.85, abs=0.01)
+
+def test_type_immunity_and_levitate_deal_no_damage():
+    chomp = make_side("garchomp", ["Earthquake"], ability="Rough Skin")
+    corviknight = make_side("corviknight", ["Brave Bird"], ability="Pressure")
+    rotom = make_side("rotomwash", ["Hydro Pump"], ability="Levitate")
+    assert damage(chomp, corviknight, "Earthquake").max() == 0
+    assert damage(chomp, rotom, "Earthquake").max() == 0
+
+def test_stab_and_tera_stab():
+    defender = make_side("blissey", ["Soft-Boiled"], ability="Natural Cure")
+    chomp = make_side("garchomp", ["Earthquake", "Iron Head"], ability="Rough Skin")
+    tera_chomp = make_side("garchomp", ["Earthquake"], ability="Rough Skin", tera="ground")
+    stab = damage(chomp, defender, "Earthquake")[-1]
+    tera_stab = damage(tera_chomp, defender, "Earthquake")[-1]
+    assert tera_stab / stab == pytest.approx(2 / 1.5, rel=0.02)
+
+def test_choice_band_boosts_physical_only():
+    plain = make_side("garchomp", ["Earthquake"], ability="Rough Skin")
+    banded = make_side("garchomp", ["Earthquake"], ability="Rough Skin", item="Choice Band")
+    defender = make_side("blissey", ["Soft-Boiled"], ability="Natural Cure")
+    ratio = damage(banded, defender, "Earthquake")[-1] / damage(plain, defender, "Earthquake")[-1]
+    assert ratio == pytest.approx(1.5, rel=0.03)
+
+def test_unknown_move_is_unsupported():
+    with pytest.raises(UnsupportedMechanic):
+        make_side("garchomp", ["Heavy Slam"])
+
+def test_tera_60_bp_floor_skips_priority_moves():
+    defender = make_side("blissey", ["Soft-Boiled"], ability="Natural Cure")
+    for move, tera, floored in [("Aqua Jet", "water", False), ("Bullet Punch", "steel", False), ("Grassy Glide", "grass", True)]:
+        plain = make_side("dragonite", [move], ability="Inner Focus")
+        tera_side = make_side("dragonite", [move], ability="Inner Focus", tera=tera)
+        ratio = damage(tera_side, defender, move)[-1] / damage(plain, defender, move)[-1]
+        bp = get_move(move)["bp"]
+        # Tera STAB x1.5, et la puissance remontée à 60 seulement hors priorité
+        assert ratio == pytest.approx(1.5 * (60 / bp if floored else 1), rel=0.03)
+
+@pytest.mark.skipif(not os.path.exists(PARITY_CORPUS_PATH),
+                    reason="Corpus absent : python -m core.damage_engine build-corpus")
+def test_parity_with_smogon_calc():
+    with open(PARITY_CORPUS_PATH, "r", encoding="utf-8") as f:
+        corpus = json.load(f)
+
+    checked = 0
+    for case in corpus:
+        try:
+            native = calc_matchups(case["a"], case["b"])
+        except UnsupportedMechanic:
+            continue
+        expected = {(e["setNames"]["a"], e["setNames"]["b"]): e["moves"] for e in case["entries"]}
+        for entry in native:
+            moves = expected[(entry["setNames"]["a"], entry["setNames"]["b"])]
+            for got, want in zip(entry["moves"], moves):
+                if "max" in want:
+                    assert (got["min"], got["max"]) == (want["min"], want["max"]), (case["a"], case["b"], got["name"])
+        checked += 1
+    assert checked > 0
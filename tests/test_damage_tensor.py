@@ -0,0 +1,56 @@
+import numpy as np
+
+from core import damage_tensor
+from core.matchup_cache import diff_set_hashes, set_hashes
+from core.damage_engine import calc_matchups
+from data.pokedex import get_parsed_sets
+
+# Pokémon dont tous les sets passent par le moteur natif
+NAMES = ["darkrai", "garganacl", "gholdengo"]
+
+
+def test_build_then_read_through_mmap(native_pool, tmp_path):
+    summary = damage_tensor.build_damage_tensor(str(tmp_path), workers=2, names=NAMES)
+    assert summary["pairs"] == 6
+
+    tensor = damage_tensor.DamageTensor(str(tmp_path))
+    assert isinstance(tensor.dmg_max, np.memmap)
+    assert tensor.has("darkrai", "garganacl") and not tensor.has("darkrai", "toxapex")
+
+    expected = calc_matchups("darkrai", "garganacl")
+    entries = tensor.entries("darkrai", "garganacl")
+    assert [e["setNames"] for e in entries] == [e["setNames"] for e in expected]
+    assert [e["moves"] for e in entries] == [e["moves"][:damage_tensor.MOVE_SLOTS] for e in expected]
+    assert [e["defender"]["stats"] for e in entries] == [e["defender"]["stats"] for e in expected]
+    best = tensor.best_damage("darkrai", "garganacl")
+    assert best.shape == (len(get_parsed_sets("darkrai")), len(get_parsed_sets("garganacl"))) and best.max() == max(m.get("max", 0) for e in expected for m in e["moves"])
+
+
+def test_refresh_recomputes_only_the_changed_set(native_pool, edit_set, tmp_path):
+    damage_tensor.build_damage_tensor(str(tmp_path / "old"), workers=2, names=NAMES)
+    old = damage_tensor.DamageTensor(str(tmp_path / "old"))
+    old_min, old_max = np.array(old.dmg_min), np.array(old.dmg_max)
+    previous = {name: set_hashes(name) for name in NAMES}
+
+    edit_set("darkrai", "strategy: OU Nasty Plot", "EVs: 252 SA / 4 SD / 252 SP", "EVs: 252 HP / 4 SA / 252 SP")
+    assert diff_set_hashes(previous, NAMES) == {"darkrai": ["OU Nasty Plot"]}
+
+    native_pool.requests = []
+    summary = damage_tensor.refresh_damage_tensor(str(tmp_path / "old"), workers=2, names=NAMES)
+    changed = "darkrai:OU Nasty Plot"
+    others = [n for n in NAMES if n != "darkrai"]
+    assert sorted(native_pool.requests) == sorted([(changed, b) for b in others] + [(a, changed) for a in others])
+    assert summary["pairs"] == 6 and summary["reused"] == 2 and summary["recomputed"] == 4
+
+    refreshed = damage_tensor.DamageTensor(str(tmp_path / "old"))
+    i = next(k for k, s in enumerate(refreshed.sets) if s["pokemon"] == "darkrai" and s["set"] == "strategy: OU Nasty Plot")
+    keep = np.arange(len(refreshed.sets)) != i
+    # Les blocs recopiés (np.ix_) gardent les anciennes valeurs, la ligne et la colonne du set changent
+    assert (refreshed.dmg_max[np.ix_(keep, keep)] == old_max[np.ix_(keep, keep)]).all()
+    assert (refreshed.dmg_min[np.ix_(keep, keep)] == old_min[np.ix_(keep, keep)]).all()
+    assert not (refreshed.dmg_max[i] == old_max[i]).all() and not (refreshed.dmg_max[:, i] == old_max[:, i]).all()
+
+    damage_tensor.build_damage_tensor(str(tmp_path / "fresh"), workers=2, names=NAMES)
+    fresh = damage_tensor.DamageTensor(str(tmp_path / "fresh"))
+    assert (refreshed.dmg_max == fresh.dmg_max).all() and (refreshed.dmg_min == fresh.dmg_min).all()
+    assert (refreshed.stats == fresh.stats).all() and (refreshed.filled == fresh.filled).all()
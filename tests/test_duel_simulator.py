@@ -0,0 +1,51 @@
+import numpy as np
+from core.duel_simulator import resolve_duels_batch, simulate_multi_turn_duel, WIN, DRAW, LOSS
+
+def reference_duel(hpA, hpB, speedA, speedB, dmgA, dmgB, max_turns=8):
+    # Boucle tour par tour de l'ancien simulate_multi_turn_duel
+    for _ in range(max_turns):
+        if speedA > speedB:
+            hpB -= dmgA
+            if hpB <= 0:
+                return WIN
+            hpA -= dmgB
+            if hpA <= 0:
+                return LOSS
+        elif speedB > speedA:
+            hpA -= dmgB
+            if hpA <= 0:
+                return LOSS
+            hpB -= dmgA
+            if hpB <= 0:
+                return WIN
+        else:
+            hpB -= dmgA
+            hpA -= dmgB
+            if hpA <= 0 and hpB <= 0:
+                return DRAW
+            elif hpB <= 0:
+                return WIN
+            elif hpA <= 0:
+                return LOSS
+    return DRAW
+
+def test_batch_resolver_matches_turn_by_turn_loop():
+    rng = np.random.default_rng(0)
+    n = 5000
+    hpA, hpB = rng.integers(1, 400, n), rng.integers(1, 400, n)
+    speedA, speedB = rng.integers(50, 60, n), rng.integers(50, 60, n)
+    dmgA, dmgB = rng.integers(0, 200, n), rng.integers(0, 200, n)
+
+    verdicts = resolve_duels_batch(hpA, hpB, speedA, speedB, dmgA, dmgB)
+    expected = [reference_duel(*args) for args in zip(hpA, hpB, speedA, speedB, dmgA, dmgB)]
+    assert verdicts.dtype == np.int8
+    assert verdicts.tolist() == expected
+
+def test_scalar_wrapper():
+    fast = {"hp": 300, "speed": 120}
+    slow = {"hp": 300, "speed": 80}
+    ohko = [{"name": "Close Combat", "min": 280, "max": 330}]
+    weak = [{"name": "Tackle", "min": 20, "max": 25}]
+    assert simulate_multi_turn_duel(fast, slow, ohko, ohko) == "win"
+    assert simulate_multi_turn_duel(slow, fast, ohko, ohko) == "loss"
+    assert simulate_multi_turn_duel(fast, slow, weak, weak) == "draw"
@@ -0,0 +1,26 @@
+import threading
+
+from core.jobs import JobRunner
+
+def test_progress_and_cancel():
+    started = threading.Event()
+    release = threading.Event()
+
+    def work(n, progress=None):
+        for i in range(n):
+            progress({"stage": "step", "i": i})
+            started.set()
+            release.wait()
+        return n
+
+    runner = JobRunner()
+    job = runner.submit("long", work, 100)
+    started.wait(5)
+    assert job.status == "running" and job.events_since() == [{"stage": "step", "i": 0}]
+
+    job.cancel()
+    release.set()
+    done = runner.submit("court", work, 3)
+    runner._executor.shutdown(wait=True)
+    assert job.status == "cancelled" and len(job.events) == 1
+    assert done.status == "done" and done.result == 3 and len(done.events) == 3
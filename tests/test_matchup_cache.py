@@ -0,0 +1,47 @@
+from core.matchup_cache import MatchupCache, get_matchup_cache, set_content_hash
+from data import pokedex
+
+
+def test_lru_keeps_the_most_recent_entries():
+    cache = MatchupCache("test", path=None, max_memory=2)
+    cache["garchomp", "heatran"] = 1
+    cache["garchomp", "toxapex"] = 2
+    assert cache["garchomp", "heatran"] == 1  # devient la plus récente
+    cache["garchomp", "clefable"] = 3
+    assert ("garchomp", "toxapex") not in cache
+    assert cache.get("garchomp", "heatran") == 1 and cache.get("garchomp", "clefable") == 3
+
+
+def test_disk_round_trip_skips_errors(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = MatchupCache("test", path=path)
+    cache["garchomp", "heatran"] = {"wins": 3}
+    cache["garchomp", "toxapex"] = {"error": "introuvable"}
+    cache.close()
+
+    reopened = MatchupCache("test", path=path)
+    assert reopened.get("garchomp", "heatran") == {"wins": 3}
+    assert reopened.disk_hits == 1
+    assert ("garchomp", "toxapex") not in reopened
+    # Autre format de valeurs : aucune entrée reprise
+    assert ("garchomp", "heatran") not in MatchupCache("test", path=path, version=2)
+
+
+def test_reloaded_dex_invalidates_hashes_and_entries(monkeypatch, tmp_path):
+    cache = MatchupCache("test", path=str(tmp_path / "cache.sqlite"))
+    before = set_content_hash("garchomp")
+    cache["garchomp", "heatran"] = {"wins": 3}
+
+    # Nouvel objet dex avec un set de plus, comme après refresh_pokedex()
+    dex = pokedex.get_pokedex()
+    monkeypatch.setattr(pokedex, "_pokedex", {**dex, "garchomp": {**dex["garchomp"], "strategy: Test": "- Earthquake"}})
+    pokedex._clear_sets()
+    try:
+        assert set_content_hash("garchomp") != before
+        assert ("garchomp", "heatran") not in cache
+    finally:
+        pokedex._clear_sets()
+
+def test_shared_caches_stay_out_of_data_results(tmp_path):
+    # conftest.isolated_matchup_cache : chaque test a son propre fichier SQLite
+    assert get_matchup_cache("duel").path == str(tmp_path / "matchup_cache.sqlite")
@@ -0,0 +1,42 @@
+import copy
+
+import numpy as np
+
+from core.metagame_history import MetagameHistory
+
+BASE = {
+    "Great Tusk": {"abilities": {"Protosynthesis": 100.0}, "items": {"Rocky Helmet": 40.239, "Other": 59.761},
+                   "spreads": {}, "moves": {"Rapid Spin": 97.852}, "tera_types": {}, "teammates": {"Kingambit": 34.759},
+                   "checks_counters": [{"name": "Skarmory 61.739", "detail": "86.54±6.20"}],
+                   "raw_count": 700, "viability_ceiling": 91},
+    "Kingambit": {"abilities": {"Supreme Overlord": 97.5}, "items": {}, "spreads": {}, "moves": {}, "tera_types": {},
+                  "teammates": {}, "checks_counters": [], "raw_count": 300, "viability_ceiling": 88},
+}
+
+
+def month_data(tusk: int, gambit: int) -> dict:
+    data = copy.deepcopy(BASE)
+    data["Great Tusk"]["raw_count"], data["Kingambit"]["raw_count"] = tusk, gambit
+    return data
+
+
+def test_snapshots_round_trip_and_trends(tmp_path):
+    history = MetagameHistory()
+    # Ajoutés dans le désordre : les mois restent triés
+    for month, (tusk, gambit) in {"2024-03": (500, 500), "2024-01": (700, 300), "2024-02": (600, 400)}.items():
+        history.add_month(month, month_data(tusk, gambit))
+    history.add_month("2024-04", {"Kingambit": month_data(0, 900)["Kingambit"]})
+    history.save(str(tmp_path))
+
+    loaded = MetagameHistory.load(str(tmp_path))
+    assert loaded.months == ["2024-01", "2024-02", "2024-03", "2024-04"]
+    assert loaded.snapshot("2024-02") == month_data(600, 400)
+    assert list(loaded.snapshot("2024-04")) == ["Kingambit"]
+
+    assert np.allclose(loaded.usage_share()[:, loaded.index["Kingambit"]], [30, 40, 50, 100])
+    assert [name for name, _ in loaded.rising_threats(last=3)] == ["Kingambit"]
+
+    # Remplacer un mois ne touche pas aux autres
+    loaded.add_month("2024-01", month_data(100, 900))
+    assert loaded.snapshot("2024-01")["Great Tusk"]["raw_count"] == 100
+    assert loaded.snapshot("2024-03") == month_data(500, 500)
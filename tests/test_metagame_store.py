@@ -0,0 +1,69 @@
+import json
+import os
+
+from core.metagame_analyzer import MetagameStore, detect_common_cores, summarize_metagame
+
+
+def write(path, data, mtime):
+    path.write_text(json.dumps(data), encoding="utf-8")
+    os.utime(path, (mtime, mtime))
+
+
+def test_store_ranks_and_reloads_on_change(tmp_path):
+    path = tmp_path / "metagame.json"
+    write(path, {
+        "Great Tusk": {"raw_count": 30, "viability_ceiling": 90},
+        "Kingambit": {"raw_count": 50, "viability_ceiling": 80},
+        "Gholdengo": {"raw_count": 10, "viability_ceiling": 95},
+    }, 1000)
+    store = MetagameStore(str(path))
+
+    assert [n for n, _ in store.top_usage(2)] == ["Kingambit", "Great Tusk"]
+    assert [n for n, _ in store.top_viability()] == ["Gholdengo", "Great Tusk", "Kingambit"]
+    assert store.entry("greattusk")["raw_count"] == 30
+    assert store.summary(top_n=1)["top_threats"] == [("Gholdengo", 95)]
+    assert store.summary(top_n=1) is store.summary(top_n=1)
+    # Un générateur est lu une seule fois ; les variantes d'un nom partagent l'entrée mémorisée
+    scoped = store.summary((name for name in ["Great Tusk", "Gholdengo"]), top_n=1)
+    assert scoped["top_pokemon"] == [("Great Tusk", 30)]
+    assert store.summary(["greattusk", "gholdengo"], top_n=1) is scoped
+
+    # Même fichier, même mtime : pas de relecture
+    data = store.data
+    assert store.data is data
+
+    write(path, {"Dragapult": {"raw_count": 5, "viability_ceiling": 70}}, 2000)
+    assert store.names() == ["Dragapult"]
+    assert store.entry("Great Tusk") is None
+
+
+def test_cores_are_cliques_of_mutual_teammates():
+    mates = {
+        "A": {"B": 40, "C": 40, "D": 40},
+        "B": {"A": 40, "C": 40, "D": 40},
+        "C": {"A": 40, "B": 40, "D": 40},
+        "D": {"A": 40, "B": 40, "C": 5},  # C–D pas réciproque
+        "E": {"A": 40},
+    }
+    data = {name: {"teammates": t} for name, t in mates.items()}
+
+    cores = detect_common_cores(data, min_pct=15.0, max_depth=4)
+    assert ["A", "B", "C"] in cores and ["A", "B", "D"] in cores
+    assert ["A", "C", "D"] not in cores and ["A", "E"] not in cores
+    assert all(len(core) < 4 for core in cores)
+    assert detect_common_cores(data, max_depth=2) == [["A", "B"], ["A", "C"], ["A", "D"], ["B", "C"], ["B", "D"]]
+
+
+def test_summary_single_pass_and_scoped():
+    data = {
+        "Great Tusk": {"raw_count": 30, "moves": {"Rapid Spin": 90.0, "Knock Off": 20.0}, "items": {"Leftovers": 50.0}},
+        "Kingambit": {"raw_count": 50, "moves": {"Knock Off": 80.0}, "items": {"Leftovers": 20.0, "Black Glasses": 60.0}},
+    }
+    summary = summarize_metagame(data, top_n=2)
+    assert summary["top_pokemon"] == [("Kingambit", 50), ("Great Tusk", 30)]
+    assert summary["common_moves"] == [("Knock Off", 100.0), ("Rapid Spin", 90.0)]
+    assert summary["common_items"] == [("Leftovers", 70.0), ("Black Glasses", 60.0)]
+
+    scoped = summarize_metagame(data, pokemon=["greattusk"])
+    assert scoped["top_pokemon"] == [("Great Tusk", 30)]
+    assert scoped["common_items"] == [("Leftovers", 50.0)]
@@ -0,0 +1,68 @@
+import numpy as np
+from core import duel_simulator
+from core.duel_simulator import run_matchup
+from core.monte_carlo import (
+    MC_MIN_TRIALS,
+    _exact_turn_distribution,
+    _sample_turns_to_ko,
+    _turn_bounds,
+    _turn_histogram,
+    monte_carlo_summary,
+    outcomes_summary,
+    set_pair_outcomes,
+    simulate_duels_monte_carlo,
+    wilson_interval
+)
+
+SURE_KO = ([400] * 16, [600] * 16, 1.0)
+COIN_FLIP_KO = ([400] * 16, [600] * 16, 0.5)
+HARMLESS = ([0] * 16, [0] * 16, 1.0)
+# 5 à 6 coups au but pour 300 PV : loi du tour de KO tirée, pas calculée
+CHIP = (list(range(55, 71)), [r * 3 // 2 for r in range(55, 71)], 0.9)
+
+def test_exact_pairs_need_no_trials():
+    outcomes = simulate_duels_monte_carlo([300, 300], [300, 300], [100, 100], [50, 50],
+                                          [SURE_KO, COIN_FLIP_KO], [HARMLESS, HARMLESS])
+    assert outcomes[0, :3].tolist() == [1, 0, 0]
+    # 8 tours pour toucher au moins une fois à 50 %, sinon nul
+    assert np.isclose(outcomes[1, 0], 1 - 0.5 ** 8) and outcomes[1, 2] == 0
+    assert (outcomes[:, 5] == 0).all()
+
+def test_sampling_is_seeded_and_adds_trials_to_close_pairs():
+    args = ([300, 300], [300, 300], [100, 100], [100, 50], [CHIP, CHIP], [CHIP, HARMLESS])
+    outcomes = simulate_duels_monte_carlo(*args, seed=1)
+    assert (outcomes == simulate_duels_monte_carlo(*args, seed=1)).all()
+    assert not (outcomes == simulate_duels_monte_carlo(*args, seed=2)).all()
+    # Miroir à vitesse égale : autant de victoires que de défaites, au-delà du premier tirage
+    assert abs(outcomes[0, 0] - outcomes[0, 2]) < 0.05 and outcomes[0, 5] > MC_MIN_TRIALS
+    assert outcomes[1, 2] == 0 and outcomes[1, 5] >= MC_MIN_TRIALS
+
+def test_exact_turn_distribution_matches_sampling():
+    # 2 ou 3 coups au but pour 250 PV (critiques compris), move à 80 % : calculée sans tirage
+    rolls = list(range(100, 116))
+    table = np.array([rolls + [r * 3 // 2 for r in rolls]], dtype=np.int32)
+    hp, accuracy = np.array([250.0]), np.array([0.8])
+    dist, exact = _exact_turn_distribution(hp, table, accuracy, *_turn_bounds(hp, table, accuracy, 8), 8)
+    assert exact.all() and np.isclose(dist.sum(), 1)
+    sampled = _turn_histogram(_sample_turns_to_ko(np.random.default_rng(0), hp, table, accuracy, 200_000, 8), 8)
+    assert np.abs(dist - sampled / 200_000).max() < 0.005
+
+def test_matchup_interval_treats_set_pairs_as_units():
+    # Une paire gagnée à coup sûr, une perdue : 50 %, mais tout dépend du set rencontré
+    outcomes = np.array([[1, 0, 0, 0, 0, 0], [0, 0, 1, 0, 0, 0]], dtype=float)
+    summary = outcomes_summary(outcomes)
+    assert summary["win_prob"] == 0.5 and summary["win_ci"][0] < 0.1 and summary["win_ci"][1] > 0.9
+    lo, hi = wilson_interval(50, 100)
+    assert lo < 0.5 < hi
+
+def test_set_pair_outcomes_average_to_the_summary(monkeypatch):
+    monkeypatch.setattr(duel_simulator, "DAMAGE_BACKEND", "native")
+    matchup = run_matchup("darkrai", "garganacl", rolls=True)
+    pairs = set_pair_outcomes(matchup)
+    assert list(pairs) == list(matchup)
+    for outcome in pairs.values():
+        assert outcome["win_ci"][0] <= outcome["win_prob"] <= outcome["win_ci"][1]
+        assert abs(outcome["win_prob"] + outcome["draw_prob"] + outcome["loss_prob"] - 1) < 1e-3
+    summary = monte_carlo_summary(matchup)
+    assert summary["set_pairs"] == len(matchup)
+    assert abs(np.mean([o["win_prob"] for o in pairs.values()]) - summary["win_prob"]) < 1e-3
@@ -0,0 +1,24 @@
+from data.name_index import NameIndex, get_name_index, normalize
+from data.pokedex import get_pokemon_data
+
+
+def test_variants_resolve_to_dex_keys():
+    index = get_name_index()
+    assert normalize("Flabébé") == "flabebe" and normalize("Mr. Mime") == "mrmime"
+    assert {index.resolve(n) for n in ("Great Tusk", "great-tusk", "GREATTUSK", "Great Tsuk")} == {"greattusk"}
+    assert index.resolve("Mega Charizard X") == "charizardmegax"
+    assert index.resolve("Alolan Ninetales") == index.resolve("Ninetales-Alola") == "ninetalesalola"
+    assert index.resolve("Great Tsuk", suggest=False) is None
+    assert get_pokemon_data("Ogerpon-Wellspring")["name"] == "ogerponwellspring"
+
+
+def test_fuzzy_matches_difflib_and_memoises():
+    from difflib import get_close_matches
+
+    keys = ["greattusk", "gholdengo", "kingambit", "gliscor", "glimmora"]
+    index = NameIndex(keys)
+    for query in ("kingambti", "glimora", "gholdengoo", "glisco"):
+        assert index.fuzzy(query) == get_close_matches(query, keys, n=1, cutoff=0.7)[0]
+    assert index.resolve("zzzz") is None
+    index.resolve("kingambti")
+    assert ("kingambti", True, 0.7) in index._resolved
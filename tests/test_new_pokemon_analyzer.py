@@ -0,0 +1,108 @@
+import pytest
+
+from core import damage_tensor, duel_simulator, new_pokemon_analyzer as analyzer, tournament
+from core.calc_pool import CalcWorkerError
+from core.duel_simulator import run_matchup
+from core.new_pokemon_analyzer import (
+    build_summary,
+    duel_result_summary,
+    early_exit_summary,
+    prefetch_duel_results,
+    sets_before_verdict,
+    summarize_matchup
+)
+from data.pokedex import get_parsed_sets
+
+@pytest.fixture
+def native(monkeypatch):
+    # Pokémon dont tous les sets passent par le moteur natif : pas besoin de Node
+    monkeypatch.setattr(duel_simulator, "DAMAGE_BACKEND", "native")
+    monkeypatch.setattr(analyzer, "tournament_summary", lambda *args: None)
+
+def test_sets_before_verdict():
+    # 10 sets de 10 paires : pas de verdict avant 6 sets (60 paires sur 100)
+    assert sets_before_verdict(0, 0, 100, 10) == 6
+    # 50 victoires sur 60 : un set gagné de plus passe les 50 % ; 10 sur 60 : un set perdu suffit
+    assert sets_before_verdict(50, 60, 40, 10) == 1
+    assert sets_before_verdict(10, 60, 40, 10) == 1
+    # 30 victoires sur 60 : 3 sets avant de passer 50 % ou de ne plus pouvoir les atteindre
+    assert sets_before_verdict(30, 60, 40, 10) == 3
+    assert sets_before_verdict(0, 0, 0, 0) == 1
+
+def test_early_exit_keeps_the_verdict(native):
+    for model in ("max", "montecarlo"):
+        for a, b in [("gholdengo", "darkrai"), ("garganacl", "roaringmoon"), ("clefable", "toxapex")]:
+            full = summarize_matchup(run_matchup(a, b, rolls=model == "montecarlo"), model)
+            early = early_exit_summary(a, b, model)
+            assert early["verdict"] == full["verdict"]
+            if early.get("exact") is False:
+                assert early["evaluated"] + early["skipped"] == full["wins"] + full["losses"] + full["draws"]
+
+def test_early_exit_batches_only_the_sets_it_needs(native, monkeypatch):
+    batches = []
+
+    def counting_batch(pairs, rolls=False):
+        batches.append(len(pairs))
+        return duel_simulator.run_matchup_batch(pairs, rolls)
+
+    monkeypatch.setattr(analyzer, "run_matchup_batch", counting_batch)
+    early = early_exit_summary("darkrai", "garganacl", "max")
+    per_set = len(get_parsed_sets("garganacl"))
+    # Aucun verdict possible avant la moitié des sets : le premier batch les demande tous d'un coup
+    assert batches[0] == len(get_parsed_sets("darkrai")) // 2 + 1
+    assert sum(batches) * per_set == early["evaluated"] and len(batches) < sum(batches)
+
+def test_inverse_of_an_early_verdict_is_not_taken_as_exact(native):
+    cache = {}
+    early = duel_result_summary("darkrai", "garganacl", cache, "max")
+    assert early["verdict"] == "✅ Win" and early["exact"] is False
+    inverse = cache[("garganacl", "darkrai")]
+    assert inverse["verdict"] == "❌ Loss" and inverse["exact"] is False and inverse["skipped"] == early["skipped"]
+
+    full = summarize_matchup(run_matchup("garganacl", "darkrai"), "max")
+    assert duel_result_summary("garganacl", "darkrai", cache, "max", exact=True) == full
+
+def test_prefetch_falls_back_to_single_duels_when_the_batch_fails(monkeypatch):
+    def broken_batch(pairs, rolls=False):
+        yield pairs[0][0], pairs[0][1], {}, "introuvable"
+        raise CalcWorkerError("Worker Node terminé sans réponse.")
+
+    def fake_matchup(a, b, rolls=False):
+        if b == "toxapex":
+            raise RuntimeError("Pokémon introuvable : toxapex")
+        return {}
+
+    monkeypatch.setattr(analyzer, "run_matchup_batch", broken_batch)
+    monkeypatch.setattr(analyzer, "run_matchup", fake_matchup)
+    monkeypatch.setattr(analyzer, "tournament_summary", lambda *args: None)
+    cache = {}
+    assert prefetch_duel_results([("a", "b"), ("a", "c"), ("a", "toxapex")], cache, "max") == 3
+    assert cache[("a", "b")] == {"error": "introuvable"}
+    assert "error" not in cache[("a", "c")] and cache[("a", "c")]["wins"] == 0
+    assert "toxapex" in cache[("a", "toxapex")]["error"]
+
+def test_default_model_reads_the_tensor_and_the_tournament(native_pool, monkeypatch, tmp_path):
+    names = ["darkrai", "garganacl", "gholdengo"]
+    monkeypatch.setattr(duel_simulator, "DAMAGE_BACKEND", "native")
+    monkeypatch.setattr(analyzer, "load_winrate_matrix", lambda: None)
+    assert analyzer.DUEL_MODEL == "max"
+    expected = summarize_matchup(run_matchup("darkrai", "garganacl"), "max")
+
+    # Table de dégâts : plus aucun appel au calc
+    damage_tensor.build_damage_tensor(str(tmp_path / "tensor"), workers=1, names=names)
+    monkeypatch.setattr(duel_simulator, "get_damage_tensor", lambda: damage_tensor.get_damage_tensor(str(tmp_path / "tensor")))
+
+    def no_calc(*args, **kwargs):
+        raise AssertionError("calc appelé malgré la table de dégâts")
+
+    monkeypatch.setattr(duel_simulator, "native_damage_calc", no_calc)
+    assert duel_result_summary("darkrai", "garganacl", {}, exact=True) == expected
+
+    # Matrice du tournoi : plus aucun matchup
+    tournament.run_tournament(str(tmp_path / "tournament"), workers=1, names=names)
+    monkeypatch.setattr(analyzer, "load_winrate_matrix", lambda: tournament.load_winrate_matrix(str(tmp_path / "tournament")))
+    monkeypatch.setattr(analyzer, "run_matchup", no_calc)
+    monkeypatch.setattr(analyzer, "run_matchup_batch", no_calc)
+    assert duel_result_summary("darkrai", "garganacl", {}) == build_summary(expected["wins"], expected["losses"], expected["draws"])
+    cache = {}
+    assert prefetch_duel_results([("gholdengo", "darkrai")], cache) == 0 and "verdict" in cache[("gholdengo", "darkrai")]
@@ -0,0 +1,47 @@
+import json
+import os
+
+from data import pokedex
+
+
+def test_binary_cache_follows_json(tmp_path, monkeypatch):
+    source = tmp_path / "dex.json"
+    cache = tmp_path / "dex.marshal"
+    monkeypatch.setattr(pokedex, "POKEDEX_PATH", str(source))
+    monkeypatch.setattr(pokedex, "POKEDEX_CACHE_PATH", str(cache))
+
+    source.write_text(json.dumps({"greattusk": {"name": "greattusk", "hp": "115"}}), encoding="utf-8")
+    assert pokedex.load_pokedex()["greattusk"]["hp"] == "115"
+    assert cache.exists()
+
+    # Même contenu, nouveau mtime (checkout git) : le cache reste valide
+    os.utime(source, (1000, 1000))
+    assert pokedex.load_pokedex()["greattusk"]["hp"] == "115"
+    assert cache.read_bytes().split(b" ")[1] == str(os.stat(source).st_mtime_ns).encode()
+
+    source.write_text(json.dumps({"greattusk": {"name": "greattusk", "hp": "999"}}), encoding="utf-8")
+    os.utime(source, (2000, 2000))
+    assert pokedex.load_pokedex()["greattusk"]["hp"] == "999"
+
+
+def test_strategy_sets_parsed_once_and_shared():
+    sets = pokedex.get_parsed_sets("Great Tusk")
+    assert sets and pokedex.get_parsed_sets("greattusk") is sets
+    legacy = pokedex.get_all_sets("greattusk")
+    assert [s.name for s in sets] == [d["name"] for d in legacy]
+    assert [m.lower() for m in sets[0].moves] == legacy[0]["moves"]
+
+    # Lookup par (Pokémon, set), avec ou sans le préfixe du dex
+    first = sets[0]
+    assert pokedex.get_set("great-tusk", first.key) is first
+    assert pokedex.get_set("greattusk", first.name) is first
+    assert pokedex.get_set("greattusk", "inexistant") is None
+
+    # Chaînes internées : un même move est le même objet d'un Pokémon à l'autre
+    a, b = (next(s for s in pokedex.get_parsed_sets(name) if "Earthquake" in s.moves) for name in ("garchomp", "landorustherian"))
+    assert a.moves[a.moves.index("Earthquake")] is b.moves[b.moves.index("Earthquake")]
+    assert len(first.evs) == 6 and len(first.ivs) == 6
+
+    payload = first.calc_set()
+    assert payload["name"] == "greattusk" and payload["moves"] == list(first.moves)
+    assert set(payload["evs"]) == {"hp", "atk", "def", "spa", "spd", "spe"}
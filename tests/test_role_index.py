@@ -0,0 +1,62 @@
+from data.pokedex import get_abilities, get_all_moves, get_base_stats, get_pokedex, get_roles
+from data.role_index import get_role_index
+
+def baseline_roles(name: str) -> set:
+    """Logique d'origine de get_roles, avant l'index : recalcule tout depuis le dex."""
+    stats, moves, abilities = get_base_stats(name), get_all_moves(name), get_abilities(name)
+    roles = set()
+    if stats["atk"] >= 100 or "huge power" in abilities or "pure power" in abilities:
+        roles.add("physical attacker")
+    if stats["spa"] >= 100:
+        roles.add("special attacker")
+    if stats["spe"] >= 100:
+        roles.add("fast")
+    elif stats["spe"] <= 60:
+        roles.add("slow")
+    if stats["hp"] * ((stats["def"] + stats["spd"]) / 2) >= 40000:
+        roles.add("tank")
+    for role, role_moves in [
+        ("hazard setter", ["stealthrock", "spikes", "stickyweb", "toxicspikes"]),
+        ("hazard control", ["defog", "rapidspin", "courtchange"]),
+        ("pivot", ["uturn", "voltswitch", "flipturn", "chillyreception"]),
+        ("setup sweeper", ["swordsdance", "nastyplot", "calmmind", "bulkup", "dragondance", "bellydrum",
+                           "irondefense", "agility", "quiverdance", "shellsmash", "growth", "curse",
+                           "victorydance", "takeheart", "clangoroussoul", "tailglow"]),
+        ("support", ["wish", "lunardance", "healingwish"]),
+        ("screen", ["reflect", "lightscreen", "auroraveil"]),
+        ("utilitaire", ["taunt", "encore", "trick", "switcheroo"]),
+        ("priority", ["shadowsneak", "iceshard", "bulletpunch", "aquajet",
+                      "extremespeed", "suckerpunch", "machpunch", "vacuumwave"])
+    ]:
+        if any(m in moves for m in role_moves):
+            roles.add(role)
+    if "contrary" in abilities:
+        roles.add("setup sweeper")
+    if any(w in abilities for w in ["drought", "drizzle", "snowwarning", "sandstream"]):
+        roles.add("weather setter")
+    return roles
+
+def test_query_matches_role_lists():
+    index = get_role_index()
+    fast_pivots = index.query("pivot", "fast")
+    assert fast_pivots
+    assert all({"pivot", "fast"} <= set(get_roles(name)) for name in fast_pivots)
+    # Les noms du metagame ("Great Tusk") retombent sur les clés du dex ("greattusk")
+    assert index.roles_of("Great Tusk") == index.roles_of("greattusk") != []
+    assert index.has_any("Great Tusk", ["hazard setter", "screen"])
+
+def test_index_matches_baseline_roles():
+    index = get_role_index()
+    for name in get_pokedex():
+        expected = baseline_roles(name)
+        assert set(index.roles_of(name)) == expected, name
+        assert index.has_all(name, expected)
+        for role in expected:
+            assert name in index.query(role)
+
+def test_unknown_roles_are_never_satisfied():
+    index = get_role_index()
+    assert index.has_all("Great Tusk", ["physical attacker"])
+    assert not index.has_all("Great Tusk", ["physical attacker", "wallbreaker"])
+    assert not index.has_all("Great Tusk", ["wallbreaker"])
+    assert index.query("physical attacker", "wallbreaker") == set()
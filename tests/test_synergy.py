@@ -1,5 +1,5 @@
 import pytest
-from core.synergy_calculator import is_compatible_with_team, get_team_type_coverage
+from core.synergy_calculator import is_compatible_with_team, get_team_type_coverage, screen_scores
 from data.pokedex import get_pokemon_data
 
 def test_type_overlap_blocks_addition():
@@ -29,3 +29,9 @@ def test_type_coverage_summary():
     coverage = get_team_type_coverage(team)
     assert coverage.get("poison") >= 1
     assert coverage.get("fighting") >= 1
+
+def test_screen_ranks_hopeless_candidate_last():
+    threats = [get_pokemon_data("Garchomp")]
+    # Heatran : 4× faible au STAB sol et plus lent ; Iron Valiant : STAB fée super efficace et plus rapide
+    scores = screen_scores([get_pokemon_data("Heatran"), get_pokemon_data("Iron Valiant")], threats)
+    assert scores[0] < 0.5 < scores[1]
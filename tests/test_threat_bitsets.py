@@ -0,0 +1,45 @@
+from core import duel_simulator
+from core.new_pokemon_analyzer import build_summary, duel_result_summary
+from core.threat_bitsets import BeatsIndex
+
+# Pokémon dont tous les sets passent par le moteur natif : pas besoin de Node
+NAMES = ["Roaring Moon", "Gholdengo", "Darkrai", "Garganacl", "Corviknight"]
+
+def test_bitsets_match_duel_loop(monkeypatch):
+    monkeypatch.setattr(duel_simulator, "DAMAGE_BACKEND", "native")
+    beats = BeatsIndex(NAMES, {})
+    core = ["Gholdengo", "Garganacl"]
+    threats = beats.names_of(beats.threats_to(core, top_n=3))
+
+    cache = {}
+    expected = [
+        t for t in NAMES[:3] if t not in core
+        and all(duel_result_summary(t, c, cache).get("verdict") == "✅ Win" for c in core)
+    ]
+    assert threats == expected
+
+    # Élargir le top ne résout que les nouveaux duels
+    assert beats.ensure(beats.top_mask(3) & ~beats.mask(core), beats.mask(core)) == 0
+    assert beats.ensure(beats.top_mask(5) & ~beats.mask(core), beats.mask(core)) == 2
+
+    scores = beats.counter_scores(["Darkrai"], beats.mask(["Roaring Moon", "Corviknight"]))
+    verdicts = [duel_result_summary("Darkrai", t, cache)["verdict"] for t in ["Roaring Moon", "Corviknight"]]
+    assert scores.get("Darkrai", 0) == sum({"✅ Win": 1, "⚖️ Draw": 0.5}.get(v, 0) for v in verdicts)
+
+def test_reverse_verdict_comes_from_the_same_counts():
+    # Beaucoup de nuls : garganacl perd contre toxapex, mais toxapex ne gagne pas pour autant
+    cache = {("garganacl", "toxapex"): build_summary(45, 99, 126)}
+    beats = BeatsIndex(["Garganacl", "Toxapex"], cache, "max")
+    assert beats.ensure(beats.mask(["Garganacl"]), beats.mask(["Toxapex"])) == 1
+    assert beats.verdict("Garganacl", "Toxapex") == "❌ Loss"
+    assert beats.verdict("Toxapex", "Garganacl") == "❌ Loss"
+    assert beats.ensure(beats.mask(["Toxapex"]), beats.mask(["Garganacl"])) == 0
+    assert beats.threats_to(["Garganacl"], top_n=2) == 0
+    assert beats.counter_scores(["Toxapex"], beats.mask(["Garganacl"])) == {}
+
+def test_early_loss_leaves_the_reverse_duel_unknown():
+    cache = {("garganacl", "toxapex"): {**build_summary(10, 150, 0), "exact": False, "evaluated": 160, "skipped": 110}}
+    beats = BeatsIndex(["Garganacl", "Toxapex"], cache, "max")
+    beats.ensure(beats.mask(["Garganacl"]), beats.mask(["Toxapex"]))
+    assert beats.verdict("Garganacl", "Toxapex") == "❌ Loss"
+    assert beats.verdict("Toxapex", "Garganacl") is None
@@ -0,0 +1,46 @@
+import os
+
+import numpy as np
+from core import duel_simulator
+from core.tournament import CHECKPOINT_FILE, WinrateMatrix, run_tournament
+
+# Pokémon dont tous les sets passent par le moteur natif : pas besoin de Node.
+# workers=1 garde les matchs dans le process du test : le backend et le dex patchés s'appliquent
+# aussi sur les plateformes en spawn (macOS, Windows), où un pool réimporterait les modules.
+NAMES = ["roaringmoon", "gholdengo", "darkrai", "garganacl"]
+
+def test_tournament_resumes_from_checkpoint(tmp_path, monkeypatch):
+    monkeypatch.setattr(duel_simulator, "DAMAGE_BACKEND", "native")
+    directory = str(tmp_path)
+    first = run_tournament(directory, workers=1, names=NAMES)
+    assert first["total"] == 6 and first["errors"] == 0
+
+    # Interruption simulée : on ne garde que l'en-tête et deux matchs
+    checkpoint = os.path.join(directory, CHECKPOINT_FILE)
+    with open(checkpoint, "r", encoding="utf-8") as f:
+        lines = f.readlines()
+    with open(checkpoint, "w", encoding="utf-8") as f:
+        f.writelines(lines[:3])
+
+    resumed = run_tournament(directory, workers=1, names=NAMES)
+    assert resumed["played"] == 4 and resumed["total"] == 6
+
+    matrix = WinrateMatrix(directory)
+    w, l, d = matrix.outcome("darkrai", "garganacl")
+    assert matrix.outcome("garganacl", "darkrai") == (l, w, d)
+    assert matrix.get("darkrai", "garganacl") == np.float32(100 * w / (w + l + d))
+    assert len(matrix.row("gholdengo")) == 3
+
+
+def test_tournament_replays_only_matches_of_changed_sets(tmp_path, monkeypatch, edit_set):
+    monkeypatch.setattr(duel_simulator, "DAMAGE_BACKEND", "native")
+    directory = str(tmp_path)
+    run_tournament(directory, workers=1, names=NAMES)
+    before = WinrateMatrix(directory)
+    kept = before.outcome("roaringmoon", "gholdengo")
+
+    edit_set("darkrai", "strategy: OU Nasty Plot", "EVs: 252 SA / 4 SD / 252 SP", "EVs: 252 HP / 4 SA / 252 SP")
+    refreshed = run_tournament(directory, workers=1, names=NAMES)
+    # Les 3 matchs de darkrai sont rejoués, les 3 autres relus du checkpoint
+    assert refreshed["stale"] == 3 and refreshed["played"] == 3 and refreshed["reused"] == 3
+    assert WinrateMatrix(directory).outcome("roaringmoon", "gholdengo") == kept
@@ -0,0 +1,83 @@
+import io
+import json
+
+from core.usage_ingest import ingest_months, iter_chaos, iter_moveset
+
+MOVESET = """ +----------------------------------------+ 
+ | Great Tusk                             | 
+ +----------------------------------------+ 
+ | Raw count: 711505                      | 
+ | Avg. weight: 0.0123                    | 
+ | Viability Ceiling: 91                  | 
+ +----------------------------------------+ 
+ | Abilities                              | 
+ | Protosynthesis 100.000%                | 
+ +----------------------------------------+ 
+ | Items                                  | 
+ | Rocky Helmet 40.239%                   | 
+ | Other  59.761%                         | 
+ +----------------------------------------+ 
+ | Happiness                              | 
+ | 255 100.000%                           | 
+ +----------------------------------------+ 
+ | Spreads                                | 
+ | Jolly:0/252/0/0/4/252 25.686%          | 
+ +----------------------------------------+ 
+ | Teammates                              | 
+ | Kingambit 34.759%                      | 
+ | Slowking-Galar 31.223%                 | 
+ +----------------------------------------+ 
+ | Checks and Counters                    | 
+ | Skarmory 61.739 (86.54±6.20)           | 
+ |	 (23.1% KOed / 63.5% switched out)     | 
+ +----------------------------------------+ 
+ +----------------------------------------+ 
+ | Kingambit                              | 
+ +----------------------------------------+ 
+ | Raw count: 544072                      | 
+ | Viability Ceiling: 88                  | 
+ +----------------------------------------+ 
+ | Abilities                              | 
+ | Supreme Overlord 97.500%               | 
+ | Other  2.500%                          | 
+ +----------------------------------------+ 
+"""
+
+
+def test_moveset_text_matches_metagame_schema():
+    data = dict(iter_moveset(io.StringIO(MOVESET)))
+    tusk = data["Great Tusk"]
+    assert list(data) == ["Great Tusk", "Kingambit"]
+    assert tusk["raw_count"] == 711505 and tusk["viability_ceiling"] == 91
+    assert tusk["items"] == {"Rocky Helmet": 40.239, "Other": 59.761}
+    assert tusk["teammates"] == {"Kingambit": 34.759, "Slowking-Galar": 31.223}
+    assert tusk["checks_counters"] == [{"name": "Skarmory 61.739", "detail": "86.54±6.20"}]
+    assert "255" not in tusk["spreads"]
+    assert data["Kingambit"]["abilities"]["Supreme Overlord"] == 97.5
+
+
+def test_chaos_stream_and_parallel_months(tmp_path):
+    chaos = {"info": {"metagame": "gen9ou", "cutoff": 1695}, "data": {
+        "Great Tusk": {"Raw count": 700, "Abilities": {"protosynthesis": 10.0},
+                       "Teammates": {"Kingambit": 4.0}, "Viability Ceiling": [50, 91, 80, 70]},
+        "Kingambit": {"Raw count": 900, "Abilities": {"supremeoverlord": 10.0}},
+    }}
+    text = json.dumps(chaos)
+    # Petits blocs de lecture : les entrées sont recollées à travers les coupures
+    assert [name for name, _ in iter_chaos(io.StringIO(text), chunk_size=5)] == ["Great Tusk", "Kingambit"]
+
+    for month in ("2024-05", "2024-06"):
+        (tmp_path / month / "chaos").mkdir(parents=True)
+        (tmp_path / month / "chaos" / "gen9ou-1695.json").write_text(text, encoding="utf-8")
+    (tmp_path / "2024-06" / "moveset").mkdir()
+    (tmp_path / "2024-06" / "moveset" / "gen9ou-1695.txt").write_text(MOVESET, encoding="utf-8")
+
+    months = ingest_months(["2024-06", "2024-05"], root=str(tmp_path), workers=2)
+    assert list(months) == ["2024-05", "2024-06"]
+    may = months["2024-05"]
+    assert list(may) == ["Kingambit", "Great Tusk"]
+    assert may["Great Tusk"]["teammates"] == {"Kingambit": 40.0}
+    assert may["Great Tusk"]["abilities"] == {"Protosynthesis": 100.0}
+    assert may["Great Tusk"]["viability_ceiling"] == 91
+    # Le moveset, quand il existe, est prioritaire
+    assert months["2024-06"]["Great Tusk"]["raw_count"] == 711505
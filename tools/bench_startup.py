@@ -0,0 +1,39 @@
+import os
+import statistics
+import subprocess
+import sys
+
+from data.pokedex import POKEDEX_CACHE_PATH
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUNS = 7
+
+# Chaque mesure tourne dans un interpréteur neuf, comme une commande CLI ou un worker
+SNIPPETS = {
+    "import data.pokedex": "import data.pokedex",
+    "json.load (ancien import)": "import json; json.load(open('data/pokedex_with_full_moves_and_sets.json', encoding='utf-8'))",
+    "premier accès au dex": "from data.pokedex import get_pokemon_data; get_pokemon_data('greattusk')",
+}
+
+
+def measure(code: str) -> float:
+    timed = f"import time; _t = time.perf_counter(); {code}; print(time.perf_counter() - _t)"
+    out = subprocess.run([sys.executable, "-c", timed], cwd=BASE_DIR, capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def median_ms(code: str, cold: bool = False) -> float:
+    times = []
+    for _ in range(RUNS):
+        if cold and os.path.exists(POKEDEX_CACHE_PATH):
+            os.remove(POKEDEX_CACHE_PATH)
+        times.append(measure(code))
+    return 1000 * statistics.median(times)
+
+
+if __name__ == "__main__":
+    print(f"⏱️ Démarrage du dex (médiane sur {RUNS} interpréteurs neufs)")
+    cold = median_ms(SNIPPETS["premier accès au dex"], cold=True)
+    for label, code in SNIPPETS.items():
+        print(f"{label:<30} {median_ms(code):7.1f} ms")
+    print(f"{'premier accès, sans cache':<30} {cold:7.1f} ms")
@@ -1,11 +1,16 @@
 // callDamageFromJSON.mjs
 import { Generations, Pokemon, Move, calculate, Field } from '@smogon/calc';
 import fs from 'fs';
+import readline from 'readline';
+import { fileURLToPath } from 'url';
 
-const DEX_PATH = 'C:/Users/rapha/Desktop/AI TeamBuilder/data/pokedex_with_full_moves_and_sets.json';
-const dex = JSON.parse(fs.readFileSync(DEX_PATH, 'utf-8'));
+const DEX_PATH = fileURLToPath(new URL('../data/pokedex_with_full_moves_and_sets.json', import.meta.url));
+// Dex lu à la première demande : un worker qui reçoit ses sets de Python n'en a pas besoin
+let dex = null;
+const getDex = () => (dex ??= JSON.parse(fs.readFileSync(DEX_PATH, 'utf-8')));
 const gen = Generations.get(9);
 
+// Repli pour la CLI : en mode worker, Python envoie les sets déjà parsés (StrategySet.calc_set)
 function parseSet(pokemonName, rawSet) {
   const lines = rawSet.split('\n').map(l => l.trim()).filter(Boolean);
   const item = lines.find(line => line.startsWith('@'))?.slice(2) ?? '';
@@ -71,7 +76,8 @@ function buildPokemon(set) {
   });
 }
 
-function simulateSet(attackerSet, defenderSet) {
+// withRolls : ajoute les 16 jets (`rolls`) et les jets en coup critique (`critRolls`)
+function simulateSet(attackerSet, defenderSet, withRolls = false) {
   const attacker = buildPokemon(attackerSet);
   const defender = buildPokemon(defenderSet);
   const field = new Field({
@@ -107,7 +113,9 @@ function simulateSet(attackerSet, defenderSet) {
       nature: attackerSet.nature,
       evs: attackerSet.evs,
       ivs: attackerSet.ivs,
-      stats: attackerStats
+      stats: attackerStats,
+      hp: attackerStats.hp,
+      speed: attackerStats.spe
     },
     defender: {
       name: defender.name,
@@ -116,7 +124,9 @@ function simulateSet(attackerSet, defenderSet) {
       nature: defenderSet.nature,
       evs: defenderSet.evs,
       ivs: defenderSet.ivs,
-      stats: defenderStats
+      stats: defenderStats,
+      hp: defenderStats.hp,
+      speed: defenderStats.spe
     },
     moves: []
   };
@@ -128,7 +138,13 @@ function simulateSet(attackerSet, defenderSet) {
       const damage = Array.isArray(calc.damage) ? calc.damage : [calc.damage];
       const min = Math.min(...damage);
       const max = Math.max(...damage);
-      result.moves.push({ name: moveName, min, max });
+      const entry = { name: moveName, min, max };
+      if (withRolls && damage.length === 16 && damage.every(Number.isFinite)) {
+        const crit = calculate(gen, attacker, defender, new Move(gen, moveName, { isCrit: true }), field);
+        entry.rolls = damage;
+        entry.critRolls = Array.isArray(crit.damage) ? crit.damage : Array(16).fill(crit.damage);
+      }
+      result.moves.push(entry);
     } catch (e) {
       result.moves.push({ name: moveName, error: 'invalid move' });
     }
@@ -137,12 +153,6 @@ function simulateSet(attackerSet, defenderSet) {
 }
 
 
-const [rawA, rawB] = process.argv.slice(2);
-if (!rawA || !rawB) {
-  console.error('❌ Usage: node callDamageFromJSON.mjs <poke1[:set]> <poke2[:set]>');
-  process.exit(1);
-}
-
 function parseArgs(raw) {
   const [nameRaw, ...setParts] = raw.split(':');
   return {
@@ -151,31 +161,141 @@ function parseArgs(raw) {
   };
 }
 
-const pkmA = parseArgs(rawA);
-const pkmB = parseArgs(rawB);
+// Sets parsés gardés en mémoire : un worker ne parse chaque Pokémon qu'une fois
+const parsedSetsCache = new Map();
 
-const setsA = dex[pkmA.name];
-const setsB = dex[pkmB.name];
-if (!setsA || !setsB) {
-  console.error(`❌ Pokémon introuvable : ${!setsA ? pkmA.name : pkmB.name}`);
-  process.exit(1);
+// On garde uniquement les clés de sets valides (souvent nommées "strategy: ...")
+function getParsedSets(name) {
+  if (!parsedSetsCache.has(name)) {
+    const entry = getDex()[name];
+    const parsed = entry
+      ? Object.entries(entry)
+        .filter(([k, v]) => typeof v === 'string' && k.startsWith('strategy:'))
+        .map(([k, raw]) => ({ key: k, set: parseSet(name, raw) }))
+      : null;
+    parsedSetsCache.set(name, parsed);
+  }
+  return parsedSetsCache.get(name);
 }
 
-// On garde uniquement les clés de sets valides (souvent nommées "strategy: ...")
-const parseSets = (sets, name) => Object.entries(sets)
-  .filter(([k, v]) => typeof v === 'string' && k.startsWith('strategy:'))
-  .map(([k, raw]) => ({ key: k, set: parseSet(name, raw) }));
-
-const parsedSetsA = parseSets(setsA, pkmA.name);
-const parsedSetsB = parseSets(setsB, pkmB.name);
-
-const results = [];
-for (const { key: keyA, set: setA } of parsedSetsA) {
-  for (const { key: keyB, set: setB } of parsedSetsB) {
-    const r = simulateSet(setA, setB);
-    r.setNames = { a: keyA, b: keyB };
-    results.push(r);
+// Sets parsés côté Python ({nom: [{key, set}, ...]}) : remplacent ceux du dex pour ce worker
+function registerSets(sets) {
+  for (const [name, parsed] of Object.entries(sets ?? {})) parsedSetsCache.set(name, parsed);
+}
+
+const matchesSetKey = (key, setKey) => !setKey || key === setKey || key === `strategy: ${setKey}`;
+
+// bidirectional : ajoute `reverseMoves` (B → A) à chaque paire de sets, en une seule passe
+// rolls : détail des 16 jets par move (voir simulateSet)
+function* iterMatchups(rawA, rawB, { bidirectional = false, rolls = false } = {}) {
+  const pkmA = parseArgs(rawA);
+  const pkmB = parseArgs(rawB);
+
+  const parsedSetsA = getParsedSets(pkmA.name);
+  const parsedSetsB = getParsedSets(pkmB.name);
+  if (!parsedSetsA || !parsedSetsB) {
+    throw new Error(`❌ Pokémon introuvable : ${!parsedSetsA ? pkmA.name : pkmB.name}`);
+  }
+
+  for (const { key: keyA, set: setA } of parsedSetsA) {
+    if (!matchesSetKey(keyA, pkmA.setKey)) continue;
+    for (const { key: keyB, set: setB } of parsedSetsB) {
+      if (!matchesSetKey(keyB, pkmB.setKey)) continue;
+      const r = simulateSet(setA, setB, rolls);
+      r.setNames = { a: keyA, b: keyB };
+      if (bidirectional) r.reverseMoves = simulateSet(setB, setA, rolls).moves;
+      yield r;
+    }
+  }
+}
+
+function computeMatchups(rawA, rawB, options = {}) {
+  return [...iterMatchups(rawA, rawB, options)];
+}
+
+// Liste de paires explicite, ou produit cartésien de deux rosters (A × B)
+function expandPairs(request) {
+  if (Array.isArray(request.pairs)) return request.pairs;
+  const pairs = [];
+  for (const a of request.rosterA ?? []) {
+    for (const b of request.rosterB ?? []) {
+      if (a !== b) pairs.push([a, b]);
+    }
+  }
+  return pairs;
+}
+
+// Mode batch : un enregistrement NDJSON par paire de sets, émis dès qu'il est calculé.
+// Chaque paire de Pokémon se termine par un marqueur `pairDone`, le batch par `done`.
+function streamBatch(request, write) {
+  let count = 0;
+  for (const [a, b] of expandPairs(request)) {
+    try {
+      for (const entry of iterMatchups(a, b, { bidirectional: Boolean(request.bidirectional), rolls: Boolean(request.rolls) })) {
+        write({ id: request.id, pair: [a, b], entry });
+        count++;
+      }
+      write({ id: request.id, pair: [a, b], pairDone: true });
+    } catch (e) {
+      write({ id: request.id, pair: [a, b], error: e.message, pairDone: true });
+    }
   }
+  write({ id: request.id, done: true, count });
+}
+
+const writeLine = obj => process.stdout.write(JSON.stringify(obj) + '\n');
+
+// Mode worker : une requête JSON par ligne sur stdin, une réponse JSON par ligne sur stdout.
+// Le dex et les sets parsés restent en mémoire entre les requêtes.
+function runWorker() {
+  const rl = readline.createInterface({ input: process.stdin, terminal: false });
+  rl.on('line', line => {
+    if (!line.trim()) return;
+    let request;
+    try {
+      request = JSON.parse(line);
+    } catch (e) {
+      writeLine({ id: null, error: 'invalid request' });
+      return;
+    }
+    registerSets(request.sets);
+    if (request.op === 'batch') {
+      streamBatch(request, writeLine);
+      return;
+    }
+    let response;
+    try {
+      const options = { bidirectional: request.op === 'matchup', rolls: Boolean(request.rolls) };
+      response = { id: request.id, result: computeMatchups(request.a, request.b, options) };
+    } catch (e) {
+      response = { id: request.id, error: e.message };
+    }
+    writeLine(response);
+  });
+  rl.on('close', () => process.exit(0));
 }
 
-console.log(JSON.stringify(results, null, 2));
\ No newline at end of file
+const batchIndex = process.argv.indexOf('--batch');
+
+if (process.argv.includes('--worker')) {
+  runWorker();
+} else if (batchIndex !== -1) {
+  // node callDamageFromJSON.mjs --batch <fichier.json | ->
+  // fichier : {"pairs": [["a", "b"], ...]} ou {"rosterA": [...], "rosterB": [...]}
+  const source = process.argv[batchIndex + 1] ?? '-';
+  const request = JSON.parse(fs.readFileSync(source === '-' ? 0 : source, 'utf-8'));
+  streamBatch({ ...request, id: null }, writeLine);
+} else {
+  const [rawA, rawB] = process.argv.slice(2);
+  if (!rawA || !rawB) {
+    console.error('❌ Usage: node callDamageFromJSON.mjs <poke1[:set]> <poke2[:set]> | --worker | --batch <file>');
+    process.exit(1);
+  }
+
+  try {
+    console.log(JSON.stringify(computeMatchups(rawA, rawB), null, 2));
+  } catch (e) {
+    console.error(e.message);
+    process.exit(1);
+  }
+}